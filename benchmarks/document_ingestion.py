@@ -0,0 +1,237 @@
+"""
+Parsing and chunking throughput for document ingestion on a large sample corpus.
+
+The corpus is synthetic codes shaped like Mexican laws (títulos, capítulos and artículos with fracciones), written as
+HTML or text files, or any directory of real documents with --corpus.
+
+Chunking compares the legal structure chunker with the paragraph chunker: throughput, tokens per chunk, how many
+chunks start on an article or heading, and peak memory when the chunks are streamed versus collected in a list.
+Parsing compares unstructured partitioning inline on the event loop with the process pool, including the worst
+event loop stall while parsing. It needs unstructured installed and is skipped otherwise.
+
+Usage:
+    python -m benchmarks.document_ingestion --documents 40 --articles 600
+    python -m benchmarks.document_ingestion --corpus samples/ --max-tokens 512 --overlap-tokens 64
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from typing import Callable, Iterator, List
+
+from benchmarks.stats import percentile
+from src.llm.application.services.document_chunker import LegalStructureChunker, ParagraphChunker
+from src.llm.application.services.token_counter import TokenCounter
+from src.llm.application.use_cases.parse_documents import ParseDocuments
+from src.llm.domain.entities import Document, DocumentFile
+from src.llm.domain.services.document_chunker import DocumentChunker
+from src.llm.infrastructure.unstructured.document_parser import (
+    SUPPORTED_EXTENSIONS,
+    UnstructuredDocumentParser,
+    available_cores,
+    partition_to_text
+)
+
+WORDS = (
+    "el la los las trabajador patrón salario jornada contrato relación trabajo derecho obligación empresa "
+    "autoridad plazo término días horas pago prestación servicio personal subordinado disposición presente "
+    "ley artículo fracción párrafo conforme establecido respectivo caso cuando deberá podrá será mediante "
+    "escrito aviso rescisión indemnización antigüedad vacaciones aguinaldo utilidades seguridad social"
+).split()
+ORDINALS = ["PRIMERO", "SEGUNDO", "TERCERO", "CUARTO", "QUINTO", "SEXTO", "SÉPTIMO", "OCTAVO", "NOVENO", "DÉCIMO"]
+ROMAN = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII", "XIII", "XIV", "XV"]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def synthetic_code(rng: random.Random, name: str, articles: int) -> List[str]:
+    """Lines of a law, some articles with many fracciones so they exceed the chunk size"""
+    lines = [name.upper(), "Texto vigente", ""]
+    for number in range(1, articles + 1):
+        if number % 120 == 1:
+            lines += [f"TÍTULO {ORDINALS[(number // 120) % len(ORDINALS)]}", sentence(rng, 4), ""]
+        if number % 25 == 1:
+            lines += [f"CAPÍTULO {ROMAN[(number // 25) % len(ROMAN)]}", sentence(rng, 5), ""]
+
+        lines.append(f"Artículo {number}o.- {sentence(rng, rng.randint(15, 80))}")
+        if rng.random() < 0.3:
+            lines += [f"{ROMAN[index]}. {sentence(rng, rng.randint(10, 60))}" for index in range(rng.randint(2, 15))]
+        lines.append("")
+    return lines
+
+
+def write_corpus(directory: str, documents: int, articles: int, file_format: str) -> None:
+    rng = random.Random(7)
+    for index in range(documents):
+        lines = synthetic_code(rng, f"Ley de prueba {index}", articles)
+        if file_format == "html":
+            body = "\n".join(f"<p>{line}</p>" for line in lines if line)
+            content = f"<html><body>{body}</body></html>"
+        else:
+            content = "\n".join(lines)
+        with open(os.path.join(directory, f"ley_{index:03d}.{file_format}"), "w", encoding="utf-8") as file:
+            file.write(content)
+
+
+def corpus_files(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(root, filename)
+        for root, _, filenames in os.walk(directory)
+        for filename in filenames
+        if os.path.splitext(filename)[1].lower() in SUPPORTED_EXTENSIONS
+    )
+
+
+def read_texts(files: List[str]) -> Iterator[Document]:
+    """Text files are read as they are, other formats need unstructured"""
+    for path in files:
+        if path.endswith((".txt", ".md")):
+            with open(path, encoding="utf-8") as file:
+                text = file.read()
+        else:
+            text = partition_to_text(path, None, "fast")
+        yield Document(document_id=os.path.basename(path), text=text, filename=os.path.basename(path))
+
+
+def measure_chunking(label: str, chunker: DocumentChunker, documents: List[Document], counter: TokenCounter) -> None:
+    start = time.perf_counter()
+    tokens, headed = [], 0
+    for document in documents:
+        for chunk in chunker.chunk(document):
+            tokens.append(counter.count(chunk.content))
+            headed += chunk.content.lstrip().startswith(("Artículo", "ARTÍCULO", "TÍTULO", "CAPÍTULO", "CLÁUSULA"))
+    seconds = time.perf_counter() - start
+    megabytes = sum(len(document.text.encode()) for document in documents) / 2**20
+
+    streamed = peak_memory(lambda: [sum(1 for _ in chunker.chunk(document)) for document in documents])
+    collected = peak_memory(lambda: [chunk for document in documents for chunk in chunker.chunk(document)])
+
+    print(
+        f"{label:<22} {len(tokens):>8} {len(tokens) / seconds:>10.0f} {megabytes / seconds:>6.1f} "
+        f"{percentile(tokens, 50):>6} {percentile(tokens, 95):>6} {max(tokens):>6} {headed / len(tokens):>8.0%} "
+        f"{streamed:>10.1f} {collected:>10.1f}"
+    )
+
+
+def peak_memory(consume: Callable[[], object]) -> float:
+    """Peak traced allocation in MB while consume runs, the documents themselves are already allocated"""
+    tracemalloc.start()
+    consume()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+async def max_loop_lag(work) -> tuple:
+    """Runs work while a ticker measures the longest event loop stall, returns (seconds, lag ms)"""
+    stalls = [0.0]
+    running = True
+
+    async def ticker():
+        while running:
+            before = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stalls[0] = max(stalls[0], time.perf_counter() - before - 0.005)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await work()
+    seconds = time.perf_counter() - start
+    running = False
+    await task
+    return seconds, stalls[0] * 1000
+
+
+async def measure_parsing(files: List[str], workers: int) -> None:
+    try:
+        import unstructured  # noqa: F401
+    except ImportError:
+        print("parsing skipped, unstructured is not installed")
+        return
+
+    async def inline():
+        for path in files:
+            partition_to_text(path, None, "fast")
+
+    parser = UnstructuredDocumentParser(max_workers=workers)
+    parse_documents = ParseDocuments(parser, concurrency=2 * workers)
+
+    async def pooled():
+        async for _ in parse_documents.execute(DocumentFile(document_id=path, filename=path) for path in files):
+            pass
+
+    try:
+        # Spawns the workers and imports unstructured in them, once per process
+        await parser.parse(files[0])
+
+        print(f"{'parsing':<22} {'seconds':>8} {'docs/s':>8} {'max loop stall ms':>18}")
+        for label, work in [("inline", inline), (f"process pool x{workers}", pooled)]:
+            seconds, lag = await max_loop_lag(work)
+            print(f"{label:<22} {seconds:8.1f} {len(files) / seconds:8.1f} {lag:18.0f}")
+    finally:
+        await parser.close()
+
+
+def run(args) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        if not args.corpus:
+            write_corpus(directory, args.documents, args.articles, args.format)
+        files = corpus_files(args.corpus or directory)
+        if not files:
+            raise SystemExit("no supported documents found")
+
+        counter = TokenCounter(encoding_name="cl100k_base", cache_size=0)
+        try:
+            documents = list(read_texts(files))
+        except ImportError:
+            # Chunking only needs text, the synthetic corpus is rewritten as text when unstructured is missing
+            if args.corpus:
+                raise SystemExit("unstructured is needed to read this corpus")
+            text_directory = os.path.join(directory, "text")
+            os.makedirs(text_directory)
+            write_corpus(text_directory, args.documents, args.articles, "txt")
+            documents = list(read_texts(corpus_files(text_directory)))
+
+        megabytes = sum(len(document.text.encode()) for document in documents) / 2**20
+        print(f"documents: {len(documents)}, text: {megabytes:.1f}MB, max tokens: {args.max_tokens}, overlap: {args.overlap_tokens}")
+        print(
+            f"{'chunker':<22} {'chunks':>8} {'chunks/s':>10} {'MB/s':>6} {'p50 tk':>6} {'p95 tk':>6} {'max tk':>6} "
+            f"{'headed':>8} {'stream MB':>10} {'list MB':>10}"
+        )
+        measure_chunking(
+            "legal structure",
+            LegalStructureChunker(counter, max_tokens=args.max_tokens, overlap_tokens=args.overlap_tokens),
+            documents,
+            counter
+        )
+        # Roughly the same size in characters
+        measure_chunking(
+            "paragraph",
+            ParagraphChunker(max_chars=args.max_tokens * 4, overlap_chars=args.overlap_tokens * 4),
+            documents,
+            counter
+        )
+        del documents
+
+        asyncio.run(measure_parsing(files, args.workers or available_cores()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="Directory of real documents instead of the synthetic corpus")
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--articles", type=int, default=600, help="Articles per synthetic code")
+    parser.add_argument("--format", choices=["html", "txt"], default="html", help="Synthetic corpus file format")
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--overlap-tokens", type=int, default=64)
+    parser.add_argument("--workers", type=int, help="Parser processes, the available cores by default")
+    args = parser.parse_args()
+
+    run(args)
@@ -0,0 +1,215 @@
+"""
+Recall@k against the full precision baseline, search latency and memory for shortened and quantized embeddings.
+
+Offline, on a local snapshot of the full 3072 dimension vectors (src.llm.infrastructure.numpy.snapshot) or a synthetic
+corpus. Shortening is simulated the way text-embedding-3 defines it: keep the leading dimensions and renormalize.
+Quantization is simulated in NumPy (int8 per dimension, or 1 bit with Hamming distance), with rescoring of
+oversampling * k candidates at full precision. Latency here is NumPy brute force, use --qdrant for real numbers.
+
+Against Qdrant, exact search is the baseline and each hnsw_ef / rescore setting is compared with it.
+
+Usage:
+    python -m benchmarks.embedding_recall --synthetic --points 20000
+    python -m benchmarks.embedding_recall --snapshot vector_snapshots/legal --dimensions 256,512,1024,3072
+    python -m benchmarks.embedding_recall --qdrant --collection "$LEGAL_COLLECTION" --hnsw-ef 32,64,128,256
+"""
+import os
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Callable, List
+
+import numpy as np
+
+from benchmarks.stats import percentile
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def recall(found: List[List[int]], expected: List[List[int]]) -> float:
+    return statistics.mean(len(set(f) & set(e)) / len(e) for f, e in zip(found, expected))
+
+
+def synthetic_corpus(points: int, dimensions: int, seed: int = 7) -> np.ndarray:
+    """Variance concentrated in the leading dimensions, like Matryoshka trained embeddings"""
+    rng = np.random.default_rng(seed)
+    scale = 1 / np.sqrt(1 + np.arange(dimensions) / 64)
+    return normalize(rng.standard_normal((points, dimensions), dtype=np.float32) * scale.astype(np.float32))
+
+
+def make_queries(corpus: np.ndarray, count: int, noise: float, seed: int = 11) -> np.ndarray:
+    """Perturbed corpus points, so every query has real near neighbours"""
+    rng = np.random.default_rng(seed)
+    picked = corpus[rng.choice(len(corpus), size=count, replace=False)]
+    noisy = picked + rng.standard_normal(picked.shape, dtype=np.float32) * noise / np.sqrt(corpus.shape[1])
+    # float32 like the corpus, a float64 query would upcast the whole matrix on every search
+    return normalize(noisy).astype(np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> List[int]:
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best])].tolist()
+
+
+class Variant:
+    def __init__(self, label: str, bytes_per_vector: float, search: Callable[[np.ndarray, int], List[int]]):
+        self.label = label
+        self.bytes_per_vector = bytes_per_vector
+        self.search = search
+
+
+def variants(corpus: np.ndarray, dimensions: int, quantizations: List[str], oversampling: float) -> List[Variant]:
+    vectors = normalize(corpus[:, :dimensions])
+    built = [Variant(f"{dimensions}d float32", dimensions * 4, lambda query, k: top_k(vectors @ query[:dimensions], k))]
+
+    def rescored(candidate_scores: np.ndarray, query: np.ndarray, k: int) -> List[int]:
+        candidates = np.asarray(top_k(candidate_scores, min(len(candidate_scores), int(k * oversampling))))
+        exact = vectors[candidates] @ normalize(query[:dimensions])
+        return candidates[np.argsort(-exact)[:k]].tolist()
+
+    if "scalar" in quantizations:
+        low, high = np.quantile(vectors, [0.005, 0.995], axis=0)
+        step = np.where(high > low, (high - low) / 255, 1).astype(np.float32)
+        codes = np.clip(np.round((vectors - low) / step), 0, 255).astype(np.uint8)
+        # Scores on the dequantized codes carry the int8 precision loss
+        dequantized = (codes.astype(np.float32) * step + low).astype(np.float32)
+        built.append(Variant(
+            f"{dimensions}d int8",
+            dimensions,
+            lambda query, k: top_k(dequantized @ normalize(query[:dimensions]), k)
+        ))
+        built.append(Variant(
+            f"{dimensions}d int8+rescore",
+            dimensions + dimensions * 4,
+            lambda query, k: rescored(dequantized @ normalize(query[:dimensions]), query, k)
+        ))
+
+    if "binary" in quantizations:
+        bits = np.packbits(vectors > 0, axis=1)
+
+        def hamming_scores(query: np.ndarray) -> np.ndarray:
+            query_bits = np.packbits(query[:dimensions] > 0)
+            return -np.bitwise_count(bits ^ query_bits).sum(axis=1, dtype=np.int32).astype(np.float32)
+
+        built.append(Variant(f"{dimensions}d binary", dimensions / 8, lambda query, k: top_k(hamming_scores(query), k)))
+        built.append(Variant(
+            f"{dimensions}d binary+rescore",
+            dimensions / 8 + dimensions * 4,
+            lambda query, k: rescored(hamming_scores(query), query, k)
+        ))
+
+    return built
+
+
+def run_offline(args) -> None:
+    if args.snapshot:
+        from src.llm.infrastructure.numpy.vector_repository import VectorSnapshot
+
+        corpus = np.asarray(VectorSnapshot(args.snapshot, use_hnsw=False).vectors, dtype=np.float32)
+    else:
+        corpus = synthetic_corpus(args.points, args.full_dimensions)
+
+    queries = make_queries(corpus, args.queries, args.noise)
+    baseline = [top_k(corpus @ query, args.top_k) for query in queries]
+    print(f"points: {len(corpus)}, full dimensions: {corpus.shape[1]}, queries: {len(queries)}, k: {args.top_k}")
+    print(f"{'setting':<26} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8} {'bytes/vec':>10} {'corpus MB':>10}")
+
+    for dimensions in [dimensions for dimensions in args.dimensions if dimensions <= corpus.shape[1]]:
+        for variant in variants(corpus, dimensions, args.quantization, args.oversampling):
+            latencies, found = [], []
+            for query in queries:
+                start = time.perf_counter()
+                found.append(variant.search(query, args.top_k))
+                latencies.append((time.perf_counter() - start) * 1000)
+
+            # Rescoring variants keep the full precision vectors too, Qdrant can hold those on disk
+            print(
+                f"{variant.label:<26} {recall(found, baseline):9.3f} {percentile(latencies, 50):8.2f} "
+                f"{percentile(latencies, 99):8.2f} {variant.bytes_per_vector:10.0f} "
+                f"{variant.bytes_per_vector * len(corpus) / 2**20:10.1f}"
+            )
+
+
+async def run_qdrant(args) -> None:
+    from qdrant_client import AsyncQdrantClient, models
+
+    client = AsyncQdrantClient(url=os.getenv("QDRANT_URL"), api_key=os.getenv("QDRANT_API_KEY"), timeout=60)
+    try:
+        info = await client.get_collection(args.collection)
+        sample, _ = await client.scroll(args.collection, limit=args.queries, with_vectors=True, with_payload=False)
+        sample_vectors = np.asarray([point.vector for point in sample], dtype=np.float32)
+        queries = make_queries(sample_vectors, len(sample_vectors), args.noise)
+
+        async def measure(params: models.SearchParams):
+            latencies, found = [], []
+            for query in queries:
+                start = time.perf_counter()
+                response = await client.query_points(args.collection, query=query.tolist(), limit=args.top_k, search_params=params)
+                latencies.append((time.perf_counter() - start) * 1000)
+                found.append([point.id for point in response.points])
+            return latencies, found
+
+        _, baseline = await measure(models.SearchParams(exact=True))
+        dimensions = sample_vectors.shape[1]
+        print(
+            f"collection: {args.collection}, points: {info.points_count}, dimensions: {dimensions}, "
+            f"quantization: {type(info.config.quantization_config).__name__ if info.config.quantization_config else 'none'}, "
+            f"float32 vectors: {info.points_count * dimensions * 4 / 2**20:.1f}MB"
+        )
+        print(f"{'setting':<34} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+
+        settings = [(f"hnsw_ef={ef}", models.SearchParams(hnsw_ef=ef)) for ef in args.hnsw_ef]
+        if info.config.quantization_config:
+            settings += [
+                (f"hnsw_ef={ef} rescore=false", models.SearchParams(
+                    hnsw_ef=ef, quantization=models.QuantizationSearchParams(rescore=False)
+                ))
+                for ef in args.hnsw_ef
+            ] + [
+                (f"hnsw_ef={ef} oversampling={args.oversampling}", models.SearchParams(
+                    hnsw_ef=ef, quantization=models.QuantizationSearchParams(rescore=True, oversampling=args.oversampling)
+                ))
+                for ef in args.hnsw_ef
+            ]
+
+        for label, params in settings:
+            latencies, found = await measure(params)
+            print(f"{label:<34} {recall(found, baseline):9.3f} {percentile(latencies, 50):8.2f} {percentile(latencies, 99):8.2f}")
+
+    finally:
+        await client.close()
+
+
+def integers(value: str) -> List[int]:
+    return [int(part) for part in value.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthetic", action="store_true")
+    source.add_argument("--snapshot", help="Snapshot directory of full precision vectors")
+    source.add_argument("--qdrant", action="store_true", help="Measure a live collection at QDRANT_URL")
+    parser.add_argument("--collection", default=os.getenv("LEGAL_COLLECTION"))
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--full-dimensions", type=int, default=3072)
+    parser.add_argument("--dimensions", type=integers, default=[256, 512, 1024, 3072])
+    parser.add_argument("--quantization", type=lambda value: value.split(","), default=["scalar", "binary"])
+    parser.add_argument("--oversampling", type=float, default=3.0)
+    parser.add_argument("--hnsw-ef", type=integers, default=[32, 64, 128, 256])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--noise", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.qdrant:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        asyncio.run(run_qdrant(args))
+    else:
+        run_offline(args)
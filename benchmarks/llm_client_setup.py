@@ -0,0 +1,128 @@
+"""
+Per-call LLM client setup: building ChatOpenAI (and the structured output runnable) on every call
+vs the pooled clients of LangchainLlmService, both through their public calls.
+
+Starts a stub OpenAI-compatible server on localhost that answers instantly, so the difference is client setup
+and connection reuse rather than model latency.
+
+Usage:
+    python -m benchmarks.llm_client_setup --calls 500
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+import uvicorn
+from langchain_openai import ChatOpenAI
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from benchmarks.stats import report
+from src.llm.domain.models import ContextOrchestratorOutput
+from src.llm.infrastructure.langchain.llm_service import LangchainLlmService
+
+MODEL = "gpt-4o"
+STRUCTURED_ANSWER = json.dumps({"general_law": True, "company_law": False})
+
+
+def create_stub_openai() -> Starlette:
+    def chunk(delta: dict, finish_reason=None) -> str:
+        body = {
+            "id": "stub", "object": "chat.completion.chunk", "created": 0, "model": MODEL,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    async def completions(request: Request):
+        body = await request.json()
+        content = STRUCTURED_ANSWER if body.get("response_format") else "Respuesta breve."
+        if body.get("stream"):
+            async def events():
+                yield chunk({"role": "assistant", "content": content})
+                yield chunk({}, finish_reason="stop")
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return JSONResponse({
+            "id": "stub", "object": "chat.completion", "created": 0, "model": MODEL,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+        })
+
+    return Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+
+
+async def measure(calls: int, call) -> list:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run(calls: int, port: int):
+    server = uvicorn.Server(uvicorn.Config(create_stub_openai(), host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    prompt = [{"role": "user", "content": "¿Qué dice la LFT sobre vacaciones?"}]
+    service = LangchainLlmService(model=MODEL)
+    try:
+        async def per_call_stream():
+            async for _ in ChatOpenAI(model=MODEL, temperature=0.7, streaming=True).astream(prompt):
+                pass
+
+        async def per_call_structured():
+            llm = ChatOpenAI(model=MODEL, temperature=0).with_structured_output(ContextOrchestratorOutput)
+            await llm.ainvoke(prompt)
+
+        async def pooled_stream():
+            async for _ in service.generate_stream(prompt, temperature=0.7):
+                pass
+
+        async def pooled_structured():
+            await service.invoke_structured(prompt, ContextOrchestratorOutput, temperature=0)
+
+        results = {}
+        for label, call in [
+            ("new ChatOpenAI (stream)", per_call_stream),
+            ("new ChatOpenAI + structured output", per_call_structured),
+            ("pooled (stream)", pooled_stream),
+            ("pooled (structured)", pooled_structured)
+        ]:
+            # One warm call each, so imports and the first connection are not measured
+            await call()
+            results[label] = await measure(calls, call)
+
+        print(f"calls: {calls}")
+        for label, samples in results.items():
+            report(label, samples, width=34)
+
+        # A turn makes an orchestrator call plus one to three streamed calls
+        mean = {label: statistics.mean(samples) for label, samples in results.items()}
+        saved = mean["new ChatOpenAI + structured output"] + 3 * mean["new ChatOpenAI (stream)"] \
+            - mean["pooled (structured)"] - 3 * mean["pooled (stream)"]
+        print(f"time saved per four-call turn: {saved:.3f}ms")
+
+    finally:
+        await service.close()
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    asyncio.run(run(args.calls, args.port))
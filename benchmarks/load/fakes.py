@@ -0,0 +1,250 @@
+"""
+Local stand-ins for OpenAI, Qdrant, Deepgram and the main server, so the app can be load tested offline.
+Latencies are configurable; the fakes do no real work beyond what the interfaces require.
+"""
+import re
+import time
+import base64
+import asyncio
+import hashlib
+from typing import Any, AsyncGenerator, Dict, List, Optional, Type
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.llm.domain.entities import SearchResult
+from src.llm.domain.models import ContextOrchestratorOutput
+from src.llm.domain.repositorties.vector_repository import SearchQuery, VectorRepository
+from src.llm.domain.services.embedding_service import EmbeddingService
+from src.llm.domain.services.llm_service import LlmService, Prompt, T
+from src.voice.domain.services.speech_to_text import SpeechToText
+from src.voice.domain.services.text_to_speech import TextToSpeech
+
+# Route markers the driver puts in the input, read by the fake orchestrator call
+ROUTES = {
+    "general": ContextOrchestratorOutput(general_law=True, company_law=False),
+    "company": ContextOrchestratorOutput(general_law=False, company_law=True),
+    "both": ContextOrchestratorOutput(general_law=True, company_law=True),
+    "none": ContextOrchestratorOutput(general_law=False, company_law=False)
+}
+
+
+def prompt_text(prompt: Prompt) -> str:
+    if isinstance(prompt, str):
+        return prompt
+
+    return "\n".join(message["content"] for message in prompt)
+
+
+class FakeLlmService(LlmService):
+    """Streams filler tokens after a fixed time to first token, at a fixed token rate"""
+    def __init__(
+        self,
+        ttft: float = 0.4,
+        tokens_per_second: float = 60,
+        tokens: int = 80,
+        structured_latency: float = 0.3
+    ):
+        self.__ttft = ttft
+        self.__interval = 1 / tokens_per_second
+        self.__tokens = tokens
+        self.__structured_latency = structured_latency
+
+    async def generate_stream(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> AsyncGenerator[str, None]:
+        await asyncio.sleep(self.__ttft)
+        for index in range(max_tokens or self.__tokens):
+            if index:
+                await asyncio.sleep(self.__interval)
+            # A sentence every 12 tokens so voice turns get TTS chunks
+            yield f" token{index}" + ("." if index % 12 == 11 else "")
+
+    async def invoke(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> str:
+        return "".join([chunk async for chunk in self.generate_stream(prompt, temperature, max_tokens)]).strip()
+
+    async def invoke_structured(
+        self,
+        prompt: Prompt,
+        response_model: Type[T],
+        temperature: float = 0.7,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> T:
+        await asyncio.sleep(self.__structured_latency)
+        if response_model is ContextOrchestratorOutput:
+            # The input sits at the end of the prompt, history may mention other routes
+            markers = re.findall(r"\[(general|company|both|none)\]", prompt_text(prompt))
+            return ROUTES[markers[-1] if markers else "general"].model_copy()
+
+        return response_model()
+
+
+class FakeEmbeddingService(EmbeddingService):
+    """Deterministic pseudo-random vectors seeded by the text"""
+    def __init__(self, dimensions: int = 256, latency: float = 0.05):
+        self.__dimensions = dimensions
+        self.__latency = latency
+
+    def vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        vector = np.random.default_rng(seed).standard_normal(self.__dimensions).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    async def embed_query(self, query: str) -> List[float]:
+        await asyncio.sleep(self.__latency)
+        return self.vector(query)
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.__latency)
+        return [self.vector(text) for text in texts]
+
+
+class InMemoryVectorRepository(VectorRepository):
+    """Brute force cosine search over per-namespace numpy matrices"""
+    def __init__(self, latency: float = 0.01):
+        self.__latency = latency
+        self.__namespaces: Dict[str, tuple] = {}
+
+    def seed(self, namespace: str, embedding_service: FakeEmbeddingService, documents: int, text_words: int = 120) -> None:
+        texts = [
+            f"{namespace} document {index}: " + " ".join(f"word{(index * 7 + word) % 997}" for word in range(text_words))
+            for index in range(documents)
+        ]
+        matrix = np.asarray([embedding_service.vector(text) for text in texts], dtype=np.float32)
+        self.__namespaces[namespace] = (matrix, texts)
+
+    def __search(self, namespace: str, query_vector: List[float], top_k: int) -> List[SearchResult]:
+        if namespace not in self.__namespaces:
+            return []
+
+        matrix, texts = self.__namespaces[namespace]
+        scores = matrix @ np.asarray(query_vector, dtype=np.float32)
+        best = np.argsort(-scores)[:top_k]
+        return [
+            SearchResult(text=texts[index], metadata={"namespace": namespace}, score=float(scores[index]))
+            for index in best
+        ]
+
+    async def similarity_search(
+        self,
+        query_vector: List[float],
+        top_k: int = 4,
+        namespace: Optional[str] = None
+    ) -> List[SearchResult]:
+        await asyncio.sleep(self.__latency)
+        return self.__search(namespace, query_vector, top_k)
+
+    async def batch_search(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        await asyncio.sleep(self.__latency)
+        return [self.__search(query.namespace, query.query_vector, query.top_k) for query in queries]
+
+    async def count(self, namespace: str, filter: Optional[Dict[str, Any]] = None) -> int:
+        await asyncio.sleep(self.__latency)
+        return len(self.__namespaces[namespace][1]) if namespace in self.__namespaces else 0
+
+    async def retrieve(self, namespace: str, ids: List[Any]) -> List[SearchResult]:
+        """IDs are row numbers in the seeded namespace"""
+        await asyncio.sleep(self.__latency)
+        if namespace not in self.__namespaces:
+            return []
+
+        _, texts = self.__namespaces[namespace]
+        return [
+            SearchResult(text=texts[int(point_id)], metadata={"namespace": namespace}, score=1.0)
+            for point_id in ids
+            if 0 <= int(point_id) < len(texts)
+        ]
+
+
+class FakeTextToSpeech(TextToSpeech):
+    """
+    Blocks for the configured latency like the Deepgram SDK call it replaces,
+    which runs synchronously on the event loop.
+    """
+    def __init__(self, latency: float = 0.0, audio_bytes: int = 4096):
+        self.__latency = latency
+        self.__audio = base64.b64encode(b"\0" * audio_bytes).decode("utf-8")
+
+    def transcribe(self, text: str):
+        if not text:
+            return None
+
+        if self.__latency:
+            time.sleep(self.__latency)
+        return self.__audio
+
+
+class FakeSpeechToText(SpeechToText):
+    def __init__(self, latency: float = 0.05, transcript: str = "[general] fake transcript"):
+        self.__latency = latency
+        self.__transcript = transcript
+        self.active_sessions: Dict[str, Dict[str, Any]] = {}
+
+    async def start_transcription_session(self, websocket: Any = None):
+        await asyncio.sleep(self.__latency)
+        session_id = f"session_{len(self.active_sessions)}_{time.perf_counter_ns()}"
+        self.active_sessions[session_id] = {"chunks": 0}
+        return session_id
+
+    async def send_audio_chunk(self, session_id: str, audio_data: str):
+        if session_id in self.active_sessions:
+            self.active_sessions[session_id]["chunks"] += 1
+
+    async def end_transcription_session(self, session_id: str) -> str:
+        await asyncio.sleep(self.__latency)
+        self.active_sessions.pop(session_id, None)
+        return self.__transcript
+
+    async def cleanup_session(self, session_id: str):
+        self.active_sessions.pop(session_id, None)
+
+    def get_audio_bytes(self, data: Any) -> bytes:
+        return base64.b64decode(data) if isinstance(data, str) else data or b""
+
+
+class MessageSink:
+    """Stub main server recording when each chat's final message arrives"""
+    def __init__(self, latency: float = 0.005):
+        self.__latency = latency
+        self.__waiters: Dict[str, asyncio.Future] = {}
+        self.app = Starlette(routes=[
+            Route("/messages/internal/batch", self.__batch, methods=["POST"]),
+            Route("/messages/internal/{chat_id}", self.__message, methods=["POST"])
+        ])
+
+    def expect(self, chat_id: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.__waiters[str(chat_id)] = future
+        return future
+
+    def __receive(self, chat_id: str, text: str) -> None:
+        future = self.__waiters.pop(str(chat_id), None)
+        if future and not future.done():
+            future.set_result((time.perf_counter(), text))
+
+    async def __message(self, request: Request):
+        body = await request.json()
+        await asyncio.sleep(self.__latency)
+        self.__receive(request.path_params["chat_id"], body.get("text"))
+        return JSONResponse({"detail": "created"}, status_code=201)
+
+    async def __batch(self, request: Request):
+        body = await request.json()
+        await asyncio.sleep(self.__latency)
+        for message in body["messages"]:
+            self.__receive(message["chat_id"], message.get("text"))
+        return JSONResponse({"detail": "created"}, status_code=201)
@@ -0,0 +1,288 @@
+"""
+End-to-end load test of the FastAPI app with local stand-ins for OpenAI, Qdrant, Deepgram and the main server.
+
+Each simulated turn opens the chat websocket, posts /interactions/internal/interact and waits for
+the final message at the stub main server. Reports throughput, time to first chunk, end-to-end
+latency percentiles and event-loop lag. Everything runs in one process and one event loop.
+
+Usage:
+    python -m benchmarks.load.run --requests 200 --concurrency 32
+    python -m benchmarks.load.run --requests 200 --concurrency 32 --voice-share 0.3 --json baseline.json
+"""
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import logging
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+import websockets
+
+from benchmarks.stats import LagMonitor, percentile
+
+HMAC_SECRET = "load-test-secret"
+LEGAL_COLLECTION = "load_test_legal"
+
+
+def configure_environment(args, sink_port: int) -> None:
+    os.environ.update({
+        "HMAC_SECRET": HMAC_SECRET,
+        "AGENT_ID": str(uuid.uuid4()),
+        "MAIN_SERVER_ENDPOINT": f"http://127.0.0.1:{sink_port}",
+        "LEGAL_COLLECTION": LEGAL_COLLECTION,
+        "LOGGER_LEVEL": str(logging.WARNING),
+        "OPENAI_RATE_LIMITING": "false",
+        "WORKFLOW_WORKERS": str(args.workers),
+        "WORKFLOW_MAX_PENDING": str(args.max_pending)
+    })
+
+
+def register_fakes(args, companies: List[uuid.UUID]):
+    """Registers the stand-ins under the container keys the app resolves, before anything builds the real ones"""
+    from src.shared.dependencies.container import Container
+    from src.llm.application.services.cached_embedding_service import CachedEmbeddingService
+    from src.llm.domain.namespaces import get_company_namespace
+    from benchmarks.load.fakes import (
+        FakeEmbeddingService, FakeLlmService, FakeSpeechToText, FakeTextToSpeech, InMemoryVectorRepository
+    )
+
+    embedding_service = FakeEmbeddingService(latency=args.embedding_latency)
+    repository = InMemoryVectorRepository(latency=args.search_latency)
+    repository.seed(LEGAL_COLLECTION, embedding_service, documents=args.documents)
+    for company_id in companies:
+        repository.seed(get_company_namespace(company_id), embedding_service, documents=max(1, args.documents // 10))
+
+    Container.register("llm_service", FakeLlmService(
+        ttft=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        tokens=args.tokens,
+        structured_latency=args.structured_latency
+    ))
+    Container.register("embedding_service", CachedEmbeddingService(embedding_service=embedding_service, model="fake"))
+    Container.register("vector_repository", repository)
+    Container.register("tts_service", FakeTextToSpeech(latency=args.tts_latency))
+    Container.register("stt_service", FakeSpeechToText())
+
+
+def signed_query() -> str:
+    from src.shared.utils.http.get_hmac_header import generate_hmac_headers
+
+    headers = generate_hmac_headers(HMAC_SECRET)
+    return f"x-signature={headers['x-signature']}&x-payload={headers['x-payload']}"
+
+
+async def serve(app, port: int) -> asyncio.Task:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", ws="websockets-sansio"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    task.server = server
+    return task
+
+
+class Results:
+    def __init__(self):
+        self.first_chunk: List[float] = []
+        self.end_to_end: List[float] = []
+        self.rejected = 0
+        self.errors = 0
+        self.timeouts = 0
+
+
+async def turn(
+    client: httpx.AsyncClient,
+    sink,
+    app_port: int,
+    company_id: uuid.UUID,
+    route: str,
+    voice: bool,
+    timeout: float,
+    results: Results
+):
+    from src.shared.utils.http.get_hmac_header import generate_hmac_headers
+
+    chat_id = uuid.uuid4()
+    first_chunk = asyncio.get_running_loop().create_future()
+    delivered = sink.expect(chat_id)
+
+    url = f"ws://127.0.0.1:{app_port}/internal/interact/{chat_id}?{signed_query()}&voice={str(voice).lower()}"
+    async with websockets.connect(url, max_size=None) as ws:
+        if voice:
+            # Greeting sent on connect, not part of the turn
+            await ws.recv()
+
+        async def listen():
+            async for _ in ws:
+                if not first_chunk.done():
+                    first_chunk.set_result(time.perf_counter())
+
+        listener = asyncio.create_task(listen())
+        start = time.perf_counter()
+        try:
+            response = await client.post(
+                f"http://127.0.0.1:{app_port}/interactions/internal/interact",
+                headers=generate_hmac_headers(HMAC_SECRET),
+                json={
+                    "input": f"[{route}] What does the law say about case {random.randint(0, 10**6)}?",
+                    "chat_id": str(chat_id),
+                    "company_id": str(company_id),
+                    "user_id": str(uuid.uuid4()),
+                    "chat_history": [],
+                    "voice": voice
+                }
+            )
+            if response.status_code == 503:
+                results.rejected += 1
+                return
+            if response.status_code != 202:
+                results.errors += 1
+                return
+
+            delivered_at, _ = await asyncio.wait_for(delivered, timeout)
+            results.end_to_end.append((delivered_at - start) * 1000)
+            if first_chunk.done():
+                results.first_chunk.append((first_chunk.result() - start) * 1000)
+
+        except asyncio.TimeoutError:
+            results.timeouts += 1
+
+        finally:
+            listener.cancel()
+
+
+def parse_routes(value: str) -> Dict[str, float]:
+    weights = {}
+    for part in value.split(","):
+        route, weight = part.split(":")
+        weights[route.strip()] = float(weight)
+    return weights
+
+
+def report(args, results: Results, elapsed: float, lag: List[float]) -> Dict[str, float]:
+    completed = len(results.end_to_end)
+    summary = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "completed": completed,
+        "rejected": results.rejected,
+        "errors": results.errors,
+        "timeouts": results.timeouts,
+        "throughput_per_second": completed / elapsed if elapsed else 0.0,
+        "first_chunk_p50_ms": percentile(results.first_chunk, 50),
+        "first_chunk_p95_ms": percentile(results.first_chunk, 95),
+        "first_chunk_p99_ms": percentile(results.first_chunk, 99),
+        "end_to_end_p50_ms": percentile(results.end_to_end, 50),
+        "end_to_end_p95_ms": percentile(results.end_to_end, 95),
+        "end_to_end_p99_ms": percentile(results.end_to_end, 99),
+        "loop_lag_p50_ms": percentile(lag, 50),
+        "loop_lag_p99_ms": percentile(lag, 99),
+        "loop_lag_max_ms": max(lag) if lag else float("nan")
+    }
+
+    print(
+        f"requests: {args.requests}, concurrency: {args.concurrency}, voice share: {args.voice_share:.0%}, "
+        f"llm ttft: {args.ttft * 1000:.0f}ms @ {args.tokens_per_second:.0f} tokens/s"
+    )
+    print(
+        f"completed={completed} rejected={results.rejected} errors={results.errors} timeouts={results.timeouts} "
+        f"throughput={summary['throughput_per_second']:.2f} turns/s over {elapsed:.1f}s"
+    )
+    print(
+        f"{'time to first chunk':<22} p50={summary['first_chunk_p50_ms']:8.1f}ms "
+        f"p95={summary['first_chunk_p95_ms']:8.1f}ms p99={summary['first_chunk_p99_ms']:8.1f}ms"
+    )
+    print(
+        f"{'end to end':<22} p50={summary['end_to_end_p50_ms']:8.1f}ms "
+        f"p95={summary['end_to_end_p95_ms']:8.1f}ms p99={summary['end_to_end_p99_ms']:8.1f}ms"
+    )
+    print(
+        f"{'event loop lag':<22} p50={summary['loop_lag_p50_ms']:8.2f}ms "
+        f"p99={summary['loop_lag_p99_ms']:8.2f}ms max={summary['loop_lag_max_ms']:8.2f}ms"
+    )
+    return summary
+
+
+async def run(args) -> Optional[Dict[str, float]]:
+    from benchmarks.load.fakes import MessageSink
+
+    random.seed(args.seed)
+    companies = [uuid.uuid4() for _ in range(args.companies)]
+    routes = parse_routes(args.routes)
+
+    sink = MessageSink()
+    configure_environment(args, args.sink_port)
+    register_fakes(args, companies)
+
+    from src.app.interface.fastapi.server import create_fastapi_app
+
+    sink_task = await serve(sink.app, args.sink_port)
+    app_task = await serve(create_fastapi_app(), args.port)
+
+    results = Results()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited():
+        async with semaphore:
+            await turn(
+                client=client,
+                sink=sink,
+                app_port=args.port,
+                company_id=random.choice(companies),
+                route=random.choices(list(routes), weights=list(routes.values()))[0],
+                voice=random.random() < args.voice_share,
+                timeout=args.timeout,
+                results=results
+            )
+
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+            with LagMonitor() as lag:
+                start = time.perf_counter()
+                await asyncio.gather(*(limited() for _ in range(args.requests)))
+                elapsed = time.perf_counter() - start
+
+        summary = report(args, results, elapsed, lag.samples)
+        if args.json:
+            with open(args.json, "w") as file:
+                json.dump(summary, file, indent=2)
+        return summary
+
+    finally:
+        for task in (app_task, sink_task):
+            task.server.should_exit = True
+            await task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--voice-share", type=float, default=0.0)
+    parser.add_argument("--routes", default="general:0.5,company:0.2,both:0.2,none:0.1")
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--ttft", type=float, default=0.4)
+    parser.add_argument("--tokens-per-second", type=float, default=60)
+    parser.add_argument("--tokens", type=int, default=80)
+    parser.add_argument("--structured-latency", type=float, default=0.3)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.01)
+    parser.add_argument("--tts-latency", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--port", type=int, default=8811)
+    parser.add_argument("--sink-port", type=int, default=8812)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Write the summary to this file, e.g. to keep a baseline")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
@@ -0,0 +1,75 @@
+"""
+Search latency of the in-process memory-mapped index for a synthetic corpus, brute force and HNSW (when hnswlib
+is installed), with recall of HNSW against the exact brute force results.
+
+Usage:
+    python -m benchmarks.local_vector_index --points 20000 --dimensions 3072 --queries 200
+"""
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+from benchmarks.stats import report
+from src.llm.infrastructure.numpy.vector_repository import MmapVectorRepository, hnswlib, write_snapshot
+
+NAMESPACE = "legal_benchmark"
+
+
+async def measure(repository: MmapVectorRepository, queries: np.ndarray, top_k: int):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        found = await repository.similarity_search(query_vector=query.tolist(), top_k=top_k, namespace=NAMESPACE)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([result.text for result in found])
+    return latencies, results
+
+
+async def run(points: int, dimensions: int, queries: int, top_k: int):
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((points, dimensions), dtype=np.float32)
+    query_vectors = rng.standard_normal((queries, dimensions), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        write_snapshot(
+            directory=f"{root}/{NAMESPACE}",
+            ids=list(range(points)),
+            vectors=vectors,
+            payloads=({"text": f"article {index}", "metadata": {"article": index}} for index in range(points)),
+            hnsw=hnswlib is not None
+        )
+        print(f"points: {points}, dimensions: {dimensions}, snapshot written in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        brute_force = MmapVectorRepository(root=root, namespaces=[NAMESPACE], use_hnsw=False)
+        print(f"mmap load: {(time.perf_counter() - start) * 1000:.1f}ms")
+        latencies, exact = await measure(brute_force, query_vectors, top_k)
+        report("brute force", latencies, width=12)
+        await brute_force.close()
+
+        if hnswlib is None:
+            print("hnswlib not installed, skipping HNSW")
+            return
+
+        hnsw = MmapVectorRepository(root=root, namespaces=[NAMESPACE], use_hnsw=True)
+        latencies, approximate = await measure(hnsw, query_vectors, top_k)
+        recall = statistics.mean(len(set(a) & set(e)) / len(e) for a, e in zip(approximate, exact))
+        report("hnsw", latencies, width=12)
+        print(f"hnsw recall@{top_k}: {recall:.3f}")
+        await hnsw.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=3072)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=4)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.points, args.dimensions, args.queries, args.top_k))
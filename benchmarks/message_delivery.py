@@ -0,0 +1,161 @@
+"""
+Final message delivery to the main server: a new client per turn (the previous handler)
+vs the pooled outbox with retries, optionally batched.
+
+Starts a stub main server on localhost that adds latency and fails a share of requests with 503.
+
+Usage:
+    python -m benchmarks.message_delivery --messages 500 --failure-rate 0.05
+    python -m benchmarks.message_delivery --messages 500 --batch
+"""
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from benchmarks.stats import percentile
+from src.llm.infrastructure.httpx.message_delivery import HttpMessageDeliveryService
+from src.shared.utils.http.get_hmac_header import generate_hmac_headers
+from src.shared.utils.metrics import Metrics
+
+HMAC_SECRET = "benchmark-secret"
+BATCH_PATH = "/messages/internal/batch"
+
+
+def create_stub_main_server(latency: float, failure_rate: float) -> Starlette:
+    # chat id -> time the message was accepted
+    received = {"accepted": {}, "requests": 0}
+
+    async def respond(chat_ids) -> JSONResponse:
+        received["requests"] += 1
+        await asyncio.sleep(latency)
+        if random.random() < failure_rate:
+            return JSONResponse({"detail": "unavailable"}, status_code=503)
+
+        for chat_id in chat_ids:
+            received["accepted"][str(chat_id)] = time.perf_counter()
+        return JSONResponse({"detail": "created"}, status_code=201)
+
+    async def message(request: Request):
+        await request.json()
+        return await respond([request.path_params["chat_id"]])
+
+    async def batch(request: Request):
+        body = await request.json()
+        return await respond([message["chat_id"] for message in body["messages"]])
+
+    app = Starlette(routes=[
+        Route(BATCH_PATH, batch, methods=["POST"]),
+        Route("/messages/internal/{chat_id}", message, methods=["POST"])
+    ])
+    app.state.received = received
+    return app
+
+
+async def per_turn_client(endpoint: str, messages: int):
+    """The previous delivery: new client, new connection and new signature for every turn, no retries"""
+    latencies, failures = [], 0
+
+    async def deliver(chat_id: int):
+        nonlocal failures
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            res = await client.post(
+                f"{endpoint}/messages/internal/{chat_id}",
+                headers=generate_hmac_headers(HMAC_SECRET),
+                json={"sender": "agent", "message_type": "ai", "text": "final answer"}
+            )
+        if res.status_code != 201:
+            failures += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(deliver(chat_id) for chat_id in range(messages)))
+    return latencies, failures, time.perf_counter() - start
+
+
+async def pooled_outbox(endpoint: str, received, messages: int, batch: bool):
+    received["accepted"].clear()
+    requests_before = received["requests"]
+    service = HttpMessageDeliveryService(
+        endpoint=endpoint,
+        hmac_secret=HMAC_SECRET,
+        sender="agent",
+        backoff_base=0.05,
+        batch_path=BATCH_PATH if batch else None
+    )
+    await service.start()
+
+    queued_at = {}
+    start = time.perf_counter()
+    for chat_id in range(messages):
+        queued_at[str(chat_id)] = time.perf_counter()
+        await service.deliver(chat_id, "final answer")
+    await service.close(timeout=60)
+    elapsed = time.perf_counter() - start
+
+    accepted = received["accepted"]
+    latencies = [(accepted[chat_id] - queued) * 1000 for chat_id, queued in queued_at.items() if chat_id in accepted]
+    failures = messages - len(accepted)
+    retries = int(Metrics.get("message_delivery_attempts_total", {"outcome": "http_503"}))
+    requests = received["requests"] - requests_before
+    return latencies, failures, elapsed, retries, requests
+
+
+def report(label: str, latencies, failures: int, elapsed: float, messages: int, retries: int = 0):
+    print(
+        f"{label:<22} delivered={messages - failures:5d} failed={failures:4d} retries={int(retries):4d} "
+        f"p50={percentile(latencies, 50):7.1f}ms p99={percentile(latencies, 99):7.1f}ms "
+        f"mean={statistics.mean(latencies):7.1f}ms total={elapsed:6.2f}s"
+    )
+
+
+async def run(messages: int, latency: float, failure_rate: float, port: int, batch: bool):
+    app = create_stub_main_server(latency, failure_rate)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    endpoint = f"http://127.0.0.1:{port}"
+    try:
+        print(f"messages: {messages}, server latency: {latency * 1000:.0f}ms, failure rate: {failure_rate:.0%}")
+
+        latencies, failures, elapsed = await per_turn_client(endpoint, messages)
+        report("client per turn", latencies, failures, elapsed, messages)
+
+        Metrics.clear()
+        latencies, failures, elapsed, retries, _ = await pooled_outbox(endpoint, app.state.received, messages, batch=False)
+        report("pooled outbox", latencies, failures, elapsed, messages, retries)
+
+        if batch:
+            Metrics.clear()
+            latencies, failures, elapsed, retries, requests = await pooled_outbox(
+                endpoint, app.state.received, messages, batch=True
+            )
+            report("pooled outbox, batched", latencies, failures, elapsed, messages, retries)
+            print(f"batched requests sent: {requests}")
+
+    finally:
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.messages, args.latency, args.failure_rate, args.port, args.batch))
@@ -0,0 +1,129 @@
+"""
+Time to first chunk on dual-branch turns: researchers invoked to completion then aggregated (current path)
+vs progressive aggregation, which streams the first researcher and appends an addendum.
+
+LLM calls are simulated with a fixed time to first token and a fixed token rate.
+
+Usage:
+    python -m benchmarks.progressive_aggregation --turns 20 --ttft 0.6 --tokens-per-second 60
+"""
+import time
+import asyncio
+import argparse
+import statistics
+
+from src.llm.application.agents.aggregator_agent import ResearchAggregator
+from src.llm.application.agents.company_research_agent import CompanyLegalResearcher
+from src.llm.application.agents.general_legal_agent import GeneralLegalResearcher
+from src.llm.application.agents.progressive_aggregator_agent import ProgressiveAggregator
+from src.llm.application.services.prompt_service import PromptService
+from src.llm.application.use_cases.speculative_retrieval import SpeculativeRetrieval
+from src.llm.domain.models import ContextOrchestratorOutput
+from src.llm.infrastructure.langgraph.warmup import StubSearchForContext, create_stub_state
+
+
+class SimulatedLlmService:
+    def __init__(self, ttft: float, tokens_per_second: float, tokens: int):
+        self.ttft = ttft
+        self.interval = 1 / tokens_per_second
+        self.tokens = tokens
+
+    async def generate_stream(self, prompt, temperature: float = 0.7, max_tokens: int = None):
+        await asyncio.sleep(self.ttft)
+        for index in range(self.tokens):
+            await asyncio.sleep(self.interval)
+            yield f" token{index}" + ("." if index % 15 == 14 else "")
+
+    async def invoke(self, prompt, temperature: float = 0.7, max_tokens: int = None) -> str:
+        return "".join([chunk async for chunk in self.generate_stream(prompt)])
+
+
+class RecordingStreaming:
+    def __init__(self):
+        self.first_chunk_at = None
+
+    async def execute(self, ws_connection_id, text: str, voice: bool = False, type: str = "audio_response"):
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.perf_counter()
+
+
+def create_agents(llm_service: SimulatedLlmService, streaming: RecordingStreaming):
+    prompt_service = PromptService()
+    speculative_retrieval = SpeculativeRetrieval(search_for_context=StubSearchForContext())
+    researchers = [
+        researcher(
+            prompt_service=prompt_service,
+            llm_service=llm_service,
+            streaming=streaming,
+            speculative_retrieval=speculative_retrieval
+        )
+        for researcher in (GeneralLegalResearcher, CompanyLegalResearcher)
+    ]
+    aggregator = ResearchAggregator(prompt_service=prompt_service, llm_service=llm_service, streaming=streaming)
+    progressive = ProgressiveAggregator(
+        prompt_service=prompt_service,
+        llm_service=llm_service,
+        streaming=streaming,
+        general_legal_researcher=researchers[0],
+        company_legal_researcher=researchers[1]
+    )
+    return researchers, aggregator, progressive
+
+
+def dual_branch_state():
+    state = create_stub_state(general_law=True, company_law=True)
+    state["context_orchestrator_response"] = ContextOrchestratorOutput(general_law=True, company_law=True)
+    return state
+
+
+async def sequential_turn(llm_service: SimulatedLlmService):
+    streaming = RecordingStreaming()
+    (general, company), aggregator, _ = create_agents(llm_service, streaming)
+    state = dual_branch_state()
+
+    start = time.perf_counter()
+    general_response, company_response = await asyncio.gather(general.interact(state), company.interact(state))
+    state["general_legal_response"] = general_response
+    state["company_legal_response"] = company_response
+    await aggregator.interact(state)
+    return streaming.first_chunk_at - start, time.perf_counter() - start
+
+
+async def progressive_turn(llm_service: SimulatedLlmService):
+    streaming = RecordingStreaming()
+    _, _, progressive = create_agents(llm_service, streaming)
+
+    start = time.perf_counter()
+    await progressive.interact(dual_branch_state())
+    return streaming.first_chunk_at - start, time.perf_counter() - start
+
+
+def report(label: str, samples):
+    first_chunk = [sample[0] * 1000 for sample in samples]
+    total = [sample[1] * 1000 for sample in samples]
+    print(
+        f"{label:<24} first chunk mean={statistics.mean(first_chunk):8.1f}ms "
+        f"turn mean={statistics.mean(total):8.1f}ms"
+    )
+
+
+async def run(turns: int, ttft: float, tokens_per_second: float, tokens: int):
+    llm_service = SimulatedLlmService(ttft, tokens_per_second, tokens)
+
+    sequential = [await sequential_turn(llm_service) for _ in range(turns)]
+    progressive = [await progressive_turn(llm_service) for _ in range(turns)]
+
+    print(f"turns: {turns}, ttft: {ttft * 1000:.0f}ms, {tokens_per_second:.0f} tokens/s, {tokens} tokens per call")
+    report("invoke then aggregate", sequential)
+    report("progressive aggregation", progressive)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--ttft", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--tokens", type=int, default=120)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.turns, args.ttft, args.tokens_per_second, args.tokens))
@@ -0,0 +1,114 @@
+"""
+Event-loop responsiveness under parallel vector searches: sync QdrantClient called from async code
+(the previous repository) vs the pooled AsyncQdrantClient repository.
+
+Creates a throwaway collection of random vectors on the Qdrant instance at QDRANT_URL and drops it afterwards.
+
+Usage:
+    QDRANT_URL=http://localhost:6333 python -m benchmarks.qdrant_concurrency --concurrency 32 --rounds 10
+"""
+import os
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import statistics
+
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+from benchmarks.stats import LagMonitor, percentile
+from src.llm.infrastructure.qdrant.vector_repository import QdrantVectorRepository
+
+
+def random_vector(dimensions: int):
+    return [random.uniform(-1, 1) for _ in range(dimensions)]
+
+
+class BlockingRepository:
+    """Reproduces the previous repository: an async method calling the synchronous client"""
+    def __init__(self, client: QdrantClient):
+        self.client = client
+
+    async def similarity_search(self, namespace, query_vector, top_k=4):
+        return self.client.query_points(
+            collection_name=namespace,
+            query=query_vector,
+            limit=top_k,
+            with_payload=True
+        ).points
+
+
+async def drive(repository, collection: str, dimensions: int, concurrency: int, rounds: int):
+    latencies = []
+
+    async def search():
+        start = time.perf_counter()
+        await repository.similarity_search(
+            namespace=collection,
+            query_vector=random_vector(dimensions),
+            top_k=4
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    with LagMonitor() as monitor:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await asyncio.gather(*[search() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.02)
+
+    return latencies, monitor.samples, concurrency * rounds / elapsed
+
+
+async def run(args):
+    url = os.getenv("QDRANT_URL")
+    api_key = os.getenv("QDRANT_API_KEY")
+    collection = f"bench_concurrency_{uuid.uuid4().hex[:8]}"
+
+    sync_client = QdrantClient(url=url, api_key=api_key)
+    async_client = AsyncQdrantClient(url=url, api_key=api_key)
+
+    sync_client.create_collection(
+        collection_name=collection,
+        vectors_config=models.VectorParams(size=args.dimensions, distance=models.Distance.COSINE)
+    )
+    try:
+        for offset in range(0, args.points, 256):
+            sync_client.upsert(
+                collection_name=collection,
+                points=[
+                    models.PointStruct(id=index, vector=random_vector(args.dimensions), payload={"text": f"chunk {index}"})
+                    for index in range(offset, min(offset + 256, args.points))
+                ]
+            )
+
+        for label, repository in [
+            ("sync client (blocking)", BlockingRepository(sync_client)),
+            ("AsyncQdrantClient", QdrantVectorRepository(client=async_client))
+        ]:
+            latencies, lag, throughput = await drive(
+                repository, collection, args.dimensions, args.concurrency, args.rounds
+            )
+            print(
+                f"{label:<24} searches/s={throughput:8.1f} "
+                f"search p50={percentile(latencies, 50):7.2f}ms p99={percentile(latencies, 99):7.2f}ms "
+                f"loop lag p50={percentile(lag, 50):7.2f}ms p99={percentile(lag, 99):7.2f}ms "
+                f"max={max(lag):7.2f}ms mean={statistics.mean(lag):6.2f}ms"
+            )
+
+    finally:
+        sync_client.delete_collection(collection_name=collection)
+        sync_client.close()
+        await async_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--dimensions", type=int, default=3072)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
@@ -0,0 +1,41 @@
+import time
+import asyncio
+import statistics
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile, NaN when there are no samples"""
+    if not samples:
+        return float("nan")
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label: str, samples, width: int = 28):
+    print(
+        f"{label:<{width}} mean={statistics.mean(samples):8.3f}ms "
+        f"p50={percentile(samples, 50):8.3f}ms p99={percentile(samples, 99):8.3f}ms"
+    )
+
+
+class LagMonitor:
+    """Measures how late a 5ms periodic timer fires, i.e. how long the loop was blocked"""
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = []
+        self.__task = None
+
+    async def __run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append((time.perf_counter() - start - self.interval) * 1000)
+
+    def __enter__(self):
+        self.__task = asyncio.create_task(self.__run())
+        return self
+
+    def __exit__(self, *args):
+        self.__task.cancel()
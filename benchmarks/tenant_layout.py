@@ -0,0 +1,176 @@
+"""
+Per-company collections vs one tenant-partitioned collection at many tenants: setup time, server memory and
+filtered search latency. Needs a Qdrant server at QDRANT_URL, every collection it creates starts with "bench".
+--location :memory: runs a small smoke test in process, where memory and latency are not meaningful.
+
+Usage:
+    python -m benchmarks.tenant_layout --tenants 10000 --documents 20 --dimensions 256
+    python -m benchmarks.tenant_layout --location :memory: --tenants 50
+"""
+import os
+import re
+import time
+import asyncio
+import argparse
+from typing import Optional
+
+import httpx
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+
+from benchmarks.stats import percentile
+from src.llm.application.services.tenant_vector_repository import TENANT_FIELD, TenantPartitionedVectorRepository
+from src.llm.domain.namespaces import get_company_id, get_company_namespace
+from src.llm.domain.repositorties.vector_repository import SearchQuery
+from src.llm.infrastructure.qdrant.collections import create_tenant_collection
+from src.llm.infrastructure.qdrant.vector_repository import QdrantVectorRepository
+
+SHARED_COLLECTION = "bench_tenants"
+
+
+def tenant(index: int) -> str:
+    return f"bench-{index:06d}"
+
+
+async def server_memory(url: Optional[str]) -> Optional[float]:
+    """Resident memory from the Qdrant Prometheus endpoint, in MB"""
+    if not url:
+        return None
+
+    try:
+        async with httpx.AsyncClient(headers={"api-key": os.getenv("QDRANT_API_KEY") or ""}) as client:
+            response = await client.get(f"{url.rstrip('/')}/metrics")
+        match = re.search(r"^memory_resident_bytes\s+([\d.e+]+)", response.text, re.MULTILINE)
+        return float(match.group(1)) / 2**20 if match else None
+    except httpx.HTTPError:
+        return None
+
+
+def points(rng: np.random.Generator, index: int, documents: int, dimensions: int, partitioned: bool):
+    vectors = rng.standard_normal((documents, dimensions), dtype=np.float32)
+    return [
+        models.PointStruct(
+            id=index * documents + document,
+            vector=vector.tolist(),
+            payload={"text": f"{tenant(index)} document {document}", "metadata": {},
+                     **({TENANT_FIELD: tenant(index)} if partitioned else {})}
+        )
+        for document, vector in enumerate(vectors)
+    ]
+
+
+async def setup_collections(client: AsyncQdrantClient, args) -> float:
+    rng = np.random.default_rng(1)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def create(index: int):
+        async with semaphore:
+            namespace = get_company_namespace(tenant(index))
+            await client.create_collection(
+                collection_name=namespace,
+                vectors_config=models.VectorParams(size=args.dimensions, distance=models.Distance.COSINE)
+            )
+            await client.upsert(namespace, points=points(rng, index, args.documents, args.dimensions, False))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[create(index) for index in range(args.tenants)])
+    return time.perf_counter() - start
+
+
+async def setup_partitioned(client: AsyncQdrantClient, args) -> float:
+    rng = np.random.default_rng(1)
+    start = time.perf_counter()
+    await create_tenant_collection(client, SHARED_COLLECTION, args.dimensions, tenant_field=TENANT_FIELD)
+
+    batch, pending = [], []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def upsert(batch):
+        async with semaphore:
+            await client.upsert(SHARED_COLLECTION, points=batch)
+
+    for index in range(args.tenants):
+        batch.extend(points(rng, index, args.documents, args.dimensions, True))
+        if len(batch) >= 1000:
+            pending.append(asyncio.create_task(upsert(batch)))
+            batch = []
+    if batch:
+        pending.append(asyncio.create_task(upsert(batch)))
+    await asyncio.gather(*pending)
+    return time.perf_counter() - start
+
+
+async def measure_search(repository, args):
+    rng = np.random.default_rng(2)
+    latencies = []
+    for _ in range(args.searches):
+        namespace = get_company_namespace(tenant(int(rng.integers(args.tenants))))
+        start = time.perf_counter()
+        results = await repository.batch_search([
+            SearchQuery(namespace=namespace, query_vector=rng.standard_normal(args.dimensions).tolist(), top_k=4)
+        ])
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert all(result.text.startswith(get_company_id(namespace)) for result in results[0])
+    return latencies
+
+
+async def cleanup(client: AsyncQdrantClient):
+    collections = await client.get_collections()
+    for collection in collections.collections:
+        if collection.name.startswith("bench"):
+            await client.delete_collection(collection.name)
+
+
+async def run(args):
+    url = None if args.location else os.getenv("QDRANT_URL")
+    client = AsyncQdrantClient(location=args.location) if args.location \
+        else AsyncQdrantClient(url=url, api_key=os.getenv("QDRANT_API_KEY"), timeout=120)
+
+    try:
+        await cleanup(client)
+        baseline_memory = await server_memory(url)
+        print(f"tenants: {args.tenants}, documents per tenant: {args.documents}, dimensions: {args.dimensions}")
+        print(f"{'layout':<22} {'setup s':>9} {'memory MB':>10} {'list ms':>8} {'p50 ms':>8} {'p99 ms':>8}")
+
+        layouts = [
+            ("collection per tenant", setup_collections, QdrantVectorRepository(client)),
+            ("partitioned", setup_partitioned, TenantPartitionedVectorRepository(
+                QdrantVectorRepository(client), SHARED_COLLECTION, get_company_id
+            ))
+        ]
+        for label, setup, repository in layouts:
+            setup_seconds = await setup(client, args)
+            memory = await server_memory(url)
+
+            start = time.perf_counter()
+            await client.get_collections()
+            list_ms = (time.perf_counter() - start) * 1000
+
+            latencies = await measure_search(repository, args)
+            memory_label = f"{memory - baseline_memory:10.1f}" if memory is not None and baseline_memory is not None else f"{'n/a':>10}"
+            print(
+                f"{label:<22} {setup_seconds:9.1f} {memory_label} {list_ms:8.1f} "
+                f"{percentile(latencies, 50):8.2f} {percentile(latencies, 99):8.2f}"
+            )
+            if not args.keep:
+                await cleanup(client)
+                baseline_memory = await server_memory(url)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenants", type=int, default=10000)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--searches", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--location", help=":memory: for an in-process smoke run")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
@@ -0,0 +1,49 @@
+"""
+Per-request workflow overhead: compiling the graph on every request vs reusing the shared compiled graph.
+
+Usage:
+    python -m benchmarks.workflow_compile --requests 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.stats import report
+from src.llm.infrastructure.langgraph.warmup import create_stub_workflow_service, create_stub_state
+
+
+async def run(requests: int):
+    service = create_stub_workflow_service()
+
+    compile_only, compile_and_invoke, shared_invoke = [], [], []
+
+    for _ in range(requests):
+        start = time.perf_counter()
+        graph = service.create_workflow()
+        compiled = time.perf_counter()
+        await graph.ainvoke(create_stub_state(general_law=True, company_law=True))
+        done = time.perf_counter()
+
+        compile_only.append((compiled - start) * 1000)
+        compile_and_invoke.append((done - start) * 1000)
+
+    service.get_workflow()
+    for _ in range(requests):
+        start = time.perf_counter()
+        await service.get_workflow().ainvoke(create_stub_state(general_law=True, company_law=True))
+        shared_invoke.append((time.perf_counter() - start) * 1000)
+
+    print(f"requests: {requests} (stub agents, dual-branch route)")
+    report("compile only", compile_only)
+    report("compile per request", compile_and_invoke)
+    report("shared compiled graph", shared_invoke)
+    print(f"overhead removed per request: {statistics.mean(compile_and_invoke) - statistics.mean(shared_invoke):.3f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.requests))
@@ -1,21 +1,38 @@
 from uuid import UUID
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.app.setup.startup_event import startup_event
 from src.llm.interface.fastapi import interactions_routes
+from src.llm.interface.fastapi import namespaces_routes
+from src.llm.interface.fastapi import documents_routes
 
 from src.llm.interface.fastapi import interactions_ws
 from src.web_sockets.connections import WebsocketConnectionsContainer
 from src.shared.dependencies.container import Container
+from src.shared.utils.metrics import Metrics
+from src.llm.dependencies.services import get_workflow_service, get_workflow_scheduler, get_message_delivery_service
+from src.llm.infrastructure.langgraph.warmup import warm_up_workflow
 
 
 def create_fastapi_app():
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         startup_event()
+        # Compile the shared graph once so requests never pay for it
+        get_workflow_service().get_workflow()
+        await warm_up_workflow()
+        await get_message_delivery_service().start()
+        get_workflow_scheduler().start()
         yield
+        await get_workflow_scheduler().stop()
+        await get_message_delivery_service().close()
+        # Only services this process actually built are closed, none is created just to be closed
+        for instance_key in ["vector_repository", "llm_service", "embedding_service", "document_parser"]:
+            if Container.is_registered(instance_key):
+                await Container.resolve(instance_key).close()
 
     app = FastAPI(lifespan=lifespan)
 
@@ -36,6 +53,14 @@ def create_fastapi_app():
         """
         return {"status": "ok"}
 
+    @app.get("/metrics", tags=["Internal"], response_class=PlainTextResponse)
+    async def metrics():
+        """
+        ## Metrics
+        Process metrics in the Prometheus text format.
+        """
+        return PlainTextResponse(Metrics.render())
+
     @app.get("/connections", tags=["Internal"])
     async def get_websocket_connections():
         connections = WebsocketConnectionsContainer._active_connections
@@ -69,6 +94,8 @@ def create_fastapi_app():
 
 
     app.include_router(interactions_routes.router)
+    app.include_router(namespaces_routes.router)
+    app.include_router(documents_routes.router)
     app.include_router(interactions_ws.router)
 
 
@@ -32,7 +32,7 @@ class ResearchAggregator:
         # Join all available context
         combined_context = "\n\n".join(context_parts) if context_parts else "No additional research context available."
         
-        system_message = f"""
+        system_message = """
         You are a Legal Research Aggregator. Synthesize research from multiple sources into a comprehensive response for the user's legal query.
 
         ## Guidelines:
@@ -42,16 +42,15 @@ class ResearchAggregator:
         - Provide actionable guidance with proper citations
         - **Format your response using valid Markdown. Use headings, bullet points, numbers, indentations, and bold or italics for clarity.**
 
-        ## Available Research:
-        {combined_context}
-
-        Synthesize the above research to provide a comprehensive legal response.
+        Synthesize the research provided with the user's query to give a comprehensive legal response.
         """
 
-        prompt = self.__prompt_service.build_prompt(
+        prompt = self.__prompt_service.build_messages(
             system_message=system_message,
             chat_history=state["chat_history"],
-            input=state["input"]
+            context=f"## Available Research:\n{combined_context}",
+            input=state["input"],
+            budget="research_aggregator"
         )
 
         return prompt
@@ -0,0 +1,104 @@
+import re
+import asyncio
+import logging
+from typing import Optional
+from src.llm.application.services.semantic_cache_service import SemanticResponseCache
+from src.llm.domain.state import State
+from src.web_sockets.application.use_cases.ws_streaming import WsStreaming
+from src.shared.utils.decorators.error_hanlder import error_handler
+logger = logging.getLogger(__name__)
+
+class CachedResponseAgent:
+    __MODULE = "cached_response.agent"
+    def __init__(
+        self,
+        semantic_cache: SemanticResponseCache,
+        streaming: WsStreaming,
+        stream_interval: float = 0.02,
+        max_history: int = 0
+    ):
+        self.__semantic_cache = semantic_cache
+        self.__streaming = streaming
+        self.__stream_interval = stream_interval
+        self.__max_history = max_history
+
+    def __is_cacheable(self, state: State) -> bool:
+        # Answers to follow-up questions depend on the conversation, not only on the input
+        return len(state.get("chat_history") or []) <= self.__max_history
+
+    async def __stream(self, state: State, response: str):
+        if state.get("voice"):
+            sentences = [
+                sentence.strip() for sentence in re.split(r"(?<=[.?!])\s+", response) if sentence.strip()
+            ]
+            for sentence in sentences:
+                try:
+                    await self.__streaming.execute(
+                        ws_connection_id=state["chat_id"],
+                        text=sentence,
+                        voice=True
+                    )
+                except Exception as e:
+                    logger.error(f"error sending sentence: {sentence} :::: {str(e)}")
+
+            try:
+                await self.__streaming.execute(
+                    ws_connection_id=state["chat_id"],
+                    text="END STREAM",
+                    voice=True,
+                    type="END"
+                )
+            except Exception as e:
+                logger.error(f"error sending end of stream :::: {str(e)}")
+            return
+
+        # Replay word by word at roughly model speed so clients see the usual stream
+        for chunk in re.findall(r"\s*\S+", response):
+            try:
+                await self.__streaming.execute(
+                    ws_connection_id=state["chat_id"],
+                    text=chunk,
+                    voice=False
+                )
+            except Exception as e:
+                logger.error(f"error sending chunk: {chunk} :::: {str(e)}")
+
+            await asyncio.sleep(self.__stream_interval)
+
+    @error_handler(module=__MODULE)
+    async def interact(self, state: State) -> Optional[str]:
+        if not self.__is_cacheable(state):
+            return None
+
+        try:
+            response = await self.__semantic_cache.lookup(
+                input=state["input"],
+                company_id=state["company_id"]
+            )
+        except Exception as e:
+            logger.warning(f"semantic cache lookup failed :::: {str(e)}")
+            return None
+
+        if response:
+            await self.__stream(state, response)
+
+        return response
+
+    async def remember(self, state: State) -> None:
+        orchestrator_response = state.get("context_orchestrator_response")
+        if not self.__is_cacheable(state) or state.get("cache_hit") or not orchestrator_response:
+            return
+
+        # Fallback answers are not worth caching
+        if not (orchestrator_response.general_law or orchestrator_response.company_law):
+            return
+
+        try:
+            await self.__semantic_cache.store(
+                input=state["input"],
+                response=state["final_response"],
+                company_id=state["company_id"],
+                company_scoped=orchestrator_response.company_law
+            )
+        except Exception as e:
+            logger.warning(f"semantic cache store failed :::: {str(e)}")
@@ -1,12 +1,21 @@
+import re
 import logging
+from typing import AsyncGenerator, Optional
+from src.llm.application.services.namespace_size_cache import NamespaceSizeCache
 from src.llm.application.services.prompt_service import PromptService
 from src.llm.domain.services.llm_service import LlmService
 from src.llm.domain.state import State
 from src.web_sockets.application.use_cases.ws_streaming import WsStreaming
-from src.llm.application.use_cases.search_for_context import SearchForContext
+from src.llm.application.use_cases.speculative_retrieval import SpeculativeRetrieval, COMPANY_BRANCH
+from src.llm.domain.namespaces import get_company_namespace
 from src.shared.utils.decorators.error_hanlder import error_handler
+from src.shared.utils.metrics import Metrics
 logger = logging.getLogger(__name__)
 
+Metrics.describe("company_research_short_circuits_total", "Company research answered without search or LLM because the company has no documents")
+
+NO_DOCUMENTS_RESPONSE = "I've found no company documents to analyze. Upload your company's documents to include them in the research."
+
 class CompanyLegalResearcher:
     __MODULE = "company_research.agent"
     def __init__(
@@ -14,12 +23,50 @@ class CompanyLegalResearcher:
         prompt_service: PromptService, 
         llm_service: LlmService,
         streaming: WsStreaming,
-        search_for_context: SearchForContext
+        speculative_retrieval: SpeculativeRetrieval,
+        namespace_cache: Optional[NamespaceSizeCache] = None
     ):
         self.__prompt_service = prompt_service
         self.__llm_service = llm_service
         self.__streaming = streaming
-        self.__search_for_context = search_for_context
+        self.__speculative_retrieval = speculative_retrieval
+        self.__namespace_cache = namespace_cache
+
+    async def __has_no_documents(self, state: State) -> bool:
+        if not self.__namespace_cache:
+            return False
+
+        if await self.__namespace_cache.is_empty(get_company_namespace(state["company_id"])):
+            Metrics.increment("company_research_short_circuits_total")
+            return True
+
+        return False
+
+    async def __send_no_documents(self, state: State) -> None:
+        if state.get("voice"):
+            for sentence in re.split(r"(?<=[.?!])\s+", NO_DOCUMENTS_RESPONSE):
+                await self.__streaming.execute(
+                    ws_connection_id=state["chat_id"],
+                    text=sentence,
+                    voice=True
+                )
+
+            await self.__streaming.execute(
+                ws_connection_id=state["chat_id"],
+                text="END STREAM",
+                voice=True,
+                type="END"
+            )
+            return
+
+        try:
+            await self.__streaming.execute(
+                ws_connection_id=state["chat_id"],
+                text=NO_DOCUMENTS_RESPONSE,
+                voice=False
+            )
+        except Exception as e:
+            logger.error(f"error sending chunk: {NO_DOCUMENTS_RESPONSE} :::: {str(e)}")
 
     async def __get_prompt(self, state: State):
         system_message = """
@@ -41,23 +88,45 @@ class CompanyLegalResearcher:
 
         If there is no context found you will state that you've found no company documnets to analyze
         """
-        collection_name = f"{state['company_id']}_company_docs"
-
-        context = await self.__search_for_context.execute(
-            input=state["input"],
-            namespace=collection_name
+        context = await self.__speculative_retrieval.get_context(
+            state=state,
+            branch=COMPANY_BRANCH,
+            namespace=get_company_namespace(state["company_id"])
         )
 
-        prompt = self.__prompt_service.build_prompt(
+        prompt = self.__prompt_service.build_messages(
             system_message=system_message,
             input=state["input"],
-            context=context
+            context=context,
+            budget="company_legal_research"
         )
 
         return prompt
 
+    async def stream(self, state: State) -> AsyncGenerator[str, None]:
+        """
+        Yields the research as it is generated without sending it to the client.
+        Only dual-branch turns stream research, at the temperature their non-progressive invoke uses.
+        """
+        if await self.__has_no_documents(state):
+            yield NO_DOCUMENTS_RESPONSE
+            return
+
+        prompt = await self.__get_prompt(state)
+        async for chunk in self.__llm_service.generate_stream(
+            prompt=prompt,
+            temperature=0.0
+        ):
+            yield chunk
+
     @error_handler(module=__MODULE)
     async def interact(self, state: State):
+        if await self.__has_no_documents(state):
+            # Alone it is the final answer, alongside general research the aggregator only needs the finding
+            if not state["context_orchestrator_response"].general_law:
+                await self.__send_no_documents(state)
+            return NO_DOCUMENTS_RESPONSE
+
         prompt = await self.__get_prompt(state)
         
         if not state["context_orchestrator_response"].general_law:
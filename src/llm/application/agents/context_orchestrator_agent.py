@@ -1,14 +1,40 @@
+import random
+import asyncio
+import logging
+from typing import Optional
+from src.llm.application.services.namespace_size_cache import NamespaceSizeCache
 from src.llm.application.services.prompt_service import PromptService
 from src.llm.domain.state import State
-from src.llm.domain.models import ContextOrchestratorOutput
+from src.llm.domain.models import ContextOrchestratorOutput, RouteDecision
+from src.llm.domain.namespaces import get_company_namespace
 from src.llm.domain.services.llm_service import LlmService
+from src.llm.domain.services.pre_router import PreRouter
 from src.shared.utils.decorators.error_hanlder import error_handler
+from src.shared.utils.metrics import Metrics
+logger = logging.getLogger(__name__)
+
+Metrics.describe("orchestrator_routes_total", "Routing decisions by path, fast (pre-router) or llm")
+Metrics.describe("orchestrator_pre_router_agreement_total", "Pre-router decisions compared against the LLM decision")
+Metrics.describe("orchestrator_company_branch_dropped_total", "Company branches dropped because the company has no documents")
 
 class ContextOrchestrator:
     __MODULE = "context_orchestrator.agent"
-    def __init__(self, prompt_service: PromptService, llm_service: LlmService):
+    def __init__(
+        self, 
+        prompt_service: PromptService, 
+        llm_service: LlmService,
+        pre_router: Optional[PreRouter] = None,
+        confidence_threshold: float = 0.85,
+        shadow_rate: float = 0.0,
+        namespace_cache: Optional[NamespaceSizeCache] = None
+    ):
         self.__prompt_service = prompt_service
         self.__llm_service = llm_service
+        self.__pre_router = pre_router
+        self.__confidence_threshold = confidence_threshold
+        self.__shadow_rate = shadow_rate
+        self.__shadow_tasks = set()
+        self.__namespace_cache = namespace_cache
 
     @error_handler(module=__MODULE)
     def __get_prompt(self, state: State):
@@ -36,22 +62,101 @@ class ContextOrchestrator:
         - "What's the weather today?" - general_law: False, company_law: False
         - "Help" - general_law: False, company_law: False
         """
-        prompt = self.__prompt_service.build_prompt(
+        prompt = self.__prompt_service.build_messages(
             system_message=system_message,
             chat_history=state["chat_history"],
-            input=state["input"]
+            input=state["input"],
+            budget="context_orchestrator"
         )
 
         return prompt
-
-    @error_handler(module=__MODULE)
-    async def interact(self, state: State) -> ContextOrchestratorOutput:   
+    
+    async def __invoke_llm(self, state: State) -> ContextOrchestratorOutput:
         prompt = self.__get_prompt(state)
 
-        response = await self.__llm_service.invoke_structured(
+        return await self.__llm_service.invoke_structured(
             prompt=prompt,
             response_model=ContextOrchestratorOutput,
             temperature=0.0
         )
+    
+    @staticmethod
+    def __record_agreement(decision: RouteDecision, response: ContextOrchestratorOutput):
+        Metrics.increment("orchestrator_pre_router_agreement_total", labels={
+            "source": decision.source,
+            "agreed": str(decision.output == response).lower()
+        })
+    
+    async def __shadow_check(self, state: State, decision: RouteDecision):
+        try:
+            response = await self.__invoke_llm(state)
+            self.__record_agreement(decision, response)
+        
+        except Exception as e:
+            logger.warning(f"shadow routing check failed :::: {str(e)}")
+
+    async def __pre_route(self, state: State) -> Optional[RouteDecision]:
+        if not self.__pre_router:
+            return None
+        
+        try:
+            return await self.__pre_router.route(state["input"])
+        
+        except Exception as e:
+            logger.warning(f"pre-router failed, using llm :::: {str(e)}")
+            return None
+
+    async def __drop_empty_company(
+        self,
+        response: ContextOrchestratorOutput,
+        company_empty: Optional[asyncio.Task]
+    ) -> ContextOrchestratorOutput:
+        # A company-only turn keeps its branch, the researcher answers that there is nothing to analyze
+        if company_empty is None or not (response.general_law and response.company_law):
+            return response
+
+        if not await company_empty:
+            return response
+
+        Metrics.increment("orchestrator_company_branch_dropped_total")
+        return response.model_copy(update={"company_law": False})
+
+    @error_handler(module=__MODULE)
+    async def interact(self, state: State) -> ContextOrchestratorOutput:
+        # The size lookup overlaps routing, it is usually served from the cache anyway
+        company_empty = asyncio.ensure_future(
+            self.__namespace_cache.is_empty(get_company_namespace(state["company_id"]))
+        ) if self.__namespace_cache else None
+
+        try:
+            response = await self.__route(state)
+        except Exception:
+            if company_empty:
+                company_empty.cancel()
+            raise
+
+        return await self.__drop_empty_company(response, company_empty)
+
+    async def __route(self, state: State) -> ContextOrchestratorOutput:
+        decision = await self.__pre_route(state)
+
+        # Pre-routers only see the input, a follow-up such as "¿y en ese caso?" needs the history the LLM reads,
+        # so with history their decision is only compared against the LLM's
+        if decision and decision.confidence >= self.__confidence_threshold and not state.get("chat_history"):
+            Metrics.increment("orchestrator_routes_total", labels={"path": "fast", "source": decision.source})
+
+            # Sample a share of fast-path turns against the LLM to keep measuring agreement
+            if random.random() < self.__shadow_rate:
+                task = asyncio.create_task(self.__shadow_check(state, decision))
+                self.__shadow_tasks.add(task)
+                task.add_done_callback(self.__shadow_tasks.discard)
+
+            return decision.output
+
+        response = await self.__invoke_llm(state)
+        Metrics.increment("orchestrator_routes_total", labels={"path": "llm"})
+
+        if decision:
+            self.__record_agreement(decision, response)
 
-        return response
\ No newline at end of file
+        return response
@@ -39,9 +39,10 @@ class FallBackAgent:
         If the user would like help with a legal question, encourage them to ask about those topics and provide more specific details if possible.
         """
 
-        prompt = self.__prompt_service.build_prompt(
+        prompt = self.__prompt_service.build_messages(
             system_message=system_message,
-            input=state["input"]
+            input=state["input"],
+            budget="fallback"
         )
 
         return prompt
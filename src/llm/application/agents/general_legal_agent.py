@@ -1,10 +1,11 @@
-import os
 import logging
+from typing import AsyncGenerator
 from src.llm.application.services.prompt_service import PromptService
 from src.llm.domain.services.llm_service import LlmService
 from src.llm.domain.state import State
 from src.shared.utils.decorators.error_hanlder import error_handler
-from src.llm.application.use_cases.search_for_context import SearchForContext
+from src.llm.application.use_cases.speculative_retrieval import SpeculativeRetrieval, GENERAL_BRANCH
+from src.llm.domain.namespaces import get_legal_namespace
 from src.web_sockets.application.use_cases.ws_streaming import WsStreaming
 logger = logging.getLogger(__name__)
 
@@ -15,12 +16,12 @@ class GeneralLegalResearcher:
         prompt_service: PromptService, 
         llm_service: LlmService,
         streaming: WsStreaming,
-        search_for_context: SearchForContext
+        speculative_retrieval: SpeculativeRetrieval
     ):
         self.__prompt_service = prompt_service
         self.__llm_service = llm_service
         self.__streaming = streaming
-        self.__search_for_context = search_for_context
+        self.__speculative_retrieval = speculative_retrieval
 
     @error_handler(module=__MODULE)
     async def __get_prompt(self, state: State):
@@ -41,18 +42,32 @@ class GeneralLegalResearcher:
 
         Analyze the query and provide comprehensive Mexican legal context using the available legal documents.
         """
-        context = await self.__search_for_context.execute(
-            input=state["input"],
-            namespace=os.getenv("LEGAL_COLLECTION")
+        context = await self.__speculative_retrieval.get_context(
+            state=state,
+            branch=GENERAL_BRANCH,
+            namespace=get_legal_namespace()
         )
-        prompt = self.__prompt_service.build_prompt(
+        prompt = self.__prompt_service.build_messages(
             system_message=system_message,
             input=state["input"],
-            context=context
+            context=context,
+            budget="general_legal_research"
         )
 
         return prompt
 
+    async def stream(self, state: State) -> AsyncGenerator[str, None]:
+        """
+        Yields the research as it is generated without sending it to the client.
+        Only dual-branch turns stream research, at the temperature their non-progressive invoke uses.
+        """
+        prompt = await self.__get_prompt(state)
+        async for chunk in self.__llm_service.generate_stream(
+            prompt=prompt,
+            temperature=0.0
+        ):
+            yield chunk
+
     @error_handler(module=__MODULE)
     async def interact(self, state: State):
         prompt = await self.__get_prompt(state)
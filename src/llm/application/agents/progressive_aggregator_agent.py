@@ -0,0 +1,214 @@
+import time
+import asyncio
+import logging
+from typing import AsyncGenerator, Dict, List
+from src.llm.application.agents.company_research_agent import CompanyLegalResearcher, NO_DOCUMENTS_RESPONSE
+from src.llm.application.agents.general_legal_agent import GeneralLegalResearcher
+from src.llm.application.services.prompt_service import PromptService
+from src.llm.application.use_cases.speculative_retrieval import COMPANY_BRANCH, GENERAL_BRANCH
+from src.llm.domain.services.llm_service import LlmService
+from src.llm.domain.state import State
+from src.shared.utils.decorators.error_hanlder import error_handler
+from src.shared.utils.metrics import Metrics
+from src.web_sockets.application.use_cases.ws_streaming import WsStreaming
+logger = logging.getLogger(__name__)
+
+Metrics.describe("progressive_aggregation_first_chunk_seconds", "Time from the start of dual-branch research to the first chunk sent")
+Metrics.describe("progressive_aggregation_leads_total", "Dual-branch turns by the research branch streamed first")
+
+RESEARCH_TITLES = {
+    GENERAL_BRANCH: "GENERAL LEGAL RESEARCH",
+    COMPANY_BRANCH: "COMPANY LEGAL RESEARCH"
+}
+
+class ResearchFeed:
+    """Buffers a researcher stream so it can be forwarded live or read once finished"""
+    def __init__(self, branch: str, stream: AsyncGenerator[str, None]):
+        self.branch = branch
+        self.chunks: List[str] = []
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # Set on the first chunk, or when the stream ends without any
+        self.ready = asyncio.Event()
+        self.done = asyncio.Event()
+        self.task = asyncio.create_task(self.__pump(stream))
+
+    async def __pump(self, stream: AsyncGenerator[str, None]):
+        try:
+            async for chunk in stream:
+                if not chunk:
+                    continue
+                self.chunks.append(chunk)
+                self.queue.put_nowait(chunk)
+                self.ready.set()
+
+        except Exception as e:
+            logger.error(f"{self.branch} research stream failed :::: {str(e)}")
+
+        finally:
+            self.queue.put_nowait(None)
+            self.ready.set()
+            self.done.set()
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def answers(self) -> bool:
+        # A company without documents yields a fixed finding at once, it would win the race with nothing to say
+        return bool(self.chunks) and self.chunks[0] != NO_DOCUMENTS_RESPONSE
+
+
+class ProgressiveAggregator:
+    """
+    Dual-branch research without waiting for both researchers.
+    Both researchers stream, the first one to produce output is forwarded to the client live,
+    and once the other finishes a short addendum folds its findings into the answer.
+    """
+    __MODULE = "progressive_aggregator.agent"
+    def __init__(
+        self,
+        prompt_service: PromptService,
+        llm_service: LlmService,
+        streaming: WsStreaming,
+        general_legal_researcher: GeneralLegalResearcher,
+        company_legal_researcher: CompanyLegalResearcher
+    ):
+        self.__prompt_service = prompt_service
+        self.__llm_service = llm_service
+        self.__streaming = streaming
+        self.__general_legal_researcher = general_legal_researcher
+        self.__company_legal_researcher = company_legal_researcher
+
+    def __get_prompt(self, state: State, lead: ResearchFeed, follower: ResearchFeed):
+        system_message = """
+        You are a Legal Research Aggregator. The user has already received a first answer built from one research source.
+        Complete it with the additional research, which comes from the other source.
+
+        ## Guidelines:
+        - Only add what the first answer does not already cover, never repeat it
+        - Distinguish between general law and company-specific requirements
+        - Point out where the additional research confirms, narrows or conflicts with the first answer
+        - Provide actionable guidance with proper citations
+        - Start directly with the new content, it is appended right after the first answer
+        - **Format your response using valid Markdown. Use headings, bullet points, numbers, indentations, and bold or italics for clarity.**
+        """
+
+        return self.__prompt_service.build_messages(
+            system_message=system_message,
+            chat_history=state["chat_history"],
+            context=[
+                f"## Answer already given ({RESEARCH_TITLES[lead.branch]}):\n{lead.text}",
+                f"## Additional research ({RESEARCH_TITLES[follower.branch]}):\n{follower.text}"
+            ],
+            input=state["input"],
+            budget="research_aggregator"
+        )
+
+    async def __send(self, state: State, chunk: str, sentence: str) -> str:
+        """Sends a chunk, or buffers it into sentences for voice, returning the pending sentence"""
+        if state.get("voice"):
+            sentence += chunk
+            # Check for sentence-ending punctuation
+            if any(p in chunk for p in [".", "?", "!"]) and len(sentence) > 10:
+                await self.__streaming.execute(
+                    ws_connection_id=state["chat_id"],
+                    text=sentence.strip(),
+                    voice=True
+                )
+                sentence = ""
+            return sentence
+
+        try:
+            await self.__streaming.execute(
+                ws_connection_id=state["chat_id"],
+                text=chunk,
+                voice=False
+            )
+        except Exception as e:
+            logger.error(f"error sending chunk: {chunk} :::: {str(e)}")
+
+        return sentence
+
+    @staticmethod
+    async def __first_to_stream(feeds: List[ResearchFeed]) -> ResearchFeed:
+        pending = list(feeds)
+        while pending:
+            waiters = {asyncio.create_task(feed.ready.wait()): feed for feed in pending}
+            finished, unfinished = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in unfinished:
+                waiter.cancel()
+
+            ready = [waiters[waiter] for waiter in finished]
+            for feed in ready:
+                if feed.answers:
+                    return feed
+            pending = [feed for feed in pending if feed not in ready]
+
+        # No branch answered, the finding is still better than nothing
+        for feed in feeds:
+            if feed.chunks:
+                return feed
+
+        raise RuntimeError("No research branch produced a response")
+
+    @error_handler(module=__MODULE)
+    async def interact(self, state: State) -> Dict[str, str]:
+        start = time.perf_counter()
+        feeds = [
+            ResearchFeed(GENERAL_BRANCH, self.__general_legal_researcher.stream(state)),
+            ResearchFeed(COMPANY_BRANCH, self.__company_legal_researcher.stream(state))
+        ]
+
+        try:
+            lead = await self.__first_to_stream(feeds)
+            follower = next(feed for feed in feeds if feed is not lead)
+            Metrics.increment("progressive_aggregation_leads_total", labels={"branch": lead.branch})
+            Metrics.observe("progressive_aggregation_first_chunk_seconds", time.perf_counter() - start)
+
+            sentence = ""
+            while (chunk := await lead.queue.get()) is not None:
+                sentence = await self.__send(state, chunk, sentence)
+
+            await follower.done.wait()
+            addendum = []
+            if follower.chunks:
+                separator = "\n\n"
+                sentence = await self.__send(state, separator, sentence)
+                addendum.append(separator)
+                async for chunk in self.__llm_service.generate_stream(
+                    prompt=self.__get_prompt(state, lead, follower),
+                    temperature=0.5
+                ):
+                    addendum.append(chunk)
+                    sentence = await self.__send(state, chunk, sentence)
+
+        finally:
+            for feed in feeds:
+                feed.task.cancel()
+
+        # After streaming all chunks, send any remaining text for voice
+        if state.get("voice"):
+            try:
+                if sentence.strip():
+                    await self.__streaming.execute(
+                        ws_connection_id=state["chat_id"],
+                        text=sentence.strip(),
+                        voice=True
+                    )
+
+                await self.__streaming.execute(
+                    ws_connection_id=state["chat_id"],
+                    text="END STREAM",
+                    voice=True,
+                    type="END"
+                )
+            except Exception as e:
+                logger.error(f"error sending chunk: {sentence.strip()} :::: {str(e)}")
+
+        responses = {feed.branch: feed.text for feed in feeds}
+        return {
+            "general_legal_response": responses[GENERAL_BRANCH],
+            "company_legal_response": responses[COMPANY_BRANCH],
+            "final_response": lead.text + "".join(addendum)
+        }
@@ -0,0 +1,127 @@
+import re
+import time
+import asyncio
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from src.llm.domain.services.embedding_service import EmbeddingService
+from src.shared.utils.metrics import Metrics
+
+CacheKey = Tuple[str, str]
+
+_request_memo: ContextVar[Optional[Dict[CacheKey, List[float]]]] = ContextVar("embedding_request_memo", default=None)
+
+Metrics.describe("embedding_cache_lookups_total", "Query embedding lookups by where they were served from")
+
+
+@contextmanager
+def embedding_request_scope():
+    """Memoizes query embeddings for everything running inside the scope, e.g. one workflow run"""
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+class CachedEmbeddingService(EmbeddingService):
+    """
+    Wraps an EmbeddingService with a request scoped memo, a process wide LRU+TTL cache
+    and single-flight deduplication of concurrent identical lookups.
+    """
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        model: str,
+        max_size: int = 2048,
+        ttl_seconds: float = 3600
+    ):
+        self.__embedding_service = embedding_service
+        self.__model = model
+        self.__max_size = max_size
+        self.__ttl_seconds = ttl_seconds
+        self.__cache: "OrderedDict[CacheKey, Tuple[float, List[float]]]" = OrderedDict()
+        self.__in_flight: Dict[CacheKey, asyncio.Future] = {}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+    def __get_cached(self, key: CacheKey) -> Optional[List[float]]:
+        entry = self.__cache.get(key)
+        if entry is None:
+            return None
+
+        expires_at, vector = entry
+        if expires_at < time.monotonic():
+            del self.__cache[key]
+            return None
+
+        self.__cache.move_to_end(key)
+        return vector
+
+    def __store(self, key: CacheKey, vector: List[float]) -> None:
+        if self.__max_size <= 0:
+            return
+
+        self.__cache[key] = (time.monotonic() + self.__ttl_seconds, vector)
+        self.__cache.move_to_end(key)
+        while len(self.__cache) > self.__max_size:
+            self.__cache.popitem(last=False)
+
+    @staticmethod
+    def __record(result: str) -> None:
+        Metrics.increment("embedding_cache_lookups_total", labels={"result": result})
+
+    async def embed_query(self, query: str) -> List[float]:
+        key = (self.__model, self.normalize(query))
+        memo = _request_memo.get()
+
+        if memo is not None and key in memo:
+            self.__record("request_hit")
+            return memo[key]
+
+        vector = self.__get_cached(key)
+        if vector is not None:
+            self.__record("cache_hit")
+
+        else:
+            task = self.__in_flight.get(key)
+            if task is None:
+                self.__record("miss")
+                task = asyncio.ensure_future(self.__fetch(key))
+                self.__in_flight[key] = task
+                task.add_done_callback(lambda done: self.__settle(key, done))
+            else:
+                self.__record("in_flight_hit")
+
+            # Shielded so a cancelled caller does not cancel the lookup other callers share
+            vector = await asyncio.shield(task)
+
+        if memo is not None:
+            memo[key] = vector
+
+        return vector
+
+    async def __fetch(self, key: CacheKey) -> List[float]:
+        vector = await self.__embedding_service.embed_query(key[1])
+        self.__store(key, vector)
+        return vector
+
+    def __settle(self, key: CacheKey, task: asyncio.Task) -> None:
+        self.__in_flight.pop(key, None)
+        if not task.cancelled():
+            # Marks a failure as retrieved even when every caller was cancelled
+            task.exception()
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.__embedding_service.embed_documents(texts)
+
+    def clear(self) -> None:
+        self.__cache.clear()
+
+    async def close(self) -> None:
+        await self.__embedding_service.close()
@@ -0,0 +1,196 @@
+import re
+import json
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from src.shared.utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Canonical key -> ways users and documents name the law, written lowercase and without accents
+LAW_ALIASES: Dict[str, List[str]] = {
+    "CPEUM": [
+        "cpeum", "constitucional", "constitucion", "constitucion politica",
+        "constitucion politica de los estados unidos mexicanos", "constitucion federal"
+    ],
+    "LFT": ["lft", "ley federal del trabajo"],
+    "LA": ["ley de amparo"],
+    "LSS": ["lss", "ley del seguro social"],
+    "LINFONAVIT": ["ley del infonavit", "ley del instituto del fondo nacional de la vivienda para los trabajadores"],
+    "CCF": ["ccf", "codigo civil federal"],
+    "CFPC": ["cfpc", "codigo federal de procedimientos civiles"],
+    "CNPCF": ["cnpcf", "codigo nacional de procedimientos civiles y familiares"],
+    "CPF": ["cpf", "codigo penal federal"],
+    "CNPP": ["cnpp", "codigo nacional de procedimientos penales"],
+    "CCOM": ["ccom", "codigo de comercio"],
+    "CFF": ["cff", "codigo fiscal de la federacion"],
+    "LISR": ["lisr", "ley del isr", "ley del impuesto sobre la renta"],
+    "LIVA": ["liva", "ley del iva", "ley del impuesto al valor agregado"],
+    "LGSM": ["lgsm", "ley general de sociedades mercantiles"],
+    "LGTOC": ["lgtoc", "ley general de titulos y operaciones de credito"],
+    "LFPC": ["lfpc", "ley federal de proteccion al consumidor"],
+    "LFPDPPP": ["lfpdppp", "ley federal de proteccion de datos personales en posesion de los particulares"],
+    "LFCE": ["lfce", "ley federal de competencia economica"],
+    "LGA": ["lga", "ley general de arrendamiento"],
+}
+
+ARTICLE_SUFFIXES = r"bis|ter|quater|quinquies|sexies|septies|octies|nonies"
+
+# "artículos 100 al 103" cites every article in between, wider ranges only cite their ends
+MAX_ARTICLE_RANGE = 20
+
+PointId = Union[int, str]
+
+
+class Citation(NamedTuple):
+    law: str
+    article: str
+
+
+_ALIASES: Dict[str, str] = {
+    alias: law for law, aliases in LAW_ALIASES.items() for alias in aliases
+}
+
+
+def normalize_law(name: Any) -> Optional[str]:
+    if name is None:
+        return None
+
+    normalized = normalize_text(str(name))
+    if normalized.upper() in LAW_ALIASES:
+        return normalized.upper()
+    # Unknown laws keep their normalized name, they are indexed but never cited by the extractor
+    return _ALIASES.get(normalized, normalized or None)
+
+
+def normalize_article(value: Any) -> Optional[str]:
+    # "3o. bis" and "3 bis" are the same article
+    match = re.match(rf"^\s*0*(\d+)(?:\s*[o°](?![a-z]))?\s*[-.]?\s*({ARTICLE_SUFFIXES})?\b", normalize_text(str(value)))
+    if not match:
+        return None
+
+    number, suffix = match.groups()
+    return f"{number} {suffix}" if suffix else number
+
+
+def normalize_point_id(value: Any) -> PointId:
+    """Qdrant point IDs are unsigned integers or UUIDs, a digit-only string can only be an integer"""
+    if isinstance(value, int):
+        return value
+    value = str(value)
+    return int(value) if value.isdigit() else value
+
+
+class CitationExtractor:
+    """
+    Finds explicit article citations such as "artículo 123 constitucional", "art. 76 LFT",
+    "artículos 47 y 48 de la Ley Federal del Trabajo", "artículos 100 al 103 de la LFT" or
+    "artículo 123, apartado A, de la Constitución". Only citations naming a known law are returned.
+    """
+    __ARTICLE = rf"\d+(?:[o°](?![a-z])\.?)?(?:\s*[-.]?\s*(?:{ARTICLE_SUFFIXES})\b)?"
+    __LAWS = "|".join(re.escape(alias) for alias in sorted(_ALIASES, key=len, reverse=True))
+    # Parts of an article cited before the law, "apartado A", "fracción XII" or "párrafo segundo"
+    __PARTS = r"(?:,?\s*(?:apartados?|fracci(?:on|ones)|parrafos?|incisos?)\s+[a-z0-9]+(?:\s*(?:,|y)\s*[a-z0-9]+\b)*\s*)*"
+    __PATTERN = re.compile(
+        rf"\b(?:articulos?|arts?\.?)\s*(?P<articles>{__ARTICLE}(?:\s*(?:,|y|e|al|a)\s*{__ARTICLE})*)"
+        rf"\s*(?:o\.?|\.)?{__PARTS},?\s*(?:(?:de|del|de la)\s+(?:la\s+)?)?(?P<law>{__LAWS})(?![a-z0-9])"
+    )
+    __ARTICLE_PATTERN = re.compile(rf"(?P<range>\bal?\s*)?(?P<article>{__ARTICLE})")
+
+    def extract(self, text: str) -> List[Citation]:
+        citations: List[Citation] = []
+        for match in self.__PATTERN.finditer(normalize_text(text)):
+            law = _ALIASES[match.group("law")]
+            for article in self.__articles(match.group("articles")):
+                citation = Citation(law=law, article=article)
+                if citation not in citations:
+                    citations.append(citation)
+        return citations
+
+    def __articles(self, cited: str) -> List[str]:
+        articles: List[str] = []
+        for match in self.__ARTICLE_PATTERN.finditer(cited):
+            article = normalize_article(match.group("article"))
+            previous = articles[-1] if articles else None
+            if match.group("range") and previous and previous.isdigit() and article.isdigit() \
+                    and 0 < int(article) - int(previous) <= MAX_ARTICLE_RANGE:
+                articles.extend(str(number) for number in range(int(previous) + 1, int(article)))
+            articles.append(article)
+        return articles
+
+
+class CitationIndex:
+    """
+    Precomputed (law, article) -> point IDs, in corpus order, built from the payloads of a collection.
+    IDs keep their type, integer IDs stay integers so they can be retrieved as they are.
+    """
+    __HEADING = re.compile(
+        rf"(?:^|\n)\s*art[ií]culo\s+(\d+(?:\s*[oº°](?![a-z])\.?)?(?:\s*[-.]?\s*(?:{ARTICLE_SUFFIXES})\b)?)",
+        re.IGNORECASE
+    )
+
+    def __init__(self, entries: Dict[Citation, List[PointId]]):
+        self.__entries = entries
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def lookup(self, citations: Iterable[Citation]) -> List[PointId]:
+        ids: List[PointId] = []
+        for citation in citations:
+            for point_id in self.__entries.get(citation, []):
+                if point_id not in ids:
+                    ids.append(point_id)
+        return ids
+
+    @classmethod
+    def build(
+        cls,
+        points: Iterable[Tuple[Any, Dict[str, Any]]],
+        law_field: str = "metadata.law",
+        article_field: str = "metadata.article"
+    ) -> "CitationIndex":
+        """
+        Indexes (point ID, payload) pairs. The article comes from article_field, a value or a list of values,
+        or failing that from the "Artículo N" headings in the chunk text.
+        """
+        def field(payload: Dict[str, Any], key: str) -> Any:
+            value: Any = payload
+            for part in key.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            return value
+
+        entries: Dict[Citation, List[PointId]] = {}
+        for point_id, payload in points:
+            point_id = normalize_point_id(point_id)
+            law = normalize_law(field(payload, law_field))
+            if not law:
+                continue
+
+            articles = field(payload, article_field)
+            if articles is None:
+                articles = cls.__HEADING.findall(payload.get("text") or "")
+            elif not isinstance(articles, list):
+                articles = [articles]
+
+            for article in filter(None, map(normalize_article, articles)):
+                ids = entries.setdefault(Citation(law=law, article=article), [])
+                if point_id not in ids:
+                    ids.append(point_id)
+
+        logger.info(f"citation index built with {len(entries)} articles")
+        return cls(entries)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({f"{law}|{article}": ids for (law, article), ids in self.__entries.items()}, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "CitationIndex":
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+
+        # Indexes saved before IDs kept their type hold integer IDs as strings
+        index = cls({Citation(*key.split("|", 1)): [normalize_point_id(point_id) for point_id in ids] for key, ids in data.items()})
+        logger.info(f"citation index loaded from {path} with {len(index)} articles")
+        return index
@@ -0,0 +1,251 @@
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.llm.application.services.citation_index import normalize_article
+from src.llm.application.services.token_counter import TokenCounter
+from src.llm.domain.entities import Document
+from src.llm.domain.services.document_chunker import DocumentChunker
+from src.llm.domain.services.embedding_service import DocumentChunk
+
+
+class ParagraphChunker(DocumentChunker):
+    """
+    Packs whole paragraphs into chunks of up to max_chars, carrying the last overlap_chars of a chunk
+    into the next one. Paragraphs longer than max_chars are cut.
+    """
+    def __init__(self, max_chars: int = 2000, overlap_chars: int = 200):
+        self.__max_chars = max_chars
+        self.__overlap_chars = min(overlap_chars, max_chars // 2)
+
+    def __pieces(self, text: str) -> Iterator[str]:
+        for paragraph in re.split(r"\n\s*\n", text):
+            paragraph = paragraph.strip()
+            while len(paragraph) > self.__max_chars:
+                yield paragraph[:self.__max_chars]
+                paragraph = paragraph[self.__max_chars - self.__overlap_chars:]
+            if paragraph:
+                yield paragraph
+
+    def chunk(self, document: Document) -> Iterator[DocumentChunk]:
+        metadata = {**document.metadata, "document_id": document.document_id}
+        if document.filename:
+            metadata["filename"] = document.filename
+
+        index = 0
+        # Overlap carried over from the previous chunk, followed by the paragraphs of this one
+        carried = ""
+        current: List[str] = []
+        for piece in self.__pieces(document.text):
+            size = len(carried) + sum(len(part) + 2 for part in current)
+            if current and size + len(piece) > self.__max_chars:
+                content = "\n\n".join([carried, *current] if carried else current)
+                yield DocumentChunk(
+                    content=content,
+                    metadata={**metadata, "chunk_index": index},
+                    chunk_id=f"{document.document_id}:{index}"
+                )
+                index += 1
+                carried, current = content[-self.__overlap_chars:] if self.__overlap_chars else "", []
+
+            if not current and len(carried) + len(piece) + 2 > self.__max_chars:
+                carried = ""
+            current.append(piece)
+
+        if current:
+            yield DocumentChunk(
+                content="\n\n".join([carried, *current] if carried else current),
+                metadata={**metadata, "chunk_index": index},
+                chunk_id=f"{document.document_id}:{index}"
+            )
+
+
+# Structural headings, highest level first. Lower levels end when a higher one starts
+STRUCTURE_HEADINGS = [
+    ("titulo", re.compile(r"^(?:T[ÍI]TULO|T[íi]tulo|(?:ART[ÍI]CULOS\s+)?TRANSITORIOS|DISPOSICIONES\s+TRANSITORIAS)\b")),
+    ("capitulo", re.compile(r"^(?:CAP[ÍI]TULO|Cap[íi]tulo)\s+\S+")),
+    ("seccion", re.compile(r"^(?:SECCI[ÓO]N|Secci[óo]n)\s+\S+"))
+]
+LEVELS = {level: rank for rank, (level, _) in enumerate(STRUCTURE_HEADINGS)}
+# Headings are short lines, longer ones are prose that happens to start with the word
+MAX_HEADING_CHARS = 120
+
+# "Artículo 5o.-", "ARTÍCULO 123.", "Artículo 27 Bis.-", "Artículo 3o. Bis.-", "Artículo Único.-", "CLÁUSULA PRIMERA.-"
+ARTICLE_HEADING = re.compile(
+    r"^(?:ART[ÍI]CULO|Art[íi]culo)\s+(?P<label>(?:\d+|[ÚU]NICO|[ÚU]nico)\s*[oº°]?"
+    r"(?:\.?\s*(?:(?i:bis|ter|qu[aá]ter|quinquies|sexies|septies|octies|nonies)|[A-Z])\b)?)\s*[.\-–—:]"
+)
+CLAUSE_HEADING = re.compile(r"^(?:CL[ÁA]USULA|Cl[áa]usula)\s+(?P<label>[\wÁÉÍÓÚáéíóú]+)\s*[.\-–—:]")
+
+# (kind, label) of the article or clause a unit holds
+Heading = Optional[Tuple[str, str]]
+
+
+class LegalStructureChunker(DocumentChunker):
+    """
+    Chunks laws, codes and contracts along their structure. Títulos, capítulos and secciones are hard boundaries
+    and go into the chunk metadata, artículos and cláusulas are packed whole into chunks of up to max_tokens.
+    Only a single article longer than max_tokens is split, at line breaks where possible, each piece repeating
+    the last overlap_tokens of the previous one. Chunks are yielded as they are built.
+    """
+    def __init__(self, token_counter: TokenCounter, max_tokens: int = 512, overlap_tokens: int = 64):
+        self.__token_counter = token_counter
+        self.__max_tokens = max_tokens
+        self.__overlap_tokens = min(overlap_tokens, max_tokens // 2)
+
+    @staticmethod
+    def __structure_level(line: str) -> Optional[str]:
+        if len(line) > MAX_HEADING_CHARS:
+            return None
+
+        for level, pattern in STRUCTURE_HEADINGS:
+            if pattern.match(line):
+                return level
+        return None
+
+    @staticmethod
+    def __heading(line: str) -> Heading:
+        match = ARTICLE_HEADING.match(line)
+        if match:
+            # "5o" and "5" are the same article
+            label = re.sub(r"(?<=\d)\s*[oº°]", "", match.group("label"))
+            return "article", normalize_article(label) or label.strip().lower()
+
+        match = CLAUSE_HEADING.match(line)
+        if match:
+            return "clause", match.group("label").lower()
+        return None
+
+    def __units(self, text: str) -> Iterator[Tuple[Dict[str, str], Heading, str, str]]:
+        """
+        Articles and clauses with the structure they belong to, headings stay with the text that follows them.
+        Yields the unit's text and the structure headings it opens with, e.g. "CAPÍTULO I\nDe la duración".
+        """
+        path: Dict[str, str] = {}
+        heading: Heading = None
+        lines: List[str] = []
+        has_body = False
+        # Lines before the first body line, the structure headings
+        body_start = 0
+        # Set after a structural heading, whose name usually follows on its own line
+        named: Optional[str] = None
+
+        for line in text.splitlines():
+            stripped = line.strip()
+            level = self.__structure_level(stripped)
+            line_heading = None if level else self.__heading(stripped)
+
+            if named and stripped and not (level or line_heading):
+                if len(stripped) <= MAX_HEADING_CHARS:
+                    path[named] = f"{path[named]} {stripped}"
+                    lines.append(stripped)
+                    named = None
+                    continue
+                named = None
+
+            if (level or line_heading) and has_body:
+                yield dict(path), heading, "\n".join(lines).strip(), "\n".join(lines[:body_start]).strip()
+                lines, heading, has_body = [], None, False
+
+            if level:
+                path = {key: value for key, value in path.items() if LEVELS[key] < LEVELS[level]}
+                path[level] = stripped
+                lines.append(stripped)
+                named = level
+                continue
+
+            if line_heading:
+                named = None
+                heading = line_heading
+
+            if stripped and not has_body:
+                body_start = len(lines)
+            lines.append(line.rstrip())
+            has_body = has_body or bool(stripped)
+
+        if has_body:
+            yield dict(path), heading, "\n".join(lines).strip(), "\n".join(lines[:body_start]).strip()
+
+    def __split(self, text: str, header: str = "") -> Iterator[str]:
+        """
+        Pieces of an article longer than max_tokens. The structure headings it opens with go into the first piece,
+        a piece of headings alone would carry the article's metadata without any of its text.
+        """
+        lines: List[str] = [header] if header else []
+        tokens = self.__token_counter.count(header) + 1 if header else 0
+        has_body = False
+        for line in text[len(header):].lstrip("\n").splitlines():
+            line_tokens = self.__token_counter.count(line)
+            if line_tokens > self.__max_tokens:
+                if lines and has_body:
+                    yield "\n".join(lines)
+                    lines, tokens = [], 0
+
+                # Headings still waiting open the first window, which is shortened to make room for them
+                budget = max(self.__max_tokens - tokens, self.__max_tokens // 2)
+                windows = self.__token_counter.split(line, budget, min(self.__overlap_tokens, budget // 2))
+                if lines:
+                    yield "\n".join(lines + [next(windows)])
+                    lines, tokens = [], 0
+                yield from windows
+                has_body = True
+                continue
+
+            if lines and has_body and tokens + line_tokens + 1 > self.__max_tokens:
+                piece = "\n".join(lines)
+                yield piece
+                overlap = self.__token_counter.tail(piece, self.__overlap_tokens)
+                overlap_tokens = self.__token_counter.count(overlap)
+                lines, tokens = ([overlap], overlap_tokens) if overlap and overlap_tokens + line_tokens <= self.__max_tokens else ([], 0)
+
+            lines.append(line)
+            tokens += line_tokens + 1
+            has_body = has_body or bool(line.strip())
+
+        if lines:
+            yield "\n".join(lines)
+
+    def chunk(self, document: Document) -> Iterator[DocumentChunk]:
+        metadata = {**document.metadata, "document_id": document.document_id}
+        if document.filename:
+            metadata["filename"] = document.filename
+
+        index = 0
+
+        def build(path: Dict[str, str], headings: List[Heading], content: str) -> DocumentChunk:
+            nonlocal index
+            chunk_metadata: Dict[str, Any] = {**metadata, **path, "chunk_index": index}
+            articles = list(dict.fromkeys(label for kind, label in filter(None, headings) if kind == "article"))
+            clauses = list(dict.fromkeys(label for kind, label in filter(None, headings) if kind == "clause"))
+            if articles:
+                chunk_metadata["articles"] = articles
+            if len(articles) == 1:
+                # Lets the citation index answer "artículo N" questions with this chunk
+                chunk_metadata["article"] = articles[0]
+            if clauses:
+                chunk_metadata["clauses"] = clauses
+
+            chunk = DocumentChunk(content=content, metadata=chunk_metadata, chunk_id=f"{document.document_id}:{index}")
+            index += 1
+            return chunk
+
+        pending: List[Tuple[Heading, str]] = []
+        pending_path: Dict[str, str] = {}
+        pending_tokens = 0
+        for path, heading, text, header in self.__units(document.text):
+            tokens = self.__token_counter.count(text)
+            if pending and (path != pending_path or pending_tokens + tokens > self.__max_tokens):
+                yield build(pending_path, [unit_heading for unit_heading, _ in pending], "\n\n".join(text for _, text in pending))
+                pending, pending_tokens = [], 0
+
+            if tokens > self.__max_tokens:
+                for piece in self.__split(text, header):
+                    yield build(path, [heading], piece)
+                continue
+
+            pending.append((heading, text))
+            pending_path = path
+            # And one for the separator
+            pending_tokens += tokens + 1
+
+        if pending:
+            yield build(pending_path, [unit_heading for unit_heading, _ in pending], "\n\n".join(text for _, text in pending))
@@ -0,0 +1,115 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.llm.domain.repositorties.vector_repository import VectorRepository
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("namespace_size_cache_lookups_total", "Namespace size lookups by where they were served from")
+
+
+class NamespaceSizeCache:
+    """
+    Point counts per namespace with a TTL, so namespaces that are missing or empty can be skipped
+    without a round trip. Empty namespaces get their own, usually shorter, TTL since a first upload
+    should show up soon, and ingestion calls invalidate() once it has written a namespace.
+
+    The cache lives in each worker process, so invalidate() and the invalidation route only reach the
+    worker that handled them. Other workers see a first upload once their empty TTL runs out.
+    """
+    def __init__(
+        self,
+        vector_repository: VectorRepository,
+        ttl_seconds: float = 600,
+        empty_ttl_seconds: float = 30,
+        max_size: int = 10000
+    ):
+        self.__vector_repository = vector_repository
+        self.__ttl_seconds = ttl_seconds
+        self.__empty_ttl_seconds = empty_ttl_seconds
+        self.__max_size = max_size
+        self.__cache: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self.__in_flight: Dict[str, asyncio.Future] = {}
+
+    def __get_cached(self, namespace: str) -> Optional[int]:
+        entry = self.__cache.get(namespace)
+        if entry is None:
+            return None
+
+        expires_at, size = entry
+        if expires_at < time.monotonic():
+            del self.__cache[namespace]
+            return None
+
+        self.__cache.move_to_end(namespace)
+        return size
+
+    def __store(self, namespace: str, size: int) -> None:
+        if self.__max_size <= 0:
+            return
+
+        ttl = self.__ttl_seconds if size > 0 else self.__empty_ttl_seconds
+        self.__cache[namespace] = (time.monotonic() + ttl, size)
+        self.__cache.move_to_end(namespace)
+        while len(self.__cache) > self.__max_size:
+            self.__cache.popitem(last=False)
+
+    @staticmethod
+    def __record(result: str) -> None:
+        Metrics.increment("namespace_size_cache_lookups_total", labels={"result": result})
+
+    def known_empty(self, namespace: str) -> bool:
+        """True only when a cached, unexpired count says the namespace is empty, never does I/O"""
+        return self.__get_cached(namespace) == 0
+
+    async def size(self, namespace: str) -> Optional[int]:
+        """Point count of the namespace, None when it could not be determined"""
+        size = self.__get_cached(namespace)
+        if size is not None:
+            self.__record("cache_hit")
+            return size
+
+        task = self.__in_flight.get(namespace)
+        if task is None:
+            self.__record("miss")
+            task = asyncio.ensure_future(self.__fetch(namespace))
+            self.__in_flight[namespace] = task
+            task.add_done_callback(lambda done: self.__settle(namespace, done))
+        else:
+            self.__record("in_flight_hit")
+
+        try:
+            # Shielded so a cancelled caller does not cancel the lookup other callers share
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Unknown is treated as not empty, callers fall back to the regular path
+            self.__record("error")
+            logger.warning(f"Could not count {namespace}: {e}")
+            return None
+
+    async def is_empty(self, namespace: str) -> bool:
+        return await self.size(namespace) == 0
+
+    async def __fetch(self, namespace: str) -> int:
+        size = await self.__vector_repository.count(namespace=namespace)
+        self.__store(namespace, size)
+        return size
+
+    def __settle(self, namespace: str, task: asyncio.Task) -> None:
+        self.__in_flight.pop(namespace, None)
+        if not task.cancelled():
+            # Marks a failure as retrieved even when every caller was cancelled
+            task.exception()
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """Forgets one namespace, or every namespace when none is given"""
+        if namespace is None:
+            self.__cache.clear()
+        else:
+            self.__cache.pop(namespace, None)
@@ -0,0 +1,225 @@
+import re
+import math
+import time
+import asyncio
+import logging
+from typing import List, Optional, Tuple, Dict
+
+from src.llm.domain.models import ContextOrchestratorOutput, RouteDecision
+from src.llm.domain.services.embedding_service import EmbeddingService
+from src.llm.domain.services.pre_router import PreRouter
+from src.shared.utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# (text, general_law, company_law)
+ROUTING_EXAMPLES: List[Tuple[str, bool, bool]] = [
+    ("Hola", False, False),
+    ("Buenos días", False, False),
+    ("Gracias", False, False),
+    ("Help", False, False),
+    ("¿Qué clima hace hoy?", False, False),
+    ("Cuéntame un chiste", False, False),
+    ("What's the weather today?", False, False),
+    ("¿Qué dice la Ley Federal del Trabajo sobre vacaciones?", True, False),
+    ("¿Cuántos días de aguinaldo corresponden por ley?", True, False),
+    ("¿Qué establece el artículo 123 constitucional?", True, False),
+    ("¿Cuál es el periodo de preaviso para un despido justificado en México?", True, False),
+    ("What are employment laws in Jalisco?", True, False),
+    ("¿Qué obligaciones fiscales tiene una persona moral ante el SAT?", True, False),
+    ("Requisitos legales para constituir una sociedad anónima", True, False),
+    ("Revisa nuestro contrato de trabajo", False, True),
+    ("¿Qué dice nuestro reglamento interno sobre las vacaciones?", False, True),
+    ("Review our employment contract", False, True),
+    ("¿Cuál es la política de la empresa sobre trabajo remoto?", False, True),
+    ("Resume las cláusulas de nuestro contrato con el proveedor", False, True),
+    ("¿Nuestra política de privacidad cumple con la ley?", True, True),
+    ("Is our privacy policy compliant?", True, True),
+    ("¿Nuestro contrato colectivo cumple con la Ley Federal del Trabajo?", True, True),
+    ("¿Nuestras políticas de vacaciones respetan el mínimo legal?", True, True),
+]
+
+SMALL_TALK_PATTERN = re.compile(
+    r"^[¡¿\s]*(hola|hello|hi|hey|buen[oa]s? (dias|tardes|noches)|gracias|muchas gracias|thanks|thank you|"
+    r"ok|okay|vale|adios|bye|help|ayuda|que tal|como estas)[\s!.?¡¿]*$"
+)
+
+GENERAL_LAW_PATTERNS = [
+    re.compile(pattern) for pattern in [
+        r"\bley(es)? (federal|general|organica)\b",
+        r"\bley federal del trabajo\b",
+        r"\blft\b",
+        r"\bconstitucion(al)?\b",
+        r"\bcodigo (civil|penal|fiscal|de comercio|nacional)\b",
+        r"\bart(iculo|\.)? ?\d+",
+        r"\b(aguinaldo|prima vacacional|finiquito|liquidacion|ptu|indemnizacion)\b",
+        r"\b(imss|infonavit|sat|profeco|inai)\b",
+        r"\b(reglamento|norma oficial|nom-\d+)\b",
+        r"\bjurisprudencia\b",
+        r"\b(por ley|segun la ley|marco legal|legislacion|mexican law|labor law|statute)\b",
+    ]
+]
+
+COMPANY_LAW_PATTERNS = [
+    re.compile(pattern) for pattern in [
+        r"\bnuestr[oa]s?\b",
+        r"\b(la|mi) empresa\b",
+        r"\b(our|company'?s?)\b",
+        r"\breglamento interno\b",
+        r"\bpolitica(s)? (interna|de la empresa)\b",
+        r"\bcontrato (colectivo|con el proveedor|de la empresa)\b",
+    ]
+]
+
+COMPLIANCE_PATTERN = re.compile(r"\b(cumpl[eia]\w*|complian\w*|respet\w*|legal(es)?)\b")
+
+
+class LexicalPreRouter(PreRouter):
+    """Keyword scorer for inputs whose route is obvious from the wording alone"""
+    SOURCE = "lexical"
+
+    async def route(self, input: str) -> Optional[RouteDecision]:
+        text = normalize_text(input)
+        if not text:
+            return None
+
+        if SMALL_TALK_PATTERN.match(text):
+            return RouteDecision(
+                output=ContextOrchestratorOutput(general_law=False, company_law=False),
+                confidence=0.95,
+                source=self.SOURCE
+            )
+
+        general_hits = sum(1 for pattern in GENERAL_LAW_PATTERNS if pattern.search(text))
+        company_hits = sum(1 for pattern in COMPANY_LAW_PATTERNS if pattern.search(text))
+
+        if company_hits and COMPLIANCE_PATTERN.search(text):
+            general_hits += 1
+
+        if not general_hits and not company_hits:
+            return None
+
+        # Each additional independent cue halves the remaining uncertainty
+        confidence = 1 - 0.5 ** (general_hits + company_hits + 1)
+        if general_hits and company_hits:
+            # Mixed queries are the hardest to call from keywords alone
+            confidence -= 0.15
+
+        return RouteDecision(
+            output=ContextOrchestratorOutput(
+                general_law=general_hits > 0,
+                company_law=company_hits > 0
+            ),
+            confidence=round(confidence, 3),
+            source=self.SOURCE
+        )
+
+
+class EmbeddingCentroidPreRouter(PreRouter):
+    """Nearest-centroid classifier over embeddings of labelled routing examples"""
+    SOURCE = "centroid"
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        examples: List[Tuple[str, bool, bool]] = ROUTING_EXAMPLES,
+        temperature: float = 0.02,
+        retry_backoff_seconds: float = 5.0,
+        retry_backoff_max_seconds: float = 300.0
+    ):
+        self.__embedding_service = embedding_service
+        self.__examples = examples
+        self.__temperature = temperature
+        self.__centroids: Dict[Tuple[bool, bool], List[float]] = None
+        self.__lock = asyncio.Lock()
+        # A failed build is not retried on every turn, the wait doubles with each failure
+        self.__retry_backoff_seconds = retry_backoff_seconds
+        self.__retry_backoff_max_seconds = retry_backoff_max_seconds
+        self.__failures = 0
+        self.__retry_at = 0.0
+
+    @staticmethod
+    def __normalize(vector: List[float]) -> List[float]:
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    async def prepare(self) -> None:
+        async with self.__lock:
+            if self.__centroids is not None:
+                return
+
+            if time.monotonic() < self.__retry_at:
+                raise RuntimeError(f"routing centroids failed, retrying in {self.__retry_at - time.monotonic():.0f}s")
+
+            try:
+                vectors = await self.__embedding_service.embed_documents([text for text, _, _ in self.__examples])
+            except Exception:
+                backoff = min(self.__retry_backoff_max_seconds, self.__retry_backoff_seconds * 2 ** self.__failures)
+                self.__failures += 1
+                self.__retry_at = time.monotonic() + backoff
+                raise
+
+            grouped: Dict[Tuple[bool, bool], List[List[float]]] = {}
+            for (_, general_law, company_law), vector in zip(self.__examples, vectors):
+                grouped.setdefault((general_law, company_law), []).append(self.__normalize(vector))
+
+            self.__centroids = {
+                label: self.__normalize([sum(values) / len(members) for values in zip(*members)])
+                for label, members in grouped.items()
+            }
+            self.__failures = 0
+            logger.info(f"routing centroids built from {len(self.__examples)} examples")
+
+    async def route(self, input: str) -> Optional[RouteDecision]:
+        try:
+            await self.prepare()
+            vector = self.__normalize(await self.__embedding_service.embed_query(input))
+
+        except Exception as e:
+            logger.warning(f"centroid router unavailable :::: {str(e)}")
+            return None
+
+        similarities = {
+            label: sum(a * b for a, b in zip(vector, centroid))
+            for label, centroid in self.__centroids.items()
+        }
+
+        # Softmax over similarities turns the margin between centroids into a confidence
+        top = max(similarities.values())
+        weights = {
+            label: math.exp((similarity - top) / self.__temperature)
+            for label, similarity in similarities.items()
+        }
+        (general_law, company_law), best = max(weights.items(), key=lambda item: item[1])
+
+        return RouteDecision(
+            output=ContextOrchestratorOutput(general_law=general_law, company_law=company_law),
+            confidence=round(best / sum(weights.values()), 3),
+            source=self.SOURCE
+        )
+
+
+class CompositePreRouter(PreRouter):
+    """
+    Runs routers in order, stopping at the first confident decision.
+    Otherwise returns the most confident decision seen so it can still be compared against the LLM.
+    """
+    def __init__(self, routers: List[PreRouter], short_circuit_confidence: float = 0.85):
+        self.__routers = routers
+        self.__short_circuit_confidence = short_circuit_confidence
+
+    async def route(self, input: str) -> Optional[RouteDecision]:
+        best: RouteDecision = None
+
+        for router in self.__routers:
+            decision = await router.route(input)
+            if decision is None:
+                continue
+
+            if decision.confidence >= self.__short_circuit_confidence:
+                return decision
+
+            if best is None or decision.confidence > best.confidence:
+                best = decision
+
+        return best
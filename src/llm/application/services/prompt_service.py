@@ -1,42 +1,146 @@
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Union
 
+from src.llm.application.services.token_counter import MESSAGE_TOKENS, TokenCounter
 from src.llm.domain.entities import Message
+from src.llm.domain.models import TokenBudget
+from src.shared.utils.metrics import Metrics
+
+Metrics.describe(
+    "prompt_tokens",
+    "Prompt size in tokens by budget",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+)
+Metrics.describe("prompt_truncations_total", "Prompts trimmed to fit their token budget by part")
+
+CONTEXT_HEADER = "You have access to the following context: "
 
 class PromptService:
-    
-    def build_prompt(
-        self,  
-        system_message: str, 
+    def __init__(
+        self,
+        token_counter: TokenCounter = None,
+        budgets: Dict[str, TokenBudget] = None
+    ):
+        self.__token_counter = token_counter
+        self.__budgets = budgets or {}
+
+    def build_messages(
+        self,
+        system_message: str,
         input: str = None,
         chat_history: List[Dict[str, str]] = None,
-        context: str = None
-    ) -> str:
-        messages = [
-            system_message
-        ]
-        
-        if chat_history:
-            messages = self.add_chat_history(chat_history=chat_history, messages=messages)
+        context: Union[str, List[str]] = None,
+        budget: str = None
+    ) -> List[Dict[str, str]]:
+        """
+        Role-tagged message list. The static system message comes first and the volatile context and input last,
+        so the provider's prompt cache can reuse the shared prefix across requests.
+        Context may be a list of chunks ordered by rank.
+        With a known budget name, history and context are trimmed to fit the agent's token budget.
+        """
+        system = {"role": "system", "content": system_message.strip()}
+        history = [self.__to_message(msg) for msg in chat_history or []]
+        input_message = f"User input: {input}" if input else None
+        history, context_chunks, tokens = self.__fit(system["content"], input_message, history, context, budget)
 
-        if context:
-            messages.append(f"\n\nYou have access to the following context: {context}")
+        volatile = []
+        if context_chunks:
+            volatile.append(f"{CONTEXT_HEADER}{"\n".join(context_chunks)}")
 
-        if input:
-            messages.append(f"\n\nUser input: {input}")
+        if input_message:
+            volatile.append(input_message)
 
-        return " ".join(messages)
+        messages = [system, *history]
+        if volatile:
+            messages.append({"role": "user", "content": "\n\n".join(volatile)})
 
-    @staticmethod
-    def add_chat_history(chat_history: List[Message], messages: List[str]) -> List[str]:
-        if chat_history:
-            messages.append("\n\nCONVERSATION HISTORY:")
-            for msg in chat_history:
-                message_type = msg["message_type"]
-                messages.append(f"{message_type}: {msg["text"]}")
+        self.__observe(budget, tokens)
 
         return messages
-    
-    
-    
-    
\ No newline at end of file
+
+    def __fit(
+        self,
+        system_message: str,
+        input_message: Optional[str],
+        chat_history: List[Dict[str, str]],
+        context: Union[str, List[str], None],
+        budget: Optional[str]
+    ) -> Tuple[List[Dict[str, str]], List[str], Optional[int]]:
+        """Kept history and context, with the tokens of the messages they are sent in when the budget is known"""
+        token_budget = self.__budgets.get(budget) if budget and self.__token_counter else None
+        context_chunks = [context] if isinstance(context, str) else list(context or [])
+        tokens = None
+
+        if token_budget:
+            # The system message and the user message holding context and input
+            tokens = self.__token_counter.count(system_message) + self.__token_counter.count(input_message) + 2 * MESSAGE_TOKENS
+            header = self.__token_counter.count(CONTEXT_HEADER) if context_chunks else 0
+            context_chunks = self.__fit_context(context_chunks, token_budget.max_prompt_tokens - tokens - header, token_budget, budget)
+            if context_chunks:
+                tokens += header + sum(self.__token_counter.count(chunk) for chunk in context_chunks)
+            chat_history = self.__fit_history(chat_history, token_budget.max_prompt_tokens - tokens, token_budget, budget)
+            tokens += sum(self.__message_tokens(message) for message in chat_history)
+
+        return chat_history, [chunk for chunk in context_chunks if chunk], tokens
+
+    @staticmethod
+    def __observe(budget: Optional[str], tokens: Optional[int]) -> None:
+        # The sum of the parts already counted while fitting, the assembled prompt is never counted again
+        # so one-off prompts do not push the part counts out of the token cache
+        if tokens is not None:
+            Metrics.observe("prompt_tokens", tokens, {"budget": budget})
+
+    def __fit_context(self, chunks: List[str], remaining: int, token_budget: TokenBudget, budget: str) -> List[str]:
+        if token_budget.max_context_tokens is not None:
+            remaining = min(remaining, token_budget.max_context_tokens)
+
+        kept = []
+        for chunk in chunks:
+            tokens = self.__token_counter.count(chunk)
+            if tokens > remaining:
+                # The best chunk is worth keeping partially, lower ranked ones are dropped
+                if not kept and remaining > 0:
+                    kept.append(self.__token_counter.truncate(chunk, remaining))
+                Metrics.increment("prompt_truncations_total", labels={"budget": budget, "part": "context"})
+                break
+
+            kept.append(chunk)
+            remaining -= tokens
+
+        return kept
+
+    def __fit_history(
+        self,
+        chat_history: List[Dict[str, str]],
+        remaining: int,
+        token_budget: TokenBudget,
+        budget: str
+    ) -> List[Dict[str, str]]:
+        if not chat_history:
+            return chat_history
+
+        if token_budget.max_history_tokens is not None:
+            remaining = min(remaining, token_budget.max_history_tokens)
+
+        kept = []
+        for message in reversed(chat_history):
+            tokens = self.__message_tokens(message)
+            if tokens > remaining:
+                Metrics.increment("prompt_truncations_total", labels={"budget": budget, "part": "history"})
+                break
+
+            kept.append(message)
+            remaining -= tokens
+
+        kept.reverse()
+        return kept
+
+    def __message_tokens(self, message: Dict[str, str]) -> int:
+        return self.__token_counter.count(message["content"]) + MESSAGE_TOKENS
+
+    @staticmethod
+    def __to_message(msg: Message) -> Dict[str, str]:
+        return {
+            "role": "assistant" if msg["message_type"] == "ai" else "user",
+            "content": msg["text"] or ""
+        }
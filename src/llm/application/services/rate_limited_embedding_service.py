@@ -0,0 +1,29 @@
+from typing import List
+
+from src.llm.application.services.rate_limiter import RateLimiter
+from src.llm.application.services.token_counter import TokenCounter
+from src.llm.domain.services.embedding_service import EmbeddingService
+
+
+class RateLimitedEmbeddingService(EmbeddingService):
+    """Waits for the shared rate limit budget before every call of the wrapped EmbeddingService"""
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        rate_limiter: RateLimiter,
+        token_counter: TokenCounter
+    ):
+        self.__embedding_service = embedding_service
+        self.__rate_limiter = rate_limiter
+        self.__token_counter = token_counter
+
+    async def embed_query(self, query: str) -> List[float]:
+        await self.__rate_limiter.acquire(self.__token_counter.count(query))
+        return await self.__embedding_service.embed_query(query)
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        await self.__rate_limiter.acquire(sum(self.__token_counter.count(text) for text in texts))
+        return await self.__embedding_service.embed_documents(texts)
+
+    async def close(self) -> None:
+        await self.__embedding_service.close()
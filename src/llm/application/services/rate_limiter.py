@@ -0,0 +1,171 @@
+import re
+import time
+import heapq
+import asyncio
+import logging
+from itertools import count
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Mapping, Optional, Tuple
+
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+VOICE_PRIORITY = 0
+TEXT_PRIORITY = 1
+
+_priority: ContextVar[int] = ContextVar("request_priority", default=TEXT_PRIORITY)
+
+Metrics.describe("rate_limiter_wait_seconds", "Time calls waited for rate limit budget, by priority")
+Metrics.describe("rate_limiter_queue_depth", "Calls waiting for rate limit budget")
+Metrics.describe("rate_limiter_available", "Budget left in each bucket")
+Metrics.describe("rate_limiter_throttled_total", "429 responses that paused the limiter")
+
+
+@contextmanager
+def request_priority(voice: bool):
+    """Sets the rate limit priority for every call made inside the scope, e.g. one workflow run"""
+    token = _priority.set(VOICE_PRIORITY if voice else TEXT_PRIORITY)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parses OpenAI reset durations such as "20ms", "1s" or "6m0s" into seconds"""
+    if not value:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    return sum(float(amount) * units[unit] for amount, unit in parts) if parts else None
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.__rate = per_minute / 60
+        self.__updated = time.monotonic()
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.__updated) * self.__rate)
+        self.__updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self.__refill()
+        return 0.0 if self.level >= amount else (amount - self.level) / self.__rate
+
+    def take(self, amount: float) -> None:
+        self.__refill()
+        self.level -= amount
+
+    def sync(self, limit: Optional[float], remaining: Optional[float]) -> None:
+        """Adopts the limit and remaining budget reported by the API, which also counts other processes"""
+        self.__refill()
+        if limit:
+            self.capacity = limit
+            self.__rate = limit / 60
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+
+    def pause(self, seconds: float) -> None:
+        """Empties the bucket so nothing is granted for the given time"""
+        self.__refill()
+        self.level = min(self.level, -self.__rate * seconds)
+
+
+class RateLimiter:
+    """
+    Process wide requests/min and tokens/min budget for one API.
+    Calls over budget wait in a priority queue instead of failing, voice turns first.
+    The budget follows the x-ratelimit headers of every response.
+    """
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float):
+        self.__name = name
+        self.__requests = TokenBucket(requests_per_minute)
+        self.__tokens = TokenBucket(tokens_per_minute)
+        # (priority, sequence, tokens, future)
+        self.__queue: List[Tuple[int, int, int, asyncio.Future]] = []
+        self.__sequence = count()
+        self.__dispatcher: Optional[asyncio.Task] = None
+
+    def __wait_time(self, tokens: int) -> float:
+        return max(self.__requests.wait_time(1), self.__tokens.wait_time(tokens))
+
+    def __grant(self, tokens: int) -> None:
+        self.__requests.take(1)
+        self.__tokens.take(tokens)
+        Metrics.set_gauge("rate_limiter_available", self.__requests.level, {"limiter": self.__name, "bucket": "requests"})
+        Metrics.set_gauge("rate_limiter_available", self.__tokens.level, {"limiter": self.__name, "bucket": "tokens"})
+
+    async def acquire(self, tokens: int) -> None:
+        priority = _priority.get()
+        labels = {"limiter": self.__name, "priority": "voice" if priority == VOICE_PRIORITY else "text"}
+        # A call larger than the whole bucket would never be granted
+        tokens = int(min(tokens, self.__tokens.capacity))
+
+        if not self.__queue and self.__wait_time(tokens) == 0:
+            self.__grant(tokens)
+            Metrics.observe("rate_limiter_wait_seconds", 0.0, labels)
+            return
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.__queue, (priority, next(self.__sequence), tokens, future))
+        Metrics.set_gauge("rate_limiter_queue_depth", len(self.__queue), {"limiter": self.__name})
+        if self.__dispatcher is None or self.__dispatcher.done():
+            self.__dispatcher = asyncio.create_task(self.__dispatch())
+
+        await future
+        Metrics.observe("rate_limiter_wait_seconds", time.monotonic() - start, labels)
+
+    async def __dispatch(self) -> None:
+        while self.__queue:
+            _, _, tokens, future = self.__queue[0]
+            if future.done():
+                # The caller gave up, e.g. its deadline passed
+                heapq.heappop(self.__queue)
+                continue
+
+            wait = self.__wait_time(tokens)
+            if wait > 0:
+                # Re-evaluated after sleeping, a higher priority call may have arrived meanwhile
+                await asyncio.sleep(min(wait, 1.0))
+                continue
+
+            heapq.heappop(self.__queue)
+            self.__grant(tokens)
+            future.set_result(None)
+            Metrics.set_gauge("rate_limiter_queue_depth", len(self.__queue), {"limiter": self.__name})
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        def number(name: str) -> Optional[float]:
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        self.__requests.sync(number("x-ratelimit-limit-requests"), number("x-ratelimit-remaining-requests"))
+        self.__tokens.sync(number("x-ratelimit-limit-tokens"), number("x-ratelimit-remaining-tokens"))
+
+        if status_code == 429:
+            pause = parse_duration(headers.get("retry-after")) \
+                or max(
+                    parse_duration(headers.get("x-ratelimit-reset-requests")) or 0,
+                    parse_duration(headers.get("x-ratelimit-reset-tokens")) or 0
+                ) \
+                or 1.0
+            self.__requests.pause(pause)
+            self.__tokens.pause(pause)
+            Metrics.increment("rate_limiter_throttled_total", labels={"limiter": self.__name})
+            logger.warning(f"{self.__name} rate limited, pausing for {pause:.2f}s")
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from src.llm.domain.entities import SearchResult
+from src.llm.domain.repositorties.vector_repository import SearchQuery, VectorRepository
+from src.llm.domain.services.embedding_service import DocumentChunk
+
+logger = logging.getLogger(__name__)
+
+
+class RoutedVectorRepository(VectorRepository):
+    """Sends each namespace to its own repository, e.g. the legal corpus to a local index and the rest to Qdrant"""
+    def __init__(self, default: VectorRepository, routes: Dict[str, VectorRepository]):
+        self.__default = default
+        self.__routes = routes
+
+    def __repository(self, namespace: Optional[str]) -> VectorRepository:
+        return self.__routes.get(namespace, self.__default)
+
+    async def similarity_search(
+        self,
+        query_vector: List[float],
+        top_k: int = 4,
+        namespace: Optional[str] = None
+    ) -> List[SearchResult]:
+        return await self.__repository(namespace).similarity_search(
+            query_vector=query_vector,
+            top_k=top_k,
+            namespace=namespace
+        )
+
+    async def batch_search(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        grouped: Dict[int, List[int]] = {}
+        repositories: Dict[int, VectorRepository] = {}
+        for index, query in enumerate(queries):
+            repository = self.__repository(query.namespace)
+            repositories[id(repository)] = repository
+            grouped.setdefault(id(repository), []).append(index)
+
+        results: List[List[SearchResult]] = [[] for _ in queries]
+        responses = await asyncio.gather(*[
+            repositories[key].batch_search([queries[index] for index in indexes])
+            for key, indexes in grouped.items()
+        ], return_exceptions=True)
+
+        errors = [response for response in responses if isinstance(response, Exception)]
+        if errors and len(errors) == len(responses):
+            raise errors[0]
+
+        # One failing repository leaves its queries empty instead of failing the others
+        for indexes, response in zip(grouped.values(), responses):
+            if isinstance(response, Exception):
+                namespaces = sorted({queries[index].namespace for index in indexes})
+                logger.warning(f"batch search failed for {namespaces} :::: {str(response)}")
+                continue
+            for index, query_results in zip(indexes, response):
+                results[index] = query_results
+        return results
+
+    async def retrieve(self, namespace: str, ids: List[Any]) -> List[SearchResult]:
+        return await self.__repository(namespace).retrieve(namespace=namespace, ids=ids)
+
+    async def count(self, namespace: str, filter: Optional[Dict[str, Any]] = None) -> int:
+        return await self.__repository(namespace).count(namespace=namespace, filter=filter)
+
+    async def ensure_namespace(self, namespace: str, vector_size: int) -> None:
+        await self.__repository(namespace).ensure_namespace(namespace=namespace, vector_size=vector_size)
+
+    async def upsert(
+        self,
+        namespace: str,
+        chunks: List[DocumentChunk],
+        embeddings: List[List[float]],
+        payload: Optional[Dict[str, Any]] = None
+    ) -> None:
+        await self.__repository(namespace).upsert(namespace=namespace, chunks=chunks, embeddings=embeddings, payload=payload)
+
+    async def delete(self, namespace: str, filter: Dict[str, Any]) -> None:
+        await self.__repository(namespace).delete(namespace=namespace, filter=filter)
+
+    async def close(self) -> None:
+        for repository in {id(repository): repository for repository in [self.__default, *self.__routes.values()]}.values():
+            await repository.close()
@@ -0,0 +1,155 @@
+import re
+import time
+import logging
+from collections import OrderedDict
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.llm.application.services.citation_index import ARTICLE_SUFFIXES
+from src.llm.domain.services.embedding_service import EmbeddingService
+from src.shared.utils.metrics import Metrics
+from src.shared.utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+GENERAL_SCOPE = "general"
+
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+# Fracciones and apartados, only uppercase so words such as "mi" or "vi" are not taken for numerals
+ROMAN_NUMERAL_PATTERN = re.compile(r"\b[IVXLCDM]{1,6}\b")
+SUFFIX_PATTERN = re.compile(rf"\b(?:{ARTICLE_SUFFIXES})\b")
+
+Metrics.describe("semantic_cache_lookups_total", "Semantic response cache lookups by result")
+Metrics.describe("semantic_cache_evictions_total", "Semantic response cache entries evicted by reason")
+
+
+def exact_terms(text: str) -> Tuple[str, ...]:
+    """
+    Numbers, roman numerals and article suffixes in the text. Questions that differ only in an article number
+    or an amount embed almost identically, so they must also match on these exactly.
+    """
+    normalized = normalize_text(text)
+    numbers = {number.replace(",", "") for number in NUMBER_PATTERN.findall(normalized)}
+    return tuple(sorted(numbers | set(ROMAN_NUMERAL_PATTERN.findall(text)) | set(SUFFIX_PATTERN.findall(normalized))))
+
+
+class SemanticResponseCache:
+    """
+    Stores final answers keyed by the embedding of the question.
+    Answers built from company documents are only served back to the same company, and only
+    questions with the same numbers, e.g. article numbers or amounts, are served each other's answers.
+    """
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        similarity_threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400
+    ):
+        self.__embedding_service = embedding_service
+        self.__similarity_threshold = similarity_threshold
+        self.__max_entries = max_entries
+        self.__ttl_seconds = ttl_seconds
+        # entry id -> (scope, expires_at, vector, response, exact terms)
+        self.__entries: "OrderedDict[int, Tuple[str, float, np.ndarray, str, Tuple[str, ...]]]" = OrderedDict()
+        # scope -> (entry ids, stacked vectors), rebuilt lazily after writes
+        self.__indexes: Dict[str, Tuple[List[int], np.ndarray]] = {}
+        self.__ids = count()
+
+    async def __embed(self, input: str) -> np.ndarray:
+        vector = np.asarray(await self.__embedding_service.embed_query(input), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def __index(self, scope: str) -> Tuple[List[int], np.ndarray]:
+        if scope not in self.__indexes:
+            ids = [entry_id for entry_id, entry in self.__entries.items() if entry[0] == scope]
+            matrix = np.stack([self.__entries[entry_id][2] for entry_id in ids]) if ids else None
+            self.__indexes[scope] = (ids, matrix)
+
+        return self.__indexes[scope]
+
+    def __remove(self, entry_id: int, reason: str) -> None:
+        scope = self.__entries.pop(entry_id)[0]
+        self.__indexes.pop(scope, None)
+        Metrics.increment("semantic_cache_evictions_total", labels={"reason": reason})
+
+    def __remove_expired(self, scope: str) -> None:
+        """Expired entries are dropped before ranking, so they never hide a fresh one with a lower score"""
+        now = time.monotonic()
+        ids, _ = self.__index(scope)
+        for entry_id in [entry_id for entry_id in ids if self.__entries[entry_id][1] < now]:
+            self.__remove(entry_id, reason="expired")
+
+    def __best_match(self, scope: str, vector: np.ndarray, terms: Tuple[str, ...]) -> Optional[Tuple[int, float]]:
+        self.__remove_expired(scope)
+        ids, matrix = self.__index(scope)
+        if matrix is None:
+            return None
+
+        similarities = matrix @ vector
+        for position, entry_id in enumerate(ids):
+            if self.__entries[entry_id][4] != terms:
+                similarities[position] = -np.inf
+
+        best = int(np.argmax(similarities))
+        if similarities[best] == -np.inf:
+            return None
+        return ids[best], float(similarities[best])
+
+    async def lookup(self, input: str, company_id: str) -> Optional[str]:
+        if not self.__entries:
+            Metrics.increment("semantic_cache_lookups_total", labels={"result": "miss"})
+            return None
+
+        vector = await self.__embed(input)
+        terms = exact_terms(input)
+
+        matches = [
+            match for match in (
+                self.__best_match(scope, vector, terms) for scope in [GENERAL_SCOPE, str(company_id)]
+            ) if match
+        ]
+        if not matches:
+            Metrics.increment("semantic_cache_lookups_total", labels={"result": "miss"})
+            return None
+
+        entry_id, similarity = max(matches, key=lambda match: match[1])
+        if similarity < self.__similarity_threshold:
+            Metrics.increment("semantic_cache_lookups_total", labels={"result": "miss"})
+            return None
+
+        response = self.__entries[entry_id][3]
+        self.__entries.move_to_end(entry_id)
+        Metrics.increment("semantic_cache_lookups_total", labels={"result": "hit"})
+        logger.debug(f"semantic cache hit with similarity {similarity:.4f}")
+
+        return response
+
+    async def store(self, input: str, response: str, company_id: str, company_scoped: bool) -> None:
+        if self.__max_entries <= 0 or not response:
+            return
+
+        scope = str(company_id) if company_scoped else GENERAL_SCOPE
+        vector = await self.__embed(input)
+
+        self.__entries[next(self.__ids)] = (
+            scope, time.monotonic() + self.__ttl_seconds, vector, response, exact_terms(input)
+        )
+        self.__indexes.pop(scope, None)
+
+        while len(self.__entries) > self.__max_entries:
+            self.__remove(next(iter(self.__entries)), reason="size")
+
+    def invalidate(self, company_id: Optional[str] = None) -> None:
+        """Drops a company's answers, or the whole cache when no company is given"""
+        if company_id is None:
+            self.__entries.clear()
+            self.__indexes.clear()
+            return
+
+        scope = str(company_id)
+        for entry_id in [entry_id for entry_id, entry in self.__entries.items() if entry[0] == scope]:
+            self.__remove(entry_id, reason="invalidated")
@@ -0,0 +1,102 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from src.llm.domain.entities import SearchResult
+from src.llm.domain.repositorties.vector_repository import SearchQuery, VectorRepository
+from src.llm.domain.services.embedding_service import DocumentChunk
+
+TENANT_FIELD = "company_id"
+
+
+class TenantPartitionedVectorRepository(VectorRepository):
+    """
+    Serves per-company namespaces from one shared collection, each search filtered on the indexed
+    company_id payload field. Other namespaces pass through unchanged, so callers keep addressing
+    companies by namespace whichever layout the data is in.
+    """
+    def __init__(
+        self,
+        repository: VectorRepository,
+        collection: str,
+        tenant_of: Callable[[str], Optional[str]]
+    ):
+        self.__repository = repository
+        self.__collection = collection
+        self.__tenant_of = tenant_of
+
+    def __partition(self, query: SearchQuery) -> SearchQuery:
+        tenant = self.__tenant_of(query.namespace)
+        if tenant is None:
+            return query
+
+        return query.model_copy(update={
+            "namespace": self.__collection,
+            "filter": {**(query.filter or {}), TENANT_FIELD: tenant}
+        })
+
+    async def similarity_search(
+        self,
+        query_vector: List[float],
+        top_k: int = 4,
+        namespace: Optional[str] = None
+    ) -> List[SearchResult]:
+        if self.__tenant_of(namespace) is None:
+            return await self.__repository.similarity_search(query_vector=query_vector, top_k=top_k, namespace=namespace)
+
+        # Only batch_search carries filters
+        results = await self.batch_search([SearchQuery(namespace=namespace, query_vector=query_vector, top_k=top_k)])
+        return results[0]
+
+    async def batch_search(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        return await self.__repository.batch_search([self.__partition(query) for query in queries])
+
+    async def retrieve(self, namespace: str, ids: List[Any]) -> List[SearchResult]:
+        # Point IDs are unique across tenants, the migration derives them from the company and the original ID
+        collection = self.__collection if self.__tenant_of(namespace) is not None else namespace
+        return await self.__repository.retrieve(namespace=collection, ids=ids)
+
+    async def count(self, namespace: str, filter: Optional[Dict[str, Any]] = None) -> int:
+        tenant = self.__tenant_of(namespace)
+        if tenant is None:
+            return await self.__repository.count(namespace=namespace, filter=filter)
+
+        return await self.__repository.count(namespace=self.__collection, filter={**(filter or {}), TENANT_FIELD: tenant})
+
+    async def ensure_namespace(self, namespace: str, vector_size: int) -> None:
+        # The shared collection needs tenant settings, it is created with the collections CLI
+        if self.__tenant_of(namespace) is None:
+            await self.__repository.ensure_namespace(namespace=namespace, vector_size=vector_size)
+
+    async def upsert(
+        self,
+        namespace: str,
+        chunks: List[DocumentChunk],
+        embeddings: List[List[float]],
+        payload: Optional[Dict[str, Any]] = None
+    ) -> None:
+        tenant = self.__tenant_of(namespace)
+        if tenant is None:
+            await self.__repository.upsert(namespace=namespace, chunks=chunks, embeddings=embeddings, payload=payload)
+            return
+
+        # Chunk IDs come from filenames, scoped to the company so two companies uploading the same file
+        # do not write the same points in the shared collection
+        await self.__repository.upsert(
+            namespace=self.__collection,
+            chunks=[chunk.model_copy(update={"chunk_id": f"{namespace}:{chunk.chunk_id}"}) for chunk in chunks],
+            embeddings=embeddings,
+            payload={**(payload or {}), TENANT_FIELD: tenant}
+        )
+
+    async def delete(self, namespace: str, filter: Dict[str, Any]) -> None:
+        tenant = self.__tenant_of(namespace)
+        if tenant is None:
+            await self.__repository.delete(namespace=namespace, filter=filter)
+            return
+
+        if not filter:
+            # Would otherwise delete the whole tenant
+            raise ValueError("Refusing to delete without a filter")
+        await self.__repository.delete(namespace=self.__collection, filter={**filter, TENANT_FIELD: tenant})
+
+    async def close(self) -> None:
+        await self.__repository.close()
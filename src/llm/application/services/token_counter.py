@@ -0,0 +1,103 @@
+import logging
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+import tiktoken
+
+from src.llm.domain.services.llm_service import Prompt
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("token_count_cache_lookups_total", "Token count cache lookups by result")
+
+# Per message overhead of the chat format
+MESSAGE_TOKENS = 4
+
+class TokenCounter:
+    """
+    Counts tokens with a tiktoken encoding, caching counts per text.
+    Chat history messages are counted again on every turn, so most lookups are hits.
+    """
+    # Rough ratio used when the encoding files cannot be loaded
+    __CHARS_PER_TOKEN = 4
+
+    def __init__(self, encoding_name: str = "o200k_base", cache_size: int = 4096):
+        self.__cache_size = cache_size
+        self.__cache: "OrderedDict[str, int]" = OrderedDict()
+
+        try:
+            self.__encoding = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            self.__encoding = None
+            logger.warning(f"tiktoken encoding {encoding_name} unavailable, estimating token counts :::: {str(e)}")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+
+        tokens = self.__cache.get(text)
+        if tokens is not None:
+            self.__cache.move_to_end(text)
+            Metrics.increment("token_count_cache_lookups_total", labels={"result": "hit"})
+            return tokens
+
+        Metrics.increment("token_count_cache_lookups_total", labels={"result": "miss"})
+        if self.__encoding:
+            tokens = len(self.__encoding.encode(text, disallowed_special=()))
+        else:
+            tokens = -(-len(text) // self.__CHARS_PER_TOKEN)
+
+        self.__cache[text] = tokens
+        if len(self.__cache) > self.__cache_size:
+            self.__cache.popitem(last=False)
+
+        return tokens
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Keeps the beginning of the text that fits in max_tokens"""
+        if max_tokens <= 0:
+            return ""
+
+        if self.count(text) <= max_tokens:
+            return text
+
+        if self.__encoding:
+            return self.__encoding.decode(self.__encoding.encode(text, disallowed_special=())[:max_tokens])
+
+        return text[:max_tokens * self.__CHARS_PER_TOKEN]
+
+    def tail(self, text: str, max_tokens: int) -> str:
+        """Keeps the end of the text that fits in max_tokens"""
+        if max_tokens <= 0:
+            return ""
+
+        if self.__encoding:
+            tokens = self.__encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self.__encoding.decode(tokens[-max_tokens:])
+
+        return text[-max_tokens * self.__CHARS_PER_TOKEN:]
+
+    def split(self, text: str, max_tokens: int, overlap_tokens: int = 0) -> Iterator[str]:
+        """Windows of up to max_tokens, each repeating the last overlap_tokens of the previous one"""
+        step = max(1, max_tokens - overlap_tokens)
+        if self.__encoding:
+            tokens = self.__encoding.encode(text, disallowed_special=())
+            for start in range(0, max(len(tokens) - overlap_tokens, 1), step):
+                yield self.__encoding.decode(tokens[start:start + max_tokens])
+            return
+
+        size, step = max_tokens * self.__CHARS_PER_TOKEN, step * self.__CHARS_PER_TOKEN
+        for start in range(0, max(len(text) - overlap_tokens * self.__CHARS_PER_TOKEN, 1), step):
+            yield text[start:start + size]
+
+
+def estimate_tokens(token_counter: TokenCounter, prompt: Prompt, max_tokens: Optional[int], completion_tokens: int = 512) -> int:
+    """Tokens a call spends from the rate limit budget, the prompt plus the completion it may generate"""
+    if isinstance(prompt, str):
+        prompt_tokens = token_counter.count(prompt)
+    else:
+        prompt_tokens = sum(token_counter.count(message["content"]) + MESSAGE_TOKENS for message in prompt)
+
+    # OpenAI counts max_tokens against the budget when the request is accepted
+    return prompt_tokens + (max_tokens or completion_tokens)
@@ -0,0 +1,108 @@
+import math
+import time
+import asyncio
+import logging
+from typing import List
+
+from src.llm.domain.services.workflow_service import WorkflowService
+from src.llm.domain.state import State
+from src.shared.domain.exceptions.scheduling import WorkflowQueueFull
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("workflow_queue_depth", "Workflow runs waiting for a worker")
+Metrics.describe("workflow_active_runs", "Workflow runs currently executing")
+Metrics.describe("workflow_queue_wait_seconds", "Time a workflow run waited for a worker")
+Metrics.describe("workflow_run_seconds", "Workflow run duration once started")
+Metrics.describe("workflow_runs_total", "Finished workflow runs by status")
+Metrics.describe("workflow_rejections_total", "Workflow runs shed because the pending queue was full")
+
+class WorkflowScheduler:
+    """
+    Runs workflows on a fixed pool of workers fed by a bounded queue.
+    Requests beyond the queue capacity are rejected instead of piling up.
+    """
+    def __init__(
+        self,
+        workflow_service: WorkflowService,
+        workers: int = 16,
+        max_pending: int = 64
+    ):
+        self.__workflow_service = workflow_service
+        self.__workers = workers
+        self.__queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.__tasks: List[asyncio.Task] = []
+        self.__active = 0
+        # Moving average of run duration, used to estimate the retry hint
+        self.__average_run_seconds = 5.0
+
+    def __publish_gauges(self) -> None:
+        Metrics.set_gauge("workflow_queue_depth", self.__queue.qsize())
+        Metrics.set_gauge("workflow_active_runs", self.__active)
+
+    def start(self) -> None:
+        if self.__tasks:
+            return
+
+        self.__tasks = [asyncio.create_task(self.__worker()) for _ in range(self.__workers)]
+        self.__publish_gauges()
+        logger.info(f"workflow scheduler started with {self.__workers} workers")
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Waits for queued and running workflows up to the timeout, then cancels the workers"""
+        try:
+            await asyncio.wait_for(self.__queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"workflow scheduler stopped with {self.__queue.qsize()} runs pending")
+
+        for task in self.__tasks:
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        self.__tasks = []
+
+    def retry_after(self) -> int:
+        backlog = self.__queue.qsize() + self.__active
+        return max(1, math.ceil(backlog / self.__workers * self.__average_run_seconds))
+
+    def submit(self, state: State) -> None:
+        try:
+            self.__queue.put_nowait((time.monotonic(), state))
+
+        except asyncio.QueueFull:
+            Metrics.increment("workflow_rejections_total")
+            raise WorkflowQueueFull(
+                detail="Workflow queue is full",
+                retry_after=self.retry_after()
+            )
+
+        self.__publish_gauges()
+
+    async def __worker(self) -> None:
+        while True:
+            enqueued_at, state = await self.__queue.get()
+            started_at = time.monotonic()
+            Metrics.observe("workflow_queue_wait_seconds", started_at - enqueued_at)
+
+            self.__active += 1
+            self.__publish_gauges()
+            status = "success"
+            try:
+                await self.__workflow_service.invoke_workflow(state)
+
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+
+            except Exception as e:
+                status = "error"
+                logger.error(f"workflow run for chat {state.get('chat_id')} failed :::: {str(e)}")
+
+            finally:
+                duration = time.monotonic() - started_at
+                self.__average_run_seconds = 0.9 * self.__average_run_seconds + 0.1 * duration
+                self.__active -= 1
+                Metrics.observe("workflow_run_seconds", duration)
+                Metrics.increment("workflow_runs_total", labels={"status": status})
+                self.__queue.task_done()
+                self.__publish_gauges()
@@ -0,0 +1,187 @@
+import time
+import asyncio
+import logging
+from typing import AsyncIterable, Callable, Iterable, List, Optional, Union
+
+from src.llm.application.services.namespace_size_cache import NamespaceSizeCache
+from src.llm.application.services.token_counter import TokenCounter
+from src.llm.domain.entities import Document
+from src.llm.domain.models import IngestionProgress
+from src.llm.domain.repositorties.vector_repository import DeleteFilter, VectorRepository
+from src.llm.domain.services.document_chunker import DocumentChunker
+from src.llm.domain.services.embedding_service import DocumentChunk, EmbeddingService
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("ingested_chunks_total", "Document chunks embedded and stored by the ingestion pipeline")
+
+Documents = Union[Iterable[Document], AsyncIterable[Document]]
+
+# Ends a stage's queue, only sent on success since a failure cancels every stage
+_DONE = object()
+
+
+def delete_conditions(delete_filter: DeleteFilter) -> dict:
+    """Chunk metadata conditions for the fields set on a DeleteFilter"""
+    return {f"metadata.{field}": value for field, value in delete_filter.model_dump(exclude_none=True).items()}
+
+
+class IngestDocuments:
+    """
+    Streams documents through chunking, batched embedding and batched upserts.
+    Embedding and upsert calls run with bounded concurrency over bounded queues, so a slow stage holds back
+    the ones before it instead of piling chunks up in memory.
+    """
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        vector_repository: VectorRepository,
+        chunker: DocumentChunker,
+        token_counter: TokenCounter,
+        vector_size: int,
+        embedding_batch_size: int = 2048,
+        embedding_batch_tokens: int = 250_000,
+        embedding_concurrency: int = 4,
+        upsert_batch_size: int = 256,
+        upsert_concurrency: int = 4,
+        namespace_cache: Optional[NamespaceSizeCache] = None
+    ):
+        self.__embedding_service = embedding_service
+        self.__repository = vector_repository
+        self.__chunker = chunker
+        self.__token_counter = token_counter
+        self.__vector_size = vector_size
+        # The embeddings API takes up to 2048 inputs and 300k tokens per request
+        self.__embedding_batch_size = embedding_batch_size
+        self.__embedding_batch_tokens = embedding_batch_tokens
+        self.__embedding_concurrency = embedding_concurrency
+        self.__upsert_batch_size = upsert_batch_size
+        self.__upsert_concurrency = upsert_concurrency
+        self.__namespace_cache = namespace_cache
+
+    async def delete(self, namespace: str, delete_filter: DeleteFilter) -> None:
+        conditions = delete_conditions(delete_filter)
+        if not conditions:
+            raise ValueError("A DeleteFilter needs at least one field")
+
+        await self.__repository.delete(namespace=namespace, filter=conditions)
+        if self.__namespace_cache:
+            self.__namespace_cache.invalidate(namespace)
+
+    async def execute(
+        self,
+        namespace: str,
+        documents: Documents,
+        delete_filter: Optional[DeleteFilter] = None,
+        on_progress: Optional[Callable[[IngestionProgress], None]] = None
+    ) -> IngestionProgress:
+        """
+        Ingests every document into the namespace, after deleting the chunks matching delete_filter when given,
+        so re-indexing a document does not leave chunks of its previous version behind.
+        on_progress is called after every upsert and once more at the end.
+        """
+        await self.__repository.ensure_namespace(namespace=namespace, vector_size=self.__vector_size)
+        if delete_filter:
+            await self.delete(namespace, delete_filter)
+
+        start = time.perf_counter()
+        progress = IngestionProgress()
+
+        def report(done: bool = False) -> None:
+            progress.elapsed_seconds = time.perf_counter() - start
+            progress.done = done
+            if on_progress:
+                on_progress(progress.model_copy())
+
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=self.__embedding_concurrency)
+        upsert_queue: asyncio.Queue = asyncio.Queue(maxsize=self.__upsert_concurrency * 2)
+
+        async def produce() -> None:
+            async for batch in self.__batches(self.__chunks(documents, progress)):
+                await embed_queue.put(batch)
+            for _ in range(self.__embedding_concurrency):
+                await embed_queue.put(_DONE)
+
+        embedders = [self.__embedding_concurrency]
+
+        async def embed() -> None:
+            while (batch := await embed_queue.get()) is not _DONE:
+                embeddings = await self.__embedding_service.embed_documents([chunk.content for chunk in batch])
+                progress.chunks_embedded += len(batch)
+                for offset in range(0, len(batch), self.__upsert_batch_size):
+                    await upsert_queue.put((
+                        batch[offset:offset + self.__upsert_batch_size],
+                        embeddings[offset:offset + self.__upsert_batch_size]
+                    ))
+
+            # The last embedder to finish ends the upserts
+            embedders[0] -= 1
+            if embedders[0] == 0:
+                for _ in range(self.__upsert_concurrency):
+                    await upsert_queue.put(_DONE)
+
+        async def upsert() -> None:
+            while (item := await upsert_queue.get()) is not _DONE:
+                chunks, embeddings = item
+                await self.__repository.upsert(namespace=namespace, chunks=chunks, embeddings=embeddings)
+                progress.chunks_stored += len(chunks)
+                Metrics.increment("ingested_chunks_total", value=len(chunks))
+                report()
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(produce())
+                for _ in range(self.__embedding_concurrency):
+                    group.create_task(embed())
+                for _ in range(self.__upsert_concurrency):
+                    group.create_task(upsert())
+        except ExceptionGroup as e:
+            # The first failure cancelled the other stages, surface it instead of the group
+            raise e.exceptions[0]
+        finally:
+            # Partly ingested namespaces are not empty either
+            if self.__namespace_cache:
+                self.__namespace_cache.invalidate(namespace)
+
+        report(done=True)
+        logger.info(
+            f"{namespace}: {progress.documents} documents, {progress.chunks_stored} chunks in "
+            f"{progress.elapsed_seconds:.1f}s ({progress.chunks_per_second:.1f} chunks/s)"
+        )
+        return progress
+
+    async def __chunks(self, documents: Documents, progress: IngestionProgress) -> AsyncIterable[DocumentChunk]:
+        if isinstance(documents, AsyncIterable):
+            async for document in documents:
+                async for chunk in self.__chunk(document):
+                    yield chunk
+                progress.documents += 1
+            return
+
+        for document in documents:
+            async for chunk in self.__chunk(document):
+                yield chunk
+            progress.documents += 1
+
+    async def __chunk(self, document: Document) -> AsyncIterable[DocumentChunk]:
+        for chunk in self.__chunker.chunk(document):
+            yield chunk
+            # Chunking is synchronous, a large code would otherwise hold the event loop until a batch is full
+            await asyncio.sleep(0)
+
+    async def __batches(self, chunks: AsyncIterable[DocumentChunk]) -> AsyncIterable[List[DocumentChunk]]:
+        """Batches up to embedding_batch_size chunks and embedding_batch_tokens tokens"""
+        batch: List[DocumentChunk] = []
+        tokens = 0
+        async for chunk in chunks:
+            chunk_tokens = self.__token_counter.count(chunk.content)
+            if batch and (len(batch) >= self.__embedding_batch_size or tokens + chunk_tokens > self.__embedding_batch_tokens):
+                yield batch
+                batch, tokens = [], 0
+
+            batch.append(chunk)
+            tokens += chunk_tokens
+
+        if batch:
+            yield batch
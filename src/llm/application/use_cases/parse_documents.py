@@ -0,0 +1,65 @@
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Deque, Iterable, Optional, Tuple
+
+from src.llm.domain.entities import Document, DocumentFile
+from src.llm.domain.services.document_parser import DocumentParser
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("parsed_documents_total", "Documents parsed for ingestion, by result")
+
+class ParseDocuments:
+    """
+    Parses files with up to concurrency of them in flight and yields the documents in input order.
+    Only the documents in flight are held in memory, so it can feed IngestDocuments from any number of files.
+    Files that fail to parse are logged and skipped.
+    """
+    def __init__(self, parser: DocumentParser, concurrency: int):
+        self.__parser = parser
+        self.__concurrency = max(1, concurrency)
+
+    async def execute(self, files: Iterable[DocumentFile]) -> AsyncIterator[Document]:
+        pending: Deque[Tuple[DocumentFile, asyncio.Future]] = deque()
+        try:
+            for file in files:
+                pending.append((file, asyncio.ensure_future(self.__parser.parse(file.filename, file.content))))
+                if len(pending) >= self.__concurrency:
+                    document = await self.__document(*pending.popleft())
+                    if document:
+                        yield document
+
+            while pending:
+                document = await self.__document(*pending.popleft())
+                if document:
+                    yield document
+
+        finally:
+            # Parses nobody will read, e.g. after the ingestion failed
+            for _, task in pending:
+                task.cancel()
+
+    @staticmethod
+    async def __document(file: DocumentFile, task: asyncio.Future) -> Optional[Document]:
+        try:
+            text = await task
+        except Exception as e:
+            logger.error(f"could not parse {file.filename} :::: {str(e)}")
+            Metrics.increment("parsed_documents_total", labels={"result": "error"})
+            return None
+
+        if not text.strip():
+            logger.warning(f"no text found in {file.filename}")
+            Metrics.increment("parsed_documents_total", labels={"result": "empty"})
+            return None
+
+        Metrics.increment("parsed_documents_total", labels={"result": "parsed"})
+        return Document(
+            document_id=file.document_id,
+            text=text,
+            filename=os.path.basename(file.filename),
+            metadata=file.metadata
+        )
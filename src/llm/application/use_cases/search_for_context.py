@@ -1,30 +1,118 @@
-from typing import List
+import asyncio
+import logging
+from typing import List, Dict, Optional
 
 from src.llm.domain.services.embedding_service import EmbeddingService
-from src.llm.domain.repositorties.vector_repository import VectorRepository
+from src.llm.domain.repositorties.vector_repository import VectorRepository, SearchQuery
+from src.llm.application.services.citation_index import CitationExtractor, CitationIndex, PointId
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("citation_lookups_total", "Searches that cited an article, by whether the citation index answered them")
 
 class SearchForContext():
     def __init__(
         self,
         embedding_service: EmbeddingService,
-        vector_repository: VectorRepository
+        vector_repository: VectorRepository,
+        citation_indexes: Optional[Dict[str, CitationIndex]] = None,
+        citation_extractor: Optional[CitationExtractor] = None,
+        max_citation_chunks: int = 8
     ):
         self.__embedding_service = embedding_service
         self.__repository = vector_repository
+        # Namespace -> index of the articles it holds
+        self.__citation_indexes = citation_indexes or {}
+        self.__citation_extractor = citation_extractor or CitationExtractor()
+        self.__max_citation_chunks = max_citation_chunks
+
 
-    
     async def execute(
         self,
         input: str,
         namespace: str,
         top_k: int = 2
-    ) -> str:
-        query_vector = await self.__embedding_service.embed_query(input)
-        results = await self.__repository.similarity_search(
-            query_vector=query_vector,
-            top_k=top_k,
-            namespace=namespace
+    ) -> List[str]:
+        contexts = await self.execute_batch(
+            input=input,
+            namespaces=[namespace],
+            top_k=top_k
+        )
+
+        return contexts[namespace]
+
+    async def execute_batch(
+        self,
+        input: str,
+        namespaces: List[str],
+        top_k: int = 2
+    ) -> Dict[str, List[str]]:
+        """
+        Searches several namespaces with one embedding and one batched repository call.
+        Namespaces with a citation index answer inputs citing specific articles with those articles, without embedding.
+        Each namespace maps to its chunk texts, best match first.
+        """
+        cited = self.__cited_ids(input, namespaces)
+        exact, searched = await asyncio.gather(
+            self.__retrieve(cited),
+            self.__search(input, [namespace for namespace in namespaces if namespace not in cited], top_k)
         )
 
-        context = "\n".join([result.text for result in results if result.text])
-        return context
\ No newline at end of file
+        # A stale index can point at chunks that no longer exist, and a failed retrieve falls back to search too
+        missing = [namespace for namespace in cited if not exact.get(namespace)]
+        if missing:
+            searched.update(await self.__search(input, missing, top_k))
+
+        return {namespace: exact.get(namespace) or searched.get(namespace, []) for namespace in namespaces}
+
+    def __cited_ids(self, input: str, namespaces: List[str]) -> Dict[str, List[PointId]]:
+        indexed = [namespace for namespace in namespaces if namespace in self.__citation_indexes]
+        if not indexed:
+            return {}
+
+        citations = self.__citation_extractor.extract(input)
+        if not citations:
+            return {}
+
+        cited = {}
+        for namespace in indexed:
+            ids = self.__citation_indexes[namespace].lookup(citations)
+            Metrics.increment("citation_lookups_total", labels={"result": "hit" if ids else "miss"})
+            if ids:
+                cited[namespace] = ids[:self.__max_citation_chunks]
+        return cited
+
+    async def __retrieve(self, cited: Dict[str, List[PointId]]) -> Dict[str, List[str]]:
+        results = await asyncio.gather(*[
+            self.__repository.retrieve(namespace=namespace, ids=ids) for namespace, ids in cited.items()
+        ], return_exceptions=True)
+
+        contexts = {}
+        for namespace, namespace_results in zip(cited, results):
+            if isinstance(namespace_results, Exception):
+                logger.warning(f"citation retrieve failed for {namespace}, searching instead :::: {str(namespace_results)}")
+                Metrics.increment("citation_lookups_total", labels={"result": "retrieve_error"})
+                continue
+            contexts[namespace] = [result.text for result in namespace_results if result.text]
+        return contexts
+
+    async def __search(self, input: str, namespaces: List[str], top_k: int) -> Dict[str, List[str]]:
+        if not namespaces:
+            return {}
+
+        query_vector = await self.__embedding_service.embed_query(input)
+        results = await self.__repository.batch_search([
+            SearchQuery(
+                namespace=namespace,
+                query_vector=query_vector,
+                top_k=top_k,
+                payload_fields=["text"]
+            )
+            for namespace in namespaces
+        ])
+
+        return {
+            namespace: [result.text for result in namespace_results if result.text]
+            for namespace, namespace_results in zip(namespaces, results)
+        }
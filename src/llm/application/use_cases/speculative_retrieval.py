@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set
+
+from src.llm.application.services.namespace_size_cache import NamespaceSizeCache
+from src.llm.application.use_cases.search_for_context import SearchForContext
+from src.llm.domain.models import ContextOrchestratorOutput
+from src.llm.domain.namespaces import get_company_namespace, get_legal_namespace
+from src.llm.domain.state import State
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+GENERAL_BRANCH = "general"
+COMPANY_BRANCH = "company"
+
+_request_prefetches: ContextVar[Optional[Dict[str, asyncio.Task]]] = ContextVar("speculative_prefetches", default=None)
+
+Metrics.describe("speculative_retrieval_prefetches_total", "Context searches started before routing was decided")
+Metrics.describe("speculative_retrieval_hits_total", "Researcher context served from a prefetched or shared batched search")
+Metrics.describe("speculative_retrieval_ready_total", "Prefetches already finished when the researcher asked for them")
+Metrics.describe("speculative_retrieval_wasted_total", "Prefetches discarded because the orchestrator did not pick the branch")
+Metrics.describe("speculative_retrieval_misses_total", "Researcher context searched after routing")
+Metrics.describe("context_batch_searches_total", "Batched context searches shared by several research branches")
+
+
+@contextmanager
+def speculative_retrieval_scope():
+    """Holds the prefetched searches of one workflow run, the ones still running when it ends are cancelled"""
+    prefetches: Dict[str, asyncio.Task] = {}
+    token = _request_prefetches.set(prefetches)
+    try:
+        yield
+    finally:
+        _request_prefetches.reset(token)
+        for task in set(prefetches.values()):
+            if not task.done():
+                task.cancel()
+
+
+class SpeculativeRetrieval:
+    """
+    Starts the context searches for every research branch while the orchestrator is still routing,
+    so the embedding and vector search latency overlaps the routing LLM call.
+    When both branches are picked, the researchers share a single batched search.
+    Prefetches are kept in the current speculative_retrieval_scope, without one nothing is prefetched.
+    """
+    def __init__(
+        self,
+        search_for_context: SearchForContext,
+        enabled: bool = False,
+        namespace_cache: Optional[NamespaceSizeCache] = None
+    ):
+        self.__search_for_context = search_for_context
+        self.__enabled = enabled
+        self.__namespace_cache = namespace_cache
+
+    def __branches(self, state: State) -> List[str]:
+        # Companies already known to have no documents are answered without a search
+        if self.__namespace_cache and self.__namespace_cache.known_empty(get_company_namespace(state["company_id"])):
+            return [GENERAL_BRANCH]
+
+        return [GENERAL_BRANCH, COMPANY_BRANCH]
+
+    def __prefetch(self, state: State, branches: List[str]) -> Dict[str, asyncio.Task]:
+        namespaces = {
+            GENERAL_BRANCH: get_legal_namespace(),
+            COMPANY_BRANCH: get_company_namespace(state["company_id"])
+        }
+
+        async def search() -> Dict[str, List[str]]:
+            contexts = await self.__search_for_context.execute_batch(
+                input=state["input"],
+                namespaces=[namespaces[branch] for branch in branches]
+            )
+            return {branch: contexts[namespaces[branch]] for branch in branches}
+
+        # One task shared by every branch it covers
+        task = asyncio.create_task(search())
+        # Researchers retry on failure, so a failed prefetch nobody awaited must not log as unretrieved
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        Metrics.increment("context_batch_searches_total", labels={"branches": str(len(branches))})
+
+        return {branch: task for branch in branches}
+
+    def start(self, state: State) -> None:
+        prefetches = _request_prefetches.get()
+        if not self.__enabled or prefetches is None:
+            return
+
+        prefetches.update(self.__prefetch(state, self.__branches(state)))
+        for branch in prefetches:
+            Metrics.increment("speculative_retrieval_prefetches_total", labels={"branch": branch})
+
+    def settle(self, state: State, orchestrator_response: ContextOrchestratorOutput) -> None:
+        """Drops the prefetches for branches the orchestrator did not pick"""
+        prefetches = _request_prefetches.get()
+        if prefetches is None:
+            return
+
+        prefetched = dict(prefetches)
+        selected = {
+            GENERAL_BRANCH: orchestrator_response.general_law,
+            COMPANY_BRANCH: orchestrator_response.company_law
+        }
+
+        kept = {branch: task for branch, task in prefetched.items() if selected.get(branch)}
+        discarded = {branch: task for branch, task in prefetched.items() if not selected.get(branch)}
+        self.__discard(discarded, in_use=set(kept.values()))
+
+        if not prefetched and all(selected.values()):
+            branches = self.__branches(state)
+            kept = self.__prefetch(state, branches) if len(branches) > 1 else {}
+
+        prefetches.clear()
+        prefetches.update(kept)
+
+    def discard(self) -> None:
+        prefetches = _request_prefetches.get()
+        if prefetches:
+            self.__discard(dict(prefetches), in_use=set())
+            prefetches.clear()
+
+    async def get_context(self, state: State, branch: str, namespace: str) -> List[str]:
+        task: Optional[asyncio.Task] = (_request_prefetches.get() or {}).get(branch)
+
+        if task is None:
+            Metrics.increment("speculative_retrieval_misses_total", labels={"branch": branch})
+            return await self.__search_for_context.execute(
+                input=state["input"],
+                namespace=namespace
+            )
+
+        if task.done():
+            Metrics.increment("speculative_retrieval_ready_total", labels={"branch": branch})
+
+        try:
+            contexts = await task
+            Metrics.increment("speculative_retrieval_hits_total", labels={"branch": branch})
+            return contexts[branch]
+
+        except Exception as e:
+            logger.warning(f"Prefetched {branch} search failed, searching again :::: {str(e)}")
+            Metrics.increment("speculative_retrieval_misses_total", labels={"branch": branch})
+            return await self.__search_for_context.execute(
+                input=state["input"],
+                namespace=namespace
+            )
+
+    @staticmethod
+    def __discard(prefetched: Dict[str, asyncio.Task], in_use: Set[asyncio.Task]) -> None:
+        for branch in prefetched:
+            Metrics.increment("speculative_retrieval_wasted_total", labels={"branch": branch})
+
+        for task in set(prefetched.values()) - in_use:
+            if task.done():
+                # Consume the result so a failed search does not log "exception was never retrieved"
+                if not task.cancelled():
+                    task.exception()
+            else:
+                task.cancel()
@@ -1,3 +1,4 @@
+import os
 import logging
 from src.shared.dependencies.container import Container
 from src.shared.domain.exceptions.dependencies import DependencyNotRegistered
@@ -7,9 +8,12 @@ from src.llm.application.agents.company_research_agent import CompanyLegalResear
 from src.llm.application.agents.context_orchestrator_agent import ContextOrchestrator
 from src.llm.application.agents.fallback_agent import FallBackAgent
 from src.llm.application.agents.general_legal_agent import GeneralLegalResearcher
+from src.llm.application.agents.cached_response_agent import CachedResponseAgent
+from src.llm.application.agents.progressive_aggregator_agent import ProgressiveAggregator
 
-from src.llm.dependencies.services import get_ebedding_service, get_llm_service, get_prompt_service
-from src.llm.dependencies.use_cases import get_search_for_context_use_case
+from src.llm.dependencies.services import get_ebedding_service, get_llm_service, get_prompt_service, get_pre_router, get_semantic_cache
+from src.llm.dependencies.repositories import get_namespace_size_cache, namespace_cache_enabled
+from src.llm.dependencies.use_cases import get_speculative_retrieval_use_case
 from src.web_sockets.dependencies.use_cases import get_ws_streaming_use_case
 
 logger = logging.getLogger(__name__)
@@ -43,7 +47,8 @@ def get_company_legal_agent() -> CompanyLegalResearcher:
             prompt_service=get_prompt_service(),
             llm_service=get_llm_service(),
             streaming=get_ws_streaming_use_case(),
-            search_for_context=get_search_for_context_use_case()
+            speculative_retrieval=get_speculative_retrieval_use_case(),
+            namespace_cache=get_namespace_size_cache() if namespace_cache_enabled() else None
         )
 
         Container.register(instance_key, agent)
@@ -57,9 +62,14 @@ def get_orchestrator_agent() -> ContextOrchestrator:
         agent = Container.resolve(instance_key)
     
     except DependencyNotRegistered:
+        pre_router_enabled = os.getenv("PRE_ROUTER_ENABLED", "false").lower() == "true"
         agent = ContextOrchestrator(
             prompt_service=get_prompt_service(),
-            llm_service=get_llm_service()
+            llm_service=get_llm_service(),
+            pre_router=get_pre_router() if pre_router_enabled else None,
+            confidence_threshold=float(os.getenv("PRE_ROUTER_CONFIDENCE", 0.85)),
+            shadow_rate=float(os.getenv("PRE_ROUTER_SHADOW_RATE", 0.05)),
+            namespace_cache=get_namespace_size_cache() if namespace_cache_enabled() else None
         )
 
         Container.register(instance_key, agent)
@@ -77,7 +87,7 @@ def get_general_legal_agent() -> GeneralLegalResearcher:
             prompt_service=get_prompt_service(),
             llm_service=get_llm_service(),
             streaming=get_ws_streaming_use_case(),
-            search_for_context=get_search_for_context_use_case()
+            speculative_retrieval=get_speculative_retrieval_use_case()
         )
 
         Container.register(instance_key, agent)
@@ -102,6 +112,40 @@ def get_fallback_agent() -> FallBackAgent:
     
     return agent
 
+def get_cached_response_agent() -> CachedResponseAgent:
+    try: 
+        instance_key = "cached_response_agent"
+        agent = Container.resolve(instance_key)
+    
+    except DependencyNotRegistered:
+        agent = CachedResponseAgent(
+            semantic_cache=get_semantic_cache(),
+            streaming=get_ws_streaming_use_case(),
+            stream_interval=float(os.getenv("SEMANTIC_CACHE_STREAM_INTERVAL_SECONDS", 0.02)),
+            max_history=int(os.getenv("SEMANTIC_CACHE_MAX_HISTORY", 0))
+        )
+
+        Container.register(instance_key, agent)
+        logger.info(f"{instance_key} registered")
+    
+    return agent
 
 
+def get_progressive_aggregator_agent() -> ProgressiveAggregator:
+    try: 
+        instance_key = "progressive_aggregator_agent"
+        agent = Container.resolve(instance_key)
+    
+    except DependencyNotRegistered:
+        agent = ProgressiveAggregator(
+            prompt_service=get_prompt_service(),
+            llm_service=get_llm_service(),
+            streaming=get_ws_streaming_use_case(),
+            general_legal_researcher=get_general_legal_agent(),
+            company_legal_researcher=get_company_legal_agent()
+        )
 
+        Container.register(instance_key, agent)
+        logger.info(f"{instance_key} registered")
+    
+    return agent
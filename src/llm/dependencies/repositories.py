@@ -1,19 +1,47 @@
 import logging
 import os 
+import httpx
+from qdrant_client import AsyncQdrantClient
 from src.shared.dependencies.container import Container
 from src.shared.domain.exceptions.dependencies import DependencyNotRegistered
 
 from src.llm.domain.repositorties.vector_repository import VectorRepository
 
-from src.llm.infrastructure.qdrant.vector_repository import QdrantClient, QdrantVectorRepository
+from src.llm.infrastructure.qdrant.vector_repository import QdrantVectorRepository
+from src.llm.infrastructure.numpy.vector_repository import MmapVectorRepository
+from src.llm.application.services.routed_vector_repository import RoutedVectorRepository
+from src.llm.application.services.tenant_vector_repository import TenantPartitionedVectorRepository
+from src.llm.application.services.namespace_size_cache import NamespaceSizeCache
+from src.llm.domain.namespaces import get_company_collection, get_company_id
+from src.llm.infrastructure.cassette.vector_repository import RecordingVectorRepository, ReplayVectorRepository
+from src.llm.dependencies.services import cassette_mode, get_cassette
 logger = logging.getLogger(__name__)
 
 
-def get_qdrant_client():
-    return QdrantClient(
-        url=os.getenv("QDRANT_URL"),
-        api_key=os.getenv("QDRANT_API_KEY")
-    )
+def get_qdrant_client() -> AsyncQdrantClient:
+    try:
+        instance_key = "qdrant_client"
+        client = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        pool_size = int(os.getenv("QDRANT_POOL_SIZE", 20))
+        client = AsyncQdrantClient(
+            url=os.getenv("QDRANT_URL"),
+            api_key=os.getenv("QDRANT_API_KEY"),
+            prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true",
+            grpc_port=int(os.getenv("QDRANT_GRPC_PORT", 6334)),
+            timeout=int(os.getenv("QDRANT_TIMEOUT", 10)),
+            # Keep-alive pool for the REST transport, shared by every search in the process
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size
+            )
+        )
+
+        Container.register(instance_key, client)
+        logger.info(f"{instance_key} registered")
+
+    return client
 
 def get_vector_repository() -> VectorRepository:
     try:
@@ -21,11 +49,69 @@ def get_vector_repository() -> VectorRepository:
         repository = Container.resolve(instance_key)
 
     except DependencyNotRegistered:
-        client = get_qdrant_client()
-        repository = QdrantVectorRepository(
-            client=client
-        )
+        if cassette_mode() == "replay":
+            repository = ReplayVectorRepository(cassette=get_cassette())
+
+        else:
+            client = get_qdrant_client()
+            hnsw_ef = os.getenv("QDRANT_HNSW_EF")
+            rescore = os.getenv("QDRANT_QUANTIZATION_RESCORE")
+            oversampling = os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING")
+            repository = QdrantVectorRepository(
+                client=client,
+                hnsw_ef=int(hnsw_ef) if hnsw_ef else None,
+                quantization_rescore=rescore.lower() == "true" if rescore else None,
+                quantization_oversampling=float(oversampling) if oversampling else None
+            )
+            # Namespaces served from local snapshots, typically the legal corpus, the rest stays on Qdrant
+            local_namespaces = [
+                namespace.strip() for namespace in os.getenv("LOCAL_VECTOR_NAMESPACES", "").split(",") if namespace.strip()
+            ]
+            if local_namespaces:
+                local_repository = MmapVectorRepository(
+                    root=os.getenv("LOCAL_VECTOR_PATH", "vector_snapshots"),
+                    namespaces=local_namespaces,
+                    use_hnsw=os.getenv("LOCAL_VECTOR_HNSW", "true").lower() == "true",
+                    hnsw_ef=int(os.getenv("LOCAL_VECTOR_HNSW_EF", 64))
+                )
+                repository = RoutedVectorRepository(
+                    default=repository,
+                    routes={namespace: local_repository for namespace in local_namespaces}
+                )
+            if get_company_collection():
+                # Company namespaces become filtered searches in the shared collection
+                repository = TenantPartitionedVectorRepository(
+                    repository=repository,
+                    collection=get_company_collection(),
+                    tenant_of=get_company_id
+                )
+            if cassette_mode() == "record":
+                repository = RecordingVectorRepository(repository=repository, cassette=get_cassette())
 
         Container.register(instance_key, repository)
+        logger.info(f"{instance_key} registered")
     
-    return repository
\ No newline at end of file
+    return repository
+
+
+def namespace_cache_enabled() -> bool:
+    return os.getenv("NAMESPACE_CACHE_ENABLED", "false").lower() == "true"
+
+def get_namespace_size_cache() -> NamespaceSizeCache:
+    try:
+        instance_key = "namespace_size_cache"
+        cache = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        cache = NamespaceSizeCache(
+            vector_repository=get_vector_repository(),
+            ttl_seconds=float(os.getenv("NAMESPACE_CACHE_TTL_SECONDS", 600)),
+            # Bounds how long other workers keep skipping a company after its first upload
+            empty_ttl_seconds=float(os.getenv("NAMESPACE_CACHE_EMPTY_TTL_SECONDS", 30)),
+            max_size=int(os.getenv("NAMESPACE_CACHE_MAX_SIZE", 10000))
+        )
+
+        Container.register(instance_key, cache)
+        logger.info(f"{instance_key} registered")
+
+    return cache
@@ -1,3 +1,4 @@
+import os
 import logging
 from src.shared.dependencies.container import Container
 from src.shared.domain.exceptions.dependencies import DependencyNotRegistered
@@ -5,22 +6,118 @@ from src.shared.domain.exceptions.dependencies import DependencyNotRegistered
 from src.llm.domain.services.embedding_service import EmbeddingService
 from src.llm.domain.services.llm_service import LlmService
 from src.llm.domain.services.workflow_service import WorkflowService
+from src.llm.domain.services.pre_router import PreRouter
+from src.llm.domain.services.document_chunker import DocumentChunker
+from src.llm.domain.services.document_parser import DocumentParser
+from src.llm.domain.services.message_delivery import MessageDeliveryService
+from src.llm.domain.models import TokenBudget
+from src.llm.domain.entities import EmbeddingConfig
 
 from src.llm.application.services.prompt_service import PromptService
+from src.llm.application.services.token_counter import TokenCounter
+from src.llm.application.services.document_chunker import LegalStructureChunker, ParagraphChunker
+from src.llm.application.services.rate_limiter import RateLimiter
+from src.llm.application.services.rate_limited_embedding_service import RateLimitedEmbeddingService
+from src.llm.application.services.cached_embedding_service import CachedEmbeddingService
+from src.llm.application.services.semantic_cache_service import SemanticResponseCache
+from src.llm.application.services.workflow_scheduler import WorkflowScheduler
+from src.llm.application.services.pre_router_service import CompositePreRouter, EmbeddingCentroidPreRouter, LexicalPreRouter
 
 from src.llm.infrastructure.langchain.llm_service import LangchainLlmService
 from src.llm.infrastructure.openai.embedding_service import OpenAIEmbeddingService
 from src.llm.infrastructure.langgraph.workflow_service import LanggraphWorkflowService
+from src.llm.infrastructure.httpx.message_delivery import HttpMessageDeliveryService
+from src.llm.infrastructure.unstructured.document_parser import UnstructuredDocumentParser
+from src.llm.infrastructure.cassette.cassette import Cassette
+from src.llm.infrastructure.cassette.llm_service import RecordingLlmService, ReplayLlmService
+from src.llm.infrastructure.cassette.embedding_service import RecordingEmbeddingService, ReplayEmbeddingService
 
 logger = logging.getLogger(__name__)
 
+def rate_limiting_enabled() -> bool:
+    return os.getenv("OPENAI_RATE_LIMITING", "true").lower() == "true"
+
+def cassette_mode() -> str:
+    """off, record (pass through and record real calls) or replay (answer from the cassette, offline)"""
+    return os.getenv("CASSETTE_MODE", "off").lower()
+
+def get_cassette() -> Cassette:
+    try:
+        instance_key = "cassette"
+        service = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        service = Cassette(
+            path=os.getenv("CASSETTE_PATH", "cassette.jsonl.gz"),
+            speed=float(os.getenv("CASSETTE_SPEED", 1))
+        )
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+
+    return service
+
+def get_chat_rate_limiter(model: str) -> RateLimiter:
+    try:
+        instance_key = f"chat_rate_limiter:{model}"
+        service = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        # Starting budgets, replaced by the limits OpenAI reports for the model in its response headers
+        service = RateLimiter(
+            name=f"chat:{model}",
+            requests_per_minute=float(os.getenv("OPENAI_CHAT_RPM", 5000)),
+            tokens_per_minute=float(os.getenv("OPENAI_CHAT_TPM", 450000))
+        )
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+
+    return service
+
+def get_embedding_rate_limiter() -> RateLimiter:
+    try:
+        instance_key = "embedding_rate_limiter"
+        service = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        service = RateLimiter(
+            name="embeddings",
+            requests_per_minute=float(os.getenv("OPENAI_EMBEDDING_RPM", 5000)),
+            tokens_per_minute=float(os.getenv("OPENAI_EMBEDDING_TPM", 1000000))
+        )
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+
+    return service
+
 def get_llm_service() -> LlmService:
     try:
         instance_key = "llm_service"
         service = Container.resolve(instance_key)
 
     except DependencyNotRegistered:
-        service = LangchainLlmService()
+        if cassette_mode() == "replay":
+            service = ReplayLlmService(cassette=get_cassette())
+
+        else:
+            call_timeout = os.getenv("LLM_CALL_TIMEOUT_SECONDS")
+            first_token_timeout = os.getenv("LLM_FIRST_TOKEN_TIMEOUT_SECONDS")
+            service = LangchainLlmService(
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", 100)),
+                keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", 30)),
+                call_timeout=float(call_timeout) if call_timeout else None,
+                first_token_timeout=float(first_token_timeout) if first_token_timeout else None,
+                hedging=os.getenv("LLM_HEDGING", "false").lower() == "true",
+                hedge_model=os.getenv("LLM_HEDGE_MODEL"),
+                hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", 95)),
+                hedge_min_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", 1)),
+                # Every attempt, retries and hedges included, waits for its model's budget
+                rate_limiters=get_chat_rate_limiter if rate_limiting_enabled() else None,
+                token_counter=get_token_counter() if rate_limiting_enabled() else None,
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", 2))
+            )
+            if cassette_mode() == "record":
+                # Recorded timing includes rate limit waits, record with OPENAI_RATE_LIMITING=false for the API's alone
+                service = RecordingLlmService(llm_service=service, cassette=get_cassette())
         Container.register(instance_key, service)
         logger.info(f"{instance_key} registered")
 
@@ -33,19 +130,197 @@ def get_ebedding_service() -> EmbeddingService:
         service = Container.resolve(instance_key)
 
     except DependencyNotRegistered:
-        service = OpenAIEmbeddingService()
+        # Shortened embeddings, e.g. 256, 512 or 1024, the collections must be embedded with the same size
+        dimensions = os.getenv("EMBEDDING_DIMENSIONS")
+        config = EmbeddingConfig(
+            model_name=os.getenv("EMBEDDING_MODEL", "text-embedding-3-large"),
+            **({"vector_size": int(dimensions)} if dimensions else {})
+        )
+        if cassette_mode() == "replay":
+            embedding_service = ReplayEmbeddingService(
+                cassette=get_cassette(),
+                model=config.model_name,
+                dimensions=config.vector_size
+            )
+
+        else:
+            embedding_service = OpenAIEmbeddingService(
+                model=config.model_name,
+                dimensions=int(dimensions) if dimensions else None,
+                rate_limiter=get_embedding_rate_limiter() if rate_limiting_enabled() else None
+            )
+            if cassette_mode() == "record":
+                # Inside the cache in both modes, so replay sees the calls that were recorded
+                embedding_service = RecordingEmbeddingService(
+                    embedding_service=embedding_service,
+                    cassette=get_cassette(),
+                    model=config.model_name,
+                    dimensions=config.vector_size
+                )
+            if rate_limiting_enabled():
+                # Inside the cache, so only calls that reach OpenAI spend budget
+                embedding_service = RateLimitedEmbeddingService(
+                    embedding_service=embedding_service,
+                    rate_limiter=get_embedding_rate_limiter(),
+                    token_counter=get_token_counter()
+                )
+        service = CachedEmbeddingService(
+            embedding_service=embedding_service,
+            model=config.cache_key,
+            max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", 2048)),
+            ttl_seconds=float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", 3600))
+        )
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+    
+    return service
+
+def get_token_counter() -> TokenCounter:
+    try:
+        instance_key = "token_counter"
+        service = Container.resolve(instance_key)
+    
+    except DependencyNotRegistered:
+        service = TokenCounter(
+            encoding_name=os.getenv("PROMPT_TOKEN_ENCODING", "o200k_base"),
+            cache_size=int(os.getenv("TOKEN_COUNT_CACHE_SIZE", 4096))
+        )
+
         Container.register(instance_key, service)
         logger.info(f"{instance_key} registered")
     
     return service
 
+def get_document_chunker() -> DocumentChunker:
+    try:
+        instance_key = "document_chunker"
+        service = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        if os.getenv("CHUNKER", "legal").lower() == "paragraph":
+            service = ParagraphChunker(
+                max_chars=int(os.getenv("CHUNK_MAX_CHARS", 2000)),
+                overlap_chars=int(os.getenv("CHUNK_OVERLAP_CHARS", 200))
+            )
+        else:
+            service = LegalStructureChunker(
+                # Its own counter, chunk texts would only evict the prompt token counts from the shared cache
+                token_counter=TokenCounter(encoding_name=os.getenv("EMBEDDING_TOKEN_ENCODING", "cl100k_base"), cache_size=0),
+                max_tokens=int(os.getenv("CHUNK_MAX_TOKENS", 512)),
+                overlap_tokens=int(os.getenv("CHUNK_OVERLAP_TOKENS", 64))
+            )
+
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+
+    return service
+
+def get_document_parser() -> DocumentParser:
+    try:
+        instance_key = "document_parser"
+        service = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        workers = os.getenv("DOCUMENT_PARSER_WORKERS")
+        service = UnstructuredDocumentParser(
+            max_workers=int(workers) if workers else None,
+            strategy=os.getenv("DOCUMENT_PARSER_STRATEGY", "fast")
+        )
+
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+
+    return service
+
 def get_prompt_service() -> PromptService:
     try:
         instance_key = "prompt_service"
         service = Container.resolve(instance_key)
     
     except DependencyNotRegistered:
-        service = PromptService()
+        research_budget = TokenBudget(
+            max_prompt_tokens=int(os.getenv("RESEARCH_PROMPT_TOKENS", 12000)),
+            max_context_tokens=int(os.getenv("RESEARCH_CONTEXT_TOKENS", 10000))
+        )
+        service = PromptService(
+            token_counter=get_token_counter(),
+            budgets={
+                # Routing only needs the last few turns
+                "context_orchestrator": TokenBudget(
+                    max_prompt_tokens=int(os.getenv("ORCHESTRATOR_PROMPT_TOKENS", 1500)),
+                    max_history_tokens=int(os.getenv("ORCHESTRATOR_HISTORY_TOKENS", 600))
+                ),
+                "general_legal_research": research_budget,
+                "company_legal_research": research_budget,
+                "research_aggregator": TokenBudget(
+                    max_prompt_tokens=int(os.getenv("AGGREGATOR_PROMPT_TOKENS", 24000)),
+                    max_history_tokens=int(os.getenv("AGGREGATOR_HISTORY_TOKENS", 6000))
+                ),
+                "fallback": TokenBudget(
+                    max_prompt_tokens=int(os.getenv("FALLBACK_PROMPT_TOKENS", 2000))
+                )
+            }
+        )
+
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+    
+    return service
+
+def get_pre_router() -> PreRouter:
+    try:
+        instance_key = "pre_router"
+        service = Container.resolve(instance_key)
+    
+    except DependencyNotRegistered:
+        service = CompositePreRouter(
+            routers=[
+                LexicalPreRouter(),
+                EmbeddingCentroidPreRouter(embedding_service=get_ebedding_service())
+            ],
+            short_circuit_confidence=float(os.getenv("PRE_ROUTER_CONFIDENCE", 0.85))
+        )
+
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+    
+    return service
+
+def get_semantic_cache() -> SemanticResponseCache:
+    try:
+        instance_key = "semantic_cache"
+        service = Container.resolve(instance_key)
+    
+    except DependencyNotRegistered:
+        service = SemanticResponseCache(
+            embedding_service=get_ebedding_service(),
+            similarity_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95)),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 1000)),
+            ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", 86400))
+        )
+
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+    
+    return service
+
+def get_message_delivery_service() -> MessageDeliveryService:
+    try:
+        instance_key = "message_delivery_service"
+        service = Container.resolve(instance_key)
+    
+    except DependencyNotRegistered:
+        service = HttpMessageDeliveryService(
+            endpoint=os.getenv("MAIN_SERVER_ENDPOINT"),
+            hmac_secret=os.getenv("HMAC_SECRET"),
+            sender=os.getenv("AGENT_ID"),
+            http2=os.getenv("MAIN_SERVER_HTTP2", "false").lower() == "true",
+            max_connections=int(os.getenv("MAIN_SERVER_MAX_CONNECTIONS", 20)),
+            max_retries=int(os.getenv("MAIN_SERVER_MAX_RETRIES", 5)),
+            batch_path=os.getenv("MAIN_SERVER_BATCH_PATH"),
+            batch_size=int(os.getenv("MAIN_SERVER_BATCH_SIZE", 20)),
+            batch_window=float(os.getenv("MAIN_SERVER_BATCH_WINDOW_SECONDS", 0.05))
+        )
 
         Container.register(instance_key, service)
         logger.info(f"{instance_key} registered")
@@ -58,13 +333,18 @@ def get_workflow_service() -> WorkflowService:
         service = Container.resolve(instance_key)
     
     except DependencyNotRegistered:
-        from  src.llm.dependencies.agents import get_orchestrator_agent, get_aggregator_agent, get_company_legal_agent, get_fallback_agent, get_general_legal_agent
+        from  src.llm.dependencies.agents import get_orchestrator_agent, get_aggregator_agent, get_company_legal_agent, get_fallback_agent, get_general_legal_agent, get_cached_response_agent, get_progressive_aggregator_agent
+        from src.llm.dependencies.use_cases import get_speculative_retrieval_use_case
         service = LanggraphWorkflowService(
             context_orchestrator=get_orchestrator_agent(),
             general_legal_researcher=get_general_legal_agent(),
             company_legal_researcher=get_company_legal_agent(),
             research_aggregator_agent=get_aggregator_agent(),
-            fallback_agent=get_fallback_agent()
+            fallback_agent=get_fallback_agent(),
+            speculative_retrieval=get_speculative_retrieval_use_case(),
+            message_delivery=get_message_delivery_service(),
+            cached_response_agent=get_cached_response_agent() if os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true" else None,
+            progressive_aggregator=get_progressive_aggregator_agent() if os.getenv("PROGRESSIVE_AGGREGATION", "false").lower() == "true" else None
         )
 
         Container.register(instance_key, service)
@@ -72,4 +352,19 @@ def get_workflow_service() -> WorkflowService:
     
     return service
 
+def get_workflow_scheduler() -> WorkflowScheduler:
+    try:
+        instance_key = "workflow_scheduler"
+        service = Container.resolve(instance_key)
+    
+    except DependencyNotRegistered:
+        service = WorkflowScheduler(
+            workflow_service=get_workflow_service(),
+            workers=int(os.getenv("WORKFLOW_WORKERS", 16)),
+            max_pending=int(os.getenv("WORKFLOW_MAX_PENDING", 64))
+        )
 
+        Container.register(instance_key, service)
+        logger.info(f"{instance_key} registered")
+    
+    return service
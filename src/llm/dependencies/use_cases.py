@@ -1,14 +1,36 @@
+import os
 import logging
 from src.shared.dependencies.container import Container
 from src.shared.domain.exceptions.dependencies import DependencyNotRegistered
 
-from src.llm.dependencies.services import get_ebedding_service
-from src.llm.dependencies.repositories import get_vector_repository
+from src.llm.dependencies.services import get_document_chunker, get_document_parser, get_ebedding_service
+from src.llm.dependencies.repositories import get_namespace_size_cache, get_vector_repository, namespace_cache_enabled
 
 from src.llm.application.use_cases.search_for_context import SearchForContext
+from src.llm.application.services.citation_index import CitationIndex
+from src.llm.domain.namespaces import get_legal_namespace
+from src.llm.application.use_cases.speculative_retrieval import SpeculativeRetrieval
+from src.llm.application.use_cases.ingest_documents import IngestDocuments
+from src.llm.application.use_cases.parse_documents import ParseDocuments
+from src.llm.infrastructure.unstructured.document_parser import available_cores
+from src.llm.application.services.token_counter import TokenCounter
 
 logger = logging.getLogger(__name__)
 
+def get_citation_index() -> CitationIndex:
+    try:
+        instance_key = "citation_index"
+        index = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        # Built with python -m src.llm.infrastructure.qdrant.build_citation_index
+        index = CitationIndex.load(os.getenv("CITATION_INDEX_PATH"))
+
+        Container.register(instance_key, index)
+        logger.info(f"{instance_key} registered")
+
+    return index
+
 def get_search_for_context_use_case() -> SearchForContext:
     try:
         instance_key = "search_for_context_use_case"
@@ -17,10 +39,71 @@ def get_search_for_context_use_case() -> SearchForContext:
     except DependencyNotRegistered:
         use_case = SearchForContext(
             embedding_service=get_ebedding_service(),
-            vector_repository=get_vector_repository()
+            vector_repository=get_vector_repository(),
+            citation_indexes={get_legal_namespace(): get_citation_index()} if os.getenv("CITATION_INDEX_PATH") else None
+        )
+
+        Container.register(instance_key, use_case)
+        logger.info(f"{instance_key} registered")
+
+    return use_case
+
+def get_speculative_retrieval_use_case() -> SpeculativeRetrieval:
+    try:
+        instance_key = "speculative_retrieval_use_case"
+        use_case = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        use_case = SpeculativeRetrieval(
+            search_for_context=get_search_for_context_use_case(),
+            enabled=os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() == "true",
+            namespace_cache=get_namespace_size_cache() if namespace_cache_enabled() else None
+        )
+
+        Container.register(instance_key, use_case)
+        logger.info(f"{instance_key} registered")
+
+    return use_case
+
+def get_ingest_documents_use_case() -> IngestDocuments:
+    try:
+        instance_key = "ingest_documents_use_case"
+        use_case = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        use_case = IngestDocuments(
+            embedding_service=get_ebedding_service(),
+            vector_repository=get_vector_repository(),
+            chunker=get_document_chunker(),
+            # Its own counter, chunk texts would only evict the prompt token counts from the shared cache
+            token_counter=TokenCounter(encoding_name=os.getenv("EMBEDDING_TOKEN_ENCODING", "cl100k_base"), cache_size=0),
+            vector_size=int(os.getenv("EMBEDDING_DIMENSIONS", 3072)),
+            embedding_batch_size=int(os.getenv("INGESTION_EMBEDDING_BATCH_SIZE", 2048)),
+            embedding_batch_tokens=int(os.getenv("INGESTION_EMBEDDING_BATCH_TOKENS", 250000)),
+            embedding_concurrency=int(os.getenv("INGESTION_EMBEDDING_CONCURRENCY", 4)),
+            upsert_batch_size=int(os.getenv("INGESTION_UPSERT_BATCH_SIZE", 256)),
+            upsert_concurrency=int(os.getenv("INGESTION_UPSERT_CONCURRENCY", 4)),
+            namespace_cache=get_namespace_size_cache() if namespace_cache_enabled() else None
+        )
+
+        Container.register(instance_key, use_case)
+        logger.info(f"{instance_key} registered")
+
+    return use_case
+
+def get_parse_documents_use_case() -> ParseDocuments:
+    try:
+        instance_key = "parse_documents_use_case"
+        use_case = Container.resolve(instance_key)
+
+    except DependencyNotRegistered:
+        use_case = ParseDocuments(
+            parser=get_document_parser(),
+            # Twice the workers, so a worker never waits for the next document
+            concurrency=int(os.getenv("DOCUMENT_PARSER_CONCURRENCY", 2 * int(os.getenv("DOCUMENT_PARSER_WORKERS") or available_cores())))
         )
 
         Container.register(instance_key, use_case)
         logger.info(f"{instance_key} registered")
 
-    return use_case
\ No newline at end of file
+    return use_case
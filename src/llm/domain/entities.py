@@ -6,8 +6,28 @@ from datetime import datetime
 class EmbeddingConfig(BaseModel):
     model_name: str = "text-embedding-3-large"
     distance_metric: str = "cosine"
+    # text-embedding-3 models can be shortened to any leading prefix of their 3072 (large) or 1536 (small) dimensions
     vector_size: int = 3072  
 
+    @property
+    def cache_key(self) -> str:
+        """Vectors of different sizes must never be mixed up in a cache"""
+        return f"{self.model_name}:{self.vector_size}"
+
+class Document(BaseModel):
+    document_id: str
+    text: str
+    filename: Optional[str] = None
+    # Stored on every chunk, e.g. user_id and company_id
+    metadata: Dict[str, Any] = {}
+
+class DocumentFile(BaseModel):
+    document_id: str
+    # A path, or only the name when content is given
+    filename: str
+    content: Optional[bytes] = None
+    metadata: Dict[str, Any] = {}
+
 class SearchResult(BaseModel):
     text: str
     metadata: Dict[str, Any]
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field
+from typing import Optional
+from pydantic import BaseModel, Field, computed_field
 
 class ContextOrchestratorOutput(BaseModel):
     general_law: bool = Field(
@@ -9,4 +10,55 @@ class ContextOrchestratorOutput(BaseModel):
         False, 
         description="True if the query requires information about the company's specific legal documents, policies, or internal legal matters"
     )
- 
\ No newline at end of file
+ 
+class RouteDecision(BaseModel):
+    output: ContextOrchestratorOutput
+    confidence: float = Field(
+        0.0,
+        description="Router confidence between 0 and 1"
+    )
+    source: str = Field(
+        ...,
+        description="Name of the router that produced the decision"
+    )
+
+class TokenBudget(BaseModel):
+    max_prompt_tokens: int = Field(
+        ...,
+        description="Upper bound for the whole prompt, system message and input included"
+    )
+    max_history_tokens: Optional[int] = Field(
+        None,
+        description="Upper bound for the conversation history, newest messages are kept first"
+    )
+    max_context_tokens: Optional[int] = Field(
+        None,
+        description="Upper bound for the retrieved context, higher ranked chunks are kept first"
+    )
+
+class IngestionProgress(BaseModel):
+    documents: int = Field(
+        0,
+        description="Documents chunked so far"
+    )
+    chunks_embedded: int = Field(
+        0,
+        description="Chunks with an embedding"
+    )
+    chunks_stored: int = Field(
+        0,
+        description="Chunks written to the vector repository"
+    )
+    elapsed_seconds: float = Field(
+        0.0,
+        description="Time since the ingestion started"
+    )
+    done: bool = Field(
+        False,
+        description="True on the last report of an ingestion"
+    )
+
+    @computed_field
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks_stored / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
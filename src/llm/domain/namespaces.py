@@ -0,0 +1,20 @@
+import os
+from uuid import UUID
+from typing import Optional, Union
+
+def get_legal_namespace() -> str:
+    return os.getenv("LEGAL_COLLECTION")
+
+def get_company_namespace(company_id: Union[UUID, str]) -> str:
+    return f"{company_id}_company_docs"
+
+def get_company_id(namespace: str) -> Optional[str]:
+    """The company a namespace from get_company_namespace belongs to, None for other namespaces"""
+    suffix = "_company_docs"
+    if namespace and namespace.endswith(suffix):
+        return namespace[:-len(suffix)]
+    return None
+
+def get_company_collection() -> Optional[str]:
+    """Shared collection holding every company's chunks, None while each company has its own collection"""
+    return os.getenv("COMPANY_COLLECTION")
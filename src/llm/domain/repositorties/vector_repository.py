@@ -12,6 +12,15 @@ class DeleteFilter(BaseModel):
     company_id: Optional[str] = None
     document_id: Optional[str] = None
 
+class SearchQuery(BaseModel):
+    namespace: str
+    query_vector: List[float]
+    top_k: int = 4
+    # Exact-match conditions on payload fields
+    filter: Optional[Dict[str, Any]] = None
+    # Payload fields to return, None returns the whole payload
+    payload_fields: Optional[List[str]] = None
+
 class VectorRepository(ABC): 
     @abstractmethod
     async def similarity_search(
@@ -21,4 +30,54 @@ class VectorRepository(ABC):
         namespace: Optional[str] = None
     ) -> List[SearchResult]:
         raise NotImplementedError
-    
\ No newline at end of file
+    
+    @abstractmethod
+    async def batch_search(
+        self,
+        queries: List[SearchQuery]
+    ) -> List[List[SearchResult]]:
+        """Runs several searches at once, results are returned in query order"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def retrieve(
+        self,
+        namespace: str,
+        ids: List[Any]
+    ) -> List[SearchResult]:
+        """Fetches points by ID, in the order given, skipping IDs that do not exist"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count(
+        self,
+        namespace: str,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Number of points in a namespace, 0 when the namespace does not exist"""
+        raise NotImplementedError
+
+    async def ensure_namespace(self, namespace: str, vector_size: int) -> None:
+        """Creates the namespace when it does not exist yet"""
+        raise NotImplementedError(f"{type(self).__name__} is read only")
+
+    async def upsert(
+        self,
+        namespace: str,
+        chunks: List[DocumentChunk],
+        embeddings: List[List[float]],
+        payload: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Writes one point per chunk, keyed by namespace and chunk_id so writing a chunk again replaces it.
+        payload holds extra fields stored on every point.
+        """
+        raise NotImplementedError(f"{type(self).__name__} is read only")
+
+    async def delete(self, namespace: str, filter: Dict[str, Any]) -> None:
+        """Deletes the points matching every condition, an empty filter is refused"""
+        raise NotImplementedError(f"{type(self).__name__} is read only")
+
+    async def close(self) -> None:
+        """Releases connections held by the repository"""
+        return None
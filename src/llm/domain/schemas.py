@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from uuid import UUID
 
+from src.llm.domain.repositorties.vector_repository import DeleteFilter
+
 class InteractionRequest(BaseModel):
     input: str
     chat_id: UUID
@@ -10,5 +12,26 @@ class InteractionRequest(BaseModel):
     user_id: UUID
     voice: Optional[bool] = False
 
+class DocumentInput(BaseModel):
+    document_id: str
+    text: str
+    filename: Optional[str] = None
+    metadata: Dict[str, Any] = {}
+
+class IngestionRequest(BaseModel):
+    company_id: UUID
+    user_id: Optional[UUID] = None
+    documents: List[DocumentInput]
+    # Chunks to delete first, e.g. {"document_id": ...} to re-index a document
+    delete_filter: Optional[DeleteFilter] = None
+
+class DocumentDeleteRequest(BaseModel):
+    company_id: UUID
+    delete_filter: DeleteFilter
+
+class NamespaceInvalidationRequest(BaseModel):
+    # Every namespace when omitted
+    company_id: Optional[UUID] = None
+
 class  InteractionResponse(BaseModel):
     response: str
\ No newline at end of file
@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+from src.llm.domain.entities import Document
+from src.llm.domain.services.embedding_service import DocumentChunk
+
+class DocumentChunker(ABC):
+    @abstractmethod
+    def chunk(self, document: Document) -> Iterator[DocumentChunk]:
+        """Yields the chunks of a document in order, chunk IDs must be unique across documents"""
+        raise NotImplementedError
@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+class DocumentParser(ABC):
+    @abstractmethod
+    async def parse(self, filename: str, content: Optional[bytes] = None) -> str:
+        """Text of a document, read from the filename path when content is not given"""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        return None
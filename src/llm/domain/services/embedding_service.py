@@ -18,4 +18,11 @@ class EmbeddingService(ABC):
     @abstractmethod
     async def embed_query(self, query: str) -> List[float]:
         raise NotImplementedError
-    
+
+    @abstractmethod
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Releases connections held by the service"""
+        return None
@@ -1,34 +1,44 @@
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator, Type, TypeVar
+from typing import AsyncGenerator, Dict, List, Type, TypeVar, Union
 from pydantic import BaseModel
 
 T = TypeVar('T', bound=BaseModel)
 
+# A flat prompt, or role-tagged messages ({"role": ..., "content": ...})
+Prompt = Union[str, List[Dict[str, str]]]
+
 class LlmService(ABC):
     @abstractmethod
     async def generate_stream(
         self,
-        prompt: str,
+        prompt: Prompt,
         temperature: float = 0.7,
-        max_tokens: int = None
+        max_tokens: int = None,
+        timeout: float = None
     ) -> AsyncGenerator[str, None]:
         raise NotImplementedError
     
     @abstractmethod
     async def invoke(
         self,
-        prompt: str,
+        prompt: Prompt,
         temperature: float = 0.7,
-        max_tokens: int = None
+        max_tokens: int = None,
+        timeout: float = None
     ) -> str:
         raise NotImplementedError
 
     @abstractmethod
     async def invoke_structured(
         self,
-        prompt: str,
+        prompt: Prompt,
         response_model: Type[T],
         temperature: float = 0.7,
-        max_tokens: int = None
+        max_tokens: int = None,
+        timeout: float = None
     ) -> T:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Releases connections held by the service"""
+        return None
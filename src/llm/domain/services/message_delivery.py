@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Union
+from uuid import UUID
+
+
+class MessageDeliveryService(ABC):
+    @abstractmethod
+    async def start(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def deliver(self, chat_id: Union[UUID, str], text: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def close(self) -> None:
+        raise NotImplementedError
@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from src.llm.domain.models import RouteDecision
+
+class PreRouter(ABC):
+    @abstractmethod
+    async def route(self, input: str) -> Optional[RouteDecision]:
+        raise NotImplementedError
@@ -6,6 +6,10 @@ class WorkflowService(ABC):
     def create_workflow(self):
         raise NotImplementedError()
 
+    @abstractmethod
+    def get_workflow(self):
+        raise NotImplementedError()
+
     @abstractmethod
     async def invoke_workflow(self, state):
-        raise NotImplementedError()
\ No newline at end of file
+        raise NotImplementedError()
@@ -12,4 +12,5 @@ class State(TypedDict):
     company_legal_response: str
     final_response: str
     chat_id: UUID
+    cache_hit: bool
     voice: Optional[bool] = False
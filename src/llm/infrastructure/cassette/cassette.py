@@ -0,0 +1,121 @@
+import gzip
+import json
+import base64
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.shared.domain.exceptions.cassette import CassetteMiss
+
+logger = logging.getLogger(__name__)
+
+
+def encode_vector(vector: List[float]) -> str:
+    """float32 bytes in base64, about a third of the size of the JSON floats"""
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def decode_vector(data: str) -> List[float]:
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32).tolist()
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    """Stable hash of a call, vectors are hashed as float32 so replayed embeddings find recorded searches"""
+    def canonical(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {key: canonical(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            if value and all(isinstance(item, float) for item in value):
+                return hashlib.sha256(np.asarray(value, dtype=np.float32).tobytes()).hexdigest()
+            return [canonical(item) for item in value]
+        return value
+
+    payload = json.dumps([kind, canonical(request)], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class Cassette:
+    """
+    Recorded LLM, embedding and vector search calls in a gzipped JSON lines file, one call per line:
+    {"kind": ..., "key": ..., "latency": seconds, "data": ...}
+
+    Calls are matched on a hash of their arguments. A call recorded several times is replayed in recording
+    order, then from the start again. speed scales the recorded delays, 0 replays without any delay.
+    """
+    def __init__(self, path: str, speed: float = 1.0, flush_every: int = 50):
+        self.path = path
+        self.__speed = speed
+        self.__flush_every = flush_every
+        self.__pending: List[str] = []
+        self.__lock = threading.Lock()
+        # Held while writing, so batches reach the file in the order they were recorded
+        self.__write_lock = threading.Lock()
+        self.__flushes: Set[asyncio.Future] = set()
+        self.__records: Optional[Dict[Tuple[str, str], List[Dict[str, Any]]]] = None
+        self.__cursors: Dict[Tuple[str, str], int] = {}
+
+    def record(self, kind: str, key: str, latency: float, data: Any) -> None:
+        line = json.dumps({"kind": kind, "key": key, "latency": round(latency, 4), "data": data}, ensure_ascii=False)
+        with self.__lock:
+            self.__pending.append(line)
+            should_flush = len(self.__pending) >= self.__flush_every
+
+        if not should_flush:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+
+        # Compressing and writing would block the event loop
+        flush = loop.run_in_executor(None, self.flush)
+        self.__flushes.add(flush)
+        flush.add_done_callback(self.__flushes.discard)
+
+    def flush(self) -> None:
+        with self.__write_lock:
+            with self.__lock:
+                lines, self.__pending = self.__pending, []
+
+            if lines:
+                # Appending adds a gzip member, readers see one continuous stream
+                with gzip.open(self.path, "at", encoding="utf-8") as file:
+                    file.write("\n".join(lines) + "\n")
+
+    async def aflush(self) -> None:
+        """Writes every pending call off the event loop, after the flushes already started"""
+        await asyncio.gather(*self.__flushes)
+        await asyncio.to_thread(self.flush)
+
+    def __load(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        if self.__records is None:
+            records: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+            with gzip.open(self.path, "rt", encoding="utf-8") as file:
+                for line in file:
+                    if line.strip():
+                        record = json.loads(line)
+                        records.setdefault((record["kind"], record["key"]), []).append(record)
+
+            self.__records = records
+            logger.info(f"cassette {self.path} loaded with {sum(map(len, records.values()))} calls")
+
+        return self.__records
+
+    def replay(self, kind: str, key: str) -> Dict[str, Any]:
+        recorded = self.__load().get((kind, key))
+        if not recorded:
+            raise CassetteMiss(detail=f"No {kind} call recorded for key {key} in {self.path}", kind=kind, key=key)
+
+        cursor = self.__cursors.get((kind, key), 0)
+        self.__cursors[(kind, key)] = cursor + 1
+        return recorded[cursor % len(recorded)]
+
+    async def wait(self, seconds: float) -> None:
+        if self.__speed > 0 and seconds > 0:
+            await asyncio.sleep(seconds / self.__speed)
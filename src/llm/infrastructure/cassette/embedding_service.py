@@ -0,0 +1,67 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from src.llm.domain.services.embedding_service import EmbeddingService
+from src.llm.infrastructure.cassette.cassette import Cassette, decode_vector, encode_vector, request_key
+
+
+def embedding_request(model: str, dimensions: Optional[int], **request: Any) -> Dict[str, Any]:
+    """Keyed on the model and size too, a cassette recorded with other settings misses instead of replaying wrong vectors"""
+    return {"model": model, "dimensions": dimensions, **request}
+
+
+class RecordingEmbeddingService(EmbeddingService):
+    def __init__(self, embedding_service: EmbeddingService, cassette: Cassette, model: str, dimensions: Optional[int] = None):
+        self.__embedding_service = embedding_service
+        self.__cassette = cassette
+        self.__model = model
+        self.__dimensions = dimensions
+
+    async def embed_query(self, query: str) -> List[float]:
+        start = time.perf_counter()
+        vector = await self.__embedding_service.embed_query(query)
+        self.__cassette.record(
+            kind="embedding.query",
+            key=request_key("embedding.query", embedding_request(self.__model, self.__dimensions, query=query)),
+            latency=time.perf_counter() - start,
+            data=encode_vector(vector)
+        )
+        return vector
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        vectors = await self.__embedding_service.embed_documents(texts)
+        self.__cassette.record(
+            kind="embedding.documents",
+            key=request_key("embedding.documents", embedding_request(self.__model, self.__dimensions, texts=texts)),
+            latency=time.perf_counter() - start,
+            data=[encode_vector(vector) for vector in vectors]
+        )
+        return vectors
+
+    async def close(self) -> None:
+        await self.__cassette.aflush()
+        await self.__embedding_service.close()
+
+
+class ReplayEmbeddingService(EmbeddingService):
+    def __init__(self, cassette: Cassette, model: str, dimensions: Optional[int] = None):
+        self.__cassette = cassette
+        self.__model = model
+        self.__dimensions = dimensions
+
+    async def embed_query(self, query: str) -> List[float]:
+        record = self.__cassette.replay(
+            "embedding.query",
+            request_key("embedding.query", embedding_request(self.__model, self.__dimensions, query=query))
+        )
+        await self.__cassette.wait(record["latency"])
+        return decode_vector(record["data"])
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        record = self.__cassette.replay(
+            "embedding.documents",
+            request_key("embedding.documents", embedding_request(self.__model, self.__dimensions, texts=texts))
+        )
+        await self.__cassette.wait(record["latency"])
+        return [decode_vector(vector) for vector in record["data"]]
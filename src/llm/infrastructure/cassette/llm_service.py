@@ -0,0 +1,144 @@
+import time
+from typing import Any, AsyncGenerator, Dict, Type
+
+from src.llm.domain.services.llm_service import LlmService, Prompt, T
+from src.llm.infrastructure.cassette.cassette import Cassette, request_key
+
+
+def llm_request(prompt: Prompt, temperature: float, max_tokens: int, response_model: Type[T] = None) -> Dict[str, Any]:
+    return {
+        "prompt": prompt,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "response_model": response_model.__name__ if response_model else None
+    }
+
+
+class RecordingLlmService(LlmService):
+    """Passes calls through to the wrapped LlmService and records the results, streams with their chunk timing"""
+    def __init__(self, llm_service: LlmService, cassette: Cassette):
+        self.__llm_service = llm_service
+        self.__cassette = cassette
+
+    async def generate_stream(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> AsyncGenerator[str, None]:
+        start = last = time.perf_counter()
+        # (seconds since the previous chunk, chunk), the first delay is the time to first token
+        chunks = []
+        async for chunk in self.__llm_service.generate_stream(
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout
+        ):
+            now = time.perf_counter()
+            chunks.append([round(now - last, 4), chunk])
+            last = now
+            yield chunk
+
+        # Only complete streams are recorded, a consumer that stops early never gets here
+        self.__cassette.record(
+            kind="llm.stream",
+            key=request_key("llm.stream", llm_request(prompt, temperature, max_tokens)),
+            latency=time.perf_counter() - start,
+            data=chunks
+        )
+
+    async def invoke(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> str:
+        start = time.perf_counter()
+        response = await self.__llm_service.invoke(
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout
+        )
+        self.__cassette.record(
+            kind="llm.invoke",
+            key=request_key("llm.invoke", llm_request(prompt, temperature, max_tokens)),
+            latency=time.perf_counter() - start,
+            data=response
+        )
+        return response
+
+    async def invoke_structured(
+        self,
+        prompt: Prompt,
+        response_model: Type[T],
+        temperature: float = 0.7,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> T:
+        start = time.perf_counter()
+        response = await self.__llm_service.invoke_structured(
+            prompt=prompt,
+            response_model=response_model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout
+        )
+        self.__cassette.record(
+            kind="llm.structured",
+            key=request_key("llm.structured", llm_request(prompt, temperature, max_tokens, response_model)),
+            latency=time.perf_counter() - start,
+            data=response.model_dump(mode="json")
+        )
+        return response
+
+    async def close(self) -> None:
+        await self.__cassette.aflush()
+        await self.__llm_service.close()
+
+
+class ReplayLlmService(LlmService):
+    """Answers from a cassette with the recorded timing, scaled by the cassette speed"""
+    def __init__(self, cassette: Cassette):
+        self.__cassette = cassette
+
+    async def generate_stream(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> AsyncGenerator[str, None]:
+        record = self.__cassette.replay("llm.stream", request_key("llm.stream", llm_request(prompt, temperature, max_tokens)))
+        for delay, chunk in record["data"]:
+            await self.__cassette.wait(delay)
+            yield chunk
+
+    async def invoke(
+        self,
+        prompt: Prompt,
+        temperature: float = 0.7,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> str:
+        record = self.__cassette.replay("llm.invoke", request_key("llm.invoke", llm_request(prompt, temperature, max_tokens)))
+        await self.__cassette.wait(record["latency"])
+        return record["data"]
+
+    async def invoke_structured(
+        self,
+        prompt: Prompt,
+        response_model: Type[T],
+        temperature: float = 0.7,
+        max_tokens: int = None,
+        timeout: float = None
+    ) -> T:
+        record = self.__cassette.replay(
+            "llm.structured",
+            request_key("llm.structured", llm_request(prompt, temperature, max_tokens, response_model))
+        )
+        await self.__cassette.wait(record["latency"])
+        return response_model.model_validate(record["data"])
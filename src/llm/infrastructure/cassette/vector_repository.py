@@ -0,0 +1,126 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from src.llm.domain.entities import SearchResult
+from src.llm.domain.repositorties.vector_repository import SearchQuery, VectorRepository
+from src.llm.domain.services.embedding_service import DocumentChunk
+from src.llm.infrastructure.cassette.cassette import Cassette, request_key
+
+
+def search_request(namespace: str, query_vector: List[float], top_k: int):
+    return {"namespace": namespace, "query_vector": query_vector, "top_k": top_k}
+
+
+class RecordingVectorRepository(VectorRepository):
+    def __init__(self, repository: VectorRepository, cassette: Cassette):
+        self.__repository = repository
+        self.__cassette = cassette
+
+    async def similarity_search(
+        self,
+        query_vector: List[float],
+        top_k: int = 4,
+        namespace: Optional[str] = None
+    ) -> List[SearchResult]:
+        start = time.perf_counter()
+        results = await self.__repository.similarity_search(query_vector=query_vector, top_k=top_k, namespace=namespace)
+        self.__cassette.record(
+            kind="vector.search",
+            key=request_key("vector.search", search_request(namespace, query_vector, top_k)),
+            latency=time.perf_counter() - start,
+            data=[result.model_dump(mode="json") for result in results]
+        )
+        return results
+
+    async def batch_search(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        start = time.perf_counter()
+        results = await self.__repository.batch_search(queries)
+        self.__cassette.record(
+            kind="vector.batch",
+            key=request_key("vector.batch", {"queries": [query.model_dump(mode="json") for query in queries]}),
+            latency=time.perf_counter() - start,
+            data=[[result.model_dump(mode="json") for result in query_results] for query_results in results]
+        )
+        return results
+
+    async def retrieve(self, namespace: str, ids: List[Any]) -> List[SearchResult]:
+        start = time.perf_counter()
+        results = await self.__repository.retrieve(namespace=namespace, ids=ids)
+        self.__cassette.record(
+            kind="vector.retrieve",
+            key=request_key("vector.retrieve", {"namespace": namespace, "ids": [str(point_id) for point_id in ids]}),
+            latency=time.perf_counter() - start,
+            data=[result.model_dump(mode="json") for result in results]
+        )
+        return results
+
+    async def count(self, namespace: str, filter: Optional[Dict[str, Any]] = None) -> int:
+        start = time.perf_counter()
+        count = await self.__repository.count(namespace=namespace, filter=filter)
+        self.__cassette.record(
+            kind="vector.count",
+            key=request_key("vector.count", {"namespace": namespace, "filter": filter}),
+            latency=time.perf_counter() - start,
+            data=count
+        )
+        return count
+
+    # Writes are passed through unrecorded, replays only serve reads
+
+    async def ensure_namespace(self, namespace: str, vector_size: int) -> None:
+        await self.__repository.ensure_namespace(namespace=namespace, vector_size=vector_size)
+
+    async def upsert(
+        self,
+        namespace: str,
+        chunks: List[DocumentChunk],
+        embeddings: List[List[float]],
+        payload: Optional[Dict[str, Any]] = None
+    ) -> None:
+        await self.__repository.upsert(namespace=namespace, chunks=chunks, embeddings=embeddings, payload=payload)
+
+    async def delete(self, namespace: str, filter: Dict[str, Any]) -> None:
+        await self.__repository.delete(namespace=namespace, filter=filter)
+
+    async def close(self) -> None:
+        await self.__cassette.aflush()
+        await self.__repository.close()
+
+
+class ReplayVectorRepository(VectorRepository):
+    def __init__(self, cassette: Cassette):
+        self.__cassette = cassette
+
+    async def similarity_search(
+        self,
+        query_vector: List[float],
+        top_k: int = 4,
+        namespace: Optional[str] = None
+    ) -> List[SearchResult]:
+        record = self.__cassette.replay(
+            "vector.search",
+            request_key("vector.search", search_request(namespace, query_vector, top_k))
+        )
+        await self.__cassette.wait(record["latency"])
+        return [SearchResult.model_validate(result) for result in record["data"]]
+
+    async def batch_search(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        record = self.__cassette.replay(
+            "vector.batch",
+            request_key("vector.batch", {"queries": [query.model_dump(mode="json") for query in queries]})
+        )
+        await self.__cassette.wait(record["latency"])
+        return [[SearchResult.model_validate(result) for result in query_results] for query_results in record["data"]]
+
+    async def retrieve(self, namespace: str, ids: List[Any]) -> List[SearchResult]:
+        record = self.__cassette.replay(
+            "vector.retrieve",
+            request_key("vector.retrieve", {"namespace": namespace, "ids": [str(point_id) for point_id in ids]})
+        )
+        await self.__cassette.wait(record["latency"])
+        return [SearchResult.model_validate(result) for result in record["data"]]
+
+    async def count(self, namespace: str, filter: Optional[Dict[str, Any]] = None) -> int:
+        record = self.__cassette.replay("vector.count", request_key("vector.count", {"namespace": namespace, "filter": filter}))
+        await self.__cassette.wait(record["latency"])
+        return record["data"]
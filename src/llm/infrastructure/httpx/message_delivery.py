@@ -0,0 +1,217 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple, Union
+from uuid import UUID
+
+import httpx
+
+from src.llm.domain.services.message_delivery import MessageDeliveryService
+from src.shared.utils.http.get_hmac_header import generate_hmac_headers
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("message_delivery_seconds", "Time from queueing a final message to the main server accepting it")
+Metrics.describe("message_delivery_attempts_total", "POST attempts to the main server by outcome")
+Metrics.describe("message_deliveries_total", "Final messages by delivery status")
+Metrics.describe("message_delivery_outbox_depth", "Final messages waiting in the outbox")
+
+# (chat_id, text, queued_at)
+OutboxItem = Tuple[str, str, float]
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# Failures before the request was sent. Others, like read timeouts, may come after the main server accepted
+# the message, and retrying those would deliver it twice
+RETRYABLE_TRANSPORT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+class HttpMessageDeliveryService(MessageDeliveryService):
+    """
+    Delivers final agent messages to the main server from an in-memory outbox over one pooled client,
+    retrying transient failures with exponential backoff.
+    With a batch path configured, messages queued close together are sent in one request.
+    """
+    # HMAC payloads are accepted within 60s, so signed headers are reused for half of that
+    __HEADERS_TTL_SECONDS = 30
+
+    def __init__(
+        self,
+        endpoint: str,
+        hmac_secret: str,
+        sender: str,
+        http2: bool = False,
+        max_connections: int = 20,
+        timeout: float = 10.0,
+        max_retries: int = 5,
+        backoff_base: float = 0.25,
+        backoff_max: float = 10.0,
+        senders: int = 4,
+        max_outbox: int = 1000,
+        batch_path: Optional[str] = None,
+        batch_size: int = 20,
+        batch_window: float = 0.05,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.__endpoint = endpoint
+        self.__hmac_secret = hmac_secret
+        self.__sender = sender
+        self.__http2 = http2
+        self.__max_connections = max_connections
+        self.__timeout = timeout
+        self.__max_retries = max_retries
+        self.__backoff_base = backoff_base
+        self.__backoff_max = backoff_max
+        self.__senders = senders
+        self.__batch_path = batch_path
+        self.__batch_size = batch_size
+        self.__batch_window = batch_window
+        self.__transport = transport
+        self.__outbox: asyncio.Queue = asyncio.Queue(maxsize=max_outbox)
+        self.__client: Optional[httpx.AsyncClient] = None
+        self.__tasks: List[asyncio.Task] = []
+        self.__headers: Dict[str, str] = None
+        self.__headers_created_at = 0.0
+
+    async def start(self) -> None:
+        if self.__client:
+            return
+
+        self.__client = httpx.AsyncClient(
+            http2=self.__http2,
+            timeout=self.__timeout,
+            transport=self.__transport,
+            limits=httpx.Limits(
+                max_connections=self.__max_connections,
+                max_keepalive_connections=self.__max_connections
+            )
+        )
+        self.__tasks = [asyncio.create_task(self.__run_sender()) for _ in range(self.__senders)]
+        logger.info(f"message delivery started, http2={self.__http2}, batching={bool(self.__batch_path)}")
+
+    async def deliver(self, chat_id: Union[UUID, str], text: str) -> None:
+        """Queues the message, waiting only when the outbox is full"""
+        await self.__outbox.put((str(chat_id), text, time.perf_counter()))
+        Metrics.set_gauge("message_delivery_outbox_depth", self.__outbox.qsize())
+
+    async def close(self, timeout: float = 10.0) -> None:
+        if not self.__client:
+            return
+
+        try:
+            await asyncio.wait_for(self.__outbox.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"message delivery closed with {self.__outbox.qsize()} messages undelivered")
+
+        for task in self.__tasks:
+            task.cancel()
+        await asyncio.gather(*self.__tasks, return_exceptions=True)
+        await self.__client.aclose()
+        self.__client = None
+        self.__tasks = []
+
+    def __get_headers(self) -> Dict[str, str]:
+        if self.__headers is None or time.monotonic() - self.__headers_created_at > self.__HEADERS_TTL_SECONDS:
+            self.__headers = generate_hmac_headers(self.__hmac_secret)
+            self.__headers_created_at = time.monotonic()
+
+        return self.__headers
+
+    def __message(self, text: str) -> Dict[str, str]:
+        return {
+            "sender": self.__sender,
+            "message_type": "ai",
+            "text": text
+        }
+
+    async def __collect(self) -> List[OutboxItem]:
+        items = [await self.__outbox.get()]
+        if not self.__batch_path:
+            return items
+
+        deadline = time.monotonic() + self.__batch_window
+        while len(items) < self.__batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self.__outbox.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return items
+
+    async def __post(self, items: List[OutboxItem]) -> httpx.Response:
+        if self.__batch_path:
+            return await self.__client.post(
+                f"{self.__endpoint}{self.__batch_path}",
+                headers=self.__get_headers(),
+                json={
+                    "messages": [
+                        {"chat_id": chat_id, **self.__message(text)} for chat_id, text, _ in items
+                    ]
+                }
+            )
+
+        chat_id, text, _ = items[0]
+        return await self.__client.post(
+            f"{self.__endpoint}/messages/internal/{chat_id}",
+            headers=self.__get_headers(),
+            json=self.__message(text)
+        )
+
+    async def __send(self, items: List[OutboxItem]) -> bool:
+        for attempt in range(self.__max_retries + 1):
+            try:
+                response = await self.__post(items)
+                if response.is_success:
+                    Metrics.increment("message_delivery_attempts_total", labels={"outcome": "success"})
+                    return True
+
+                retryable = response.status_code in RETRYABLE_STATUS_CODES
+                if response.status_code == 401:
+                    # A rejected signature may just be stale, sign again before retrying
+                    self.__headers = None
+                    retryable = True
+                logger.warning(f"main server answered {response.status_code} :::: {response.text[:200]}")
+                Metrics.increment("message_delivery_attempts_total", labels={"outcome": f"http_{response.status_code}"})
+
+            except RETRYABLE_TRANSPORT_ERRORS as e:
+                retryable = True
+                logger.warning(f"main server unreachable :::: {str(e)}")
+                Metrics.increment("message_delivery_attempts_total", labels={"outcome": "transport_error"})
+
+            except httpx.TransportError as e:
+                retryable = False
+                logger.warning(f"main server may have received the message, not retrying :::: {type(e).__name__} {str(e)}")
+                Metrics.increment("message_delivery_attempts_total", labels={"outcome": "transport_error_after_send"})
+
+            if not retryable or attempt == self.__max_retries:
+                return False
+
+            backoff = min(self.__backoff_max, self.__backoff_base * 2 ** attempt)
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+
+        return False
+
+    async def __run_sender(self) -> None:
+        while True:
+            items = await self.__collect()
+            delivered = False
+            try:
+                delivered = await self.__send(items)
+
+            except Exception as e:
+                logger.error(f"message delivery failed :::: {str(e)}")
+
+            finally:
+                for chat_id, _, queued_at in items:
+                    status = "delivered" if delivered else "failed"
+                    Metrics.increment("message_deliveries_total", labels={"status": status})
+                    if delivered:
+                        Metrics.observe("message_delivery_seconds", time.perf_counter() - queued_at)
+                    else:
+                        logger.error(f"final message for chat {chat_id} could not be delivered")
+                    self.__outbox.task_done()
+                Metrics.set_gauge("message_delivery_outbox_depth", self.__outbox.qsize())
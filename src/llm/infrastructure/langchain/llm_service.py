@@ -1,60 +1,443 @@
-from typing import AsyncGenerator
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+import httpx
+import openai
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
 
-from src.llm.domain.services.llm_service import LlmService
+from src.llm.application.services.rate_limiter import RateLimiter
+from src.llm.application.services.token_counter import TokenCounter, estimate_tokens
+from src.llm.domain.services.llm_service import LlmService, Prompt
+from src.shared.domain.exceptions.llm import LlmDeadlineExceeded
 from src.shared.utils.decorators.error_hanlder import error_handler
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("llm_time_to_first_token_seconds", "Time from request to the first streamed token")
+Metrics.describe("llm_request_seconds", "Total LLM call duration")
+Metrics.describe(
+    "llm_stream_tokens_per_second",
+    "Streamed chunks per second after the first token",
+    buckets=(5, 10, 20, 30, 40, 60, 80, 100, 150, 200, 300)
+)
+Metrics.describe("llm_requests_total", "LLM calls by method and outcome")
+Metrics.describe("llm_client_pool_size", "ChatOpenAI clients kept in the pool")
+Metrics.describe("llm_prompt_tokens_total", "Prompt tokens sent, by method")
+Metrics.describe("llm_cached_prompt_tokens_total", "Prompt tokens served from the provider prompt cache, by method")
+Metrics.describe("llm_hedged_requests_total", "Duplicate LLM calls issued because the first was slow, by primary and hedge model")
+Metrics.describe("llm_hedge_wins_total", "Hedged LLM calls by the request and model that answered first")
+Metrics.describe("llm_deadline_exceeded_total", "LLM calls abandoned at their deadline, by deadline")
+Metrics.describe("llm_retries_total", "LLM calls retried after a transient error, by error")
+
+# Retried here instead of in the OpenAI SDK, so every retry waits for rate limit budget
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+# (model, temperature, max_tokens, streaming, structured schema)
+ClientKey = Tuple[str, float, Optional[int], bool, Optional[Hashable]]
 
 class LangchainLlmService(LlmService):
     __MODULE = "langchain.llm_service"
-    def __init__(self, model: str = "gpt-4o"):
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        max_connections: int = 100,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+        call_timeout: Optional[float] = None,
+        first_token_timeout: Optional[float] = None,
+        hedging: bool = False,
+        hedge_model: Optional[str] = None,
+        hedge_percentile: float = 95,
+        hedge_min_delay: float = 1.0,
+        hedge_initial_delay: float = 4.0,
+        hedge_window: int = 200,
+        rate_limiters: Optional[Callable[[str], RateLimiter]] = None,
+        token_counter: Optional[TokenCounter] = None,
+        completion_tokens: int = 512,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        retry_backoff_max: float = 8.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
         self.model = model
-    
+        # model -> its rate limiter, OpenAI budgets every model separately
+        self.__rate_limiters = rate_limiters
+        self.__token_counter = token_counter
+        self.__completion_tokens = completion_tokens
+        self.__max_retries = max_retries
+        self.__retry_backoff = retry_backoff
+        self.__retry_backoff_max = retry_backoff_max
+        self.__timeout = timeout
+        self.__transport = transport
+        self.__limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        # model -> the connection pool every client of that model shares, so calls reuse warm TLS connections
+        self.__http_clients: Dict[str, httpx.AsyncClient] = {}
+        self.__clients: Dict[ClientKey, Runnable] = {}
+        self.__call_timeout = call_timeout
+        self.__first_token_timeout = first_token_timeout
+        self.__hedging = hedging
+        self.__hedge_model = hedge_model or model
+        self.__hedge_percentile = hedge_percentile
+        self.__hedge_min_delay = hedge_min_delay
+        self.__hedge_initial_delay = hedge_initial_delay
+        # method -> recent latencies (first token for streams, full response otherwise)
+        self.__latencies: Dict[str, Deque[float]] = {}
+        self.__hedge_window = hedge_window
+
+    def __get_http_client(self, model: str) -> httpx.AsyncClient:
+        http_client = self.__http_clients.get(model)
+
+        if http_client is None:
+            event_hooks = None
+            if self.__rate_limiters:
+                rate_limiter = self.__rate_limiters(model)
+
+                # Every model's budget follows the x-ratelimit headers of its own responses
+                async def observe_rate_limits(response: httpx.Response) -> None:
+                    rate_limiter.observe(response.status_code, response.headers)
+
+                event_hooks = {"response": [observe_rate_limits]}
+
+            http_client = httpx.AsyncClient(
+                timeout=self.__timeout,
+                limits=self.__limits,
+                event_hooks=event_hooks,
+                transport=self.__transport
+            )
+            self.__http_clients[model] = http_client
+
+        return http_client
+
+    def __get_client(
+        self,
+        temperature: float,
+        max_tokens: Optional[int],
+        streaming: bool = False,
+        response_model = None,
+        model: str = None
+    ) -> Runnable:
+        key = (model or self.model, temperature, max_tokens, streaming, response_model)
+        client = self.__clients.get(key)
+
+        if client is None:
+            client = ChatOpenAI(
+                model=model or self.model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                streaming=streaming,
+                # Streams end with a usage chunk so cached prompt tokens can be reported
+                stream_usage=True,
+                max_retries=0,
+                http_async_client=self.__get_http_client(model or self.model)
+            )
+            if response_model is not None:
+                client = client.with_structured_output(response_model, include_raw=True)
+
+            self.__clients[key] = client
+            Metrics.set_gauge("llm_client_pool_size", len(self.__clients), {"model": self.model})
+            logger.debug(f"llm client created for {key}")
+
+        return client
+
+    @staticmethod
+    def __record_usage(labels: Dict[str, str], message) -> None:
+        usage = getattr(message, "usage_metadata", None)
+        if not usage:
+            return
+
+        Metrics.increment("llm_prompt_tokens_total", value=usage.get("input_tokens", 0), labels=labels)
+        cached = (usage.get("input_token_details") or {}).get("cache_read", 0)
+        Metrics.increment("llm_cached_prompt_tokens_total", value=cached or 0, labels=labels)
+
+    def __record_latency(self, method: str, seconds: float) -> None:
+        self.__latencies.setdefault(method, deque(maxlen=self.__hedge_window)).append(seconds)
+
+    def __hedge_delay(self, method: str) -> Optional[float]:
+        """Waits this long for the first request before duplicating it, None when hedging is off"""
+        if not self.__hedging:
+            return None
+
+        latencies = sorted(self.__latencies.get(method) or [])
+        if len(latencies) < 20:
+            return self.__hedge_initial_delay
+
+        index = min(len(latencies) - 1, int(self.__hedge_percentile / 100 * len(latencies)))
+        return max(self.__hedge_min_delay, latencies[index])
+
+    def __estimate(self, prompt: Prompt, max_tokens: Optional[int]) -> int:
+        # Without a token counter only the request budget is spent
+        if not self.__token_counter:
+            return 0
+        return estimate_tokens(self.__token_counter, prompt, max_tokens, self.__completion_tokens)
+
+    async def __attempt(self, request: Callable[[str], Awaitable[Any]], model: str, tokens: int) -> Any:
+        """
+        Runs the request on the model, retrying transient errors with backoff.
+        Every attempt, retries and hedges included, first waits for the model's rate limit budget,
+        after a 429 the limiter is paused until the reset so no backoff is added.
+        """
+        rate_limiter = self.__rate_limiters(model) if self.__rate_limiters else None
+        for attempt in range(self.__max_retries + 1):
+            if rate_limiter:
+                await rate_limiter.acquire(tokens)
+
+            try:
+                return await request(model)
+
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.__max_retries:
+                    raise
+                Metrics.increment("llm_retries_total", labels={"model": model, "error": type(e).__name__})
+                logger.warning(f"{model} failed with {type(e).__name__}, retrying :::: {str(e)}")
+
+                if not (rate_limiter and isinstance(e, openai.RateLimitError)):
+                    backoff = min(self.__retry_backoff_max, self.__retry_backoff * 2 ** attempt)
+                    await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+
+    @staticmethod
+    def __remaining(deadline: Optional[float]) -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    async def __race(
+        self,
+        method: str,
+        request: Callable[[str], Awaitable[Any]],
+        tokens: int,
+        release: Callable[[Any], Awaitable[None]] = None
+    ) -> Any:
+        """
+        Runs the request on the primary model and, if it has not answered within the hedge delay,
+        again on the hedge model. The first successful answer wins and the other call is cancelled.
+        """
+        labels = {"model": self.model, "method": method}
+        hedge_delay = self.__hedge_delay(method)
+        primary = asyncio.create_task(self.__attempt(request, self.model, tokens))
+        tasks = {primary}
+        pending = {primary}
+        winner: Optional[asyncio.Task] = None
+        error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                hedged = len(tasks) > 1
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if hedged else hedge_delay,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    Metrics.increment("llm_hedged_requests_total", labels={**labels, "hedge_model": self.__hedge_model})
+                    hedge = asyncio.create_task(self.__attempt(request, self.__hedge_model, tokens))
+                    tasks.add(hedge)
+                    pending.add(hedge)
+                    continue
+
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        if hedged:
+                            Metrics.increment("llm_hedge_wins_total", labels={
+                                "method": method,
+                                "model": self.model if task is primary else self.__hedge_model,
+                                "winner": "primary" if task is primary else "hedge"
+                            })
+                        return task.result()
+                    error = task.exception()
+
+            raise error
+
+        finally:
+            for task in tasks - {winner}:
+                if not task.done():
+                    task.cancel()
+                elif release and not task.cancelled() and task.exception() is None:
+                    # A loser that already answered, e.g. an open stream
+                    await release(task.result())
+
+    async def close(self) -> None:
+        self.__clients.clear()
+        for http_client in self.__http_clients.values():
+            await http_client.aclose()
+        self.__http_clients.clear()
+
+    async def __open_stream(self, llm: Runnable, prompt: Prompt, labels: Dict[str, str]) -> Tuple[AsyncIterator, Any]:
+        """Starts a stream and reads it up to the first chunk with content"""
+        stream = llm.astream(prompt).__aiter__()
+        try:
+            while True:
+                chunk = await stream.__anext__()
+                self.__record_usage(labels, chunk)
+                if chunk.content:
+                    return stream, chunk
+
+        except StopAsyncIteration:
+            return stream, None
+
+        except BaseException:
+            await stream.aclose()
+            raise
+
     @error_handler(module=__MODULE)
     async def generate_stream(
         self,
-        prompt: str,
+        prompt: Prompt,
         temperature: float = 0.7,
-        max_tokens: int = None
+        max_tokens: int = None,
+        timeout: float = None
     ) -> AsyncGenerator[str, None]:
-        llm = ChatOpenAI(
-            model=self.model,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            streaming=True
-        )
-        
-        async for chunk in llm.astream(prompt):
-            yield chunk.content
-    
+        labels = {"model": self.model, "method": "generate_stream"}
+        timeout = timeout or self.__call_timeout
+
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout if timeout else None
+        first_token_at = None
+        chunks = 0
+        outcome = "error"
+        stream = None
+        try:
+            first_token_deadline = self.__remaining(deadline)
+            if self.__first_token_timeout:
+                first_token_deadline = min(first_token_deadline or self.__first_token_timeout, self.__first_token_timeout)
+
+            async def request(model: str):
+                llm = self.__get_client(temperature, max_tokens, streaming=True, model=model)
+                return await self.__open_stream(llm, prompt, labels)
+
+            async def release(opened):
+                await opened[0].aclose()
+
+            try:
+                async with asyncio.timeout(first_token_deadline):
+                    stream, chunk = await self.__race("generate_stream", request, self.__estimate(prompt, max_tokens), release)
+            except TimeoutError:
+                if first_token_deadline is None:
+                    # Not our deadline, raised by the call itself
+                    raise
+                outcome = "first_token_deadline"
+                Metrics.increment("llm_deadline_exceeded_total", labels={**labels, "deadline": "first_token"})
+                raise LlmDeadlineExceeded(
+                    detail=f"No token from {self.model} within {first_token_deadline:.1f}s",
+                    deadline=first_token_deadline
+                )
+
+            if chunk is not None:
+                first_token_at = time.perf_counter()
+                Metrics.observe("llm_time_to_first_token_seconds", first_token_at - start, labels)
+                self.__record_latency("generate_stream", first_token_at - start)
+                chunks += 1
+                yield chunk.content
+
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), self.__remaining(deadline))
+                    except StopAsyncIteration:
+                        break
+                    except TimeoutError:
+                        if deadline is None:
+                            raise
+                        outcome = "deadline"
+                        Metrics.increment("llm_deadline_exceeded_total", labels={**labels, "deadline": "call"})
+                        raise LlmDeadlineExceeded(
+                            detail=f"Stream from {self.model} exceeded {timeout:.1f}s",
+                            deadline=timeout
+                        )
+
+                    self.__record_usage(labels, chunk)
+                    if not chunk.content:
+                        continue
+                    chunks += 1
+                    yield chunk.content
+            outcome = "success"
+
+        finally:
+            if stream is not None:
+                await stream.aclose()
+            end = time.perf_counter()
+            Metrics.observe("llm_request_seconds", end - start, labels)
+            Metrics.increment("llm_requests_total", labels={**labels, "outcome": outcome})
+            if first_token_at is not None and end > first_token_at:
+                Metrics.observe("llm_stream_tokens_per_second", chunks / (end - first_token_at), labels)
+
+    async def __invoke_with_deadline(
+        self,
+        method: str,
+        request: Callable[[str], Awaitable[Any]],
+        tokens: int,
+        timeout: Optional[float]
+    ) -> Any:
+        labels = {"model": self.model, "method": method}
+        timeout = timeout or self.__call_timeout
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                response = await self.__race(method, request, tokens)
+            self.__record_latency(method, time.perf_counter() - start)
+            outcome = "success"
+            return response
+
+        except TimeoutError:
+            if timeout is None:
+                raise
+            outcome = "deadline"
+            Metrics.increment("llm_deadline_exceeded_total", labels={**labels, "deadline": "call"})
+            raise LlmDeadlineExceeded(
+                detail=f"{self.model} did not answer within {timeout:.1f}s",
+                deadline=timeout
+            )
+
+        finally:
+            Metrics.observe("llm_request_seconds", time.perf_counter() - start, labels)
+            Metrics.increment("llm_requests_total", labels={**labels, "outcome": outcome})
+
     @error_handler(module=__MODULE)
     async def invoke(
         self,
-        prompt: str,
+        prompt: Prompt,
         temperature: float = 0.7,
-        max_tokens: int = None
+        max_tokens: int = None,
+        timeout: float = None
     ) -> str:
-        llm = ChatOpenAI(
-            model=self.model,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        response = await llm.ainvoke(prompt)
+        labels = {"model": self.model, "method": "invoke"}
+
+        async def request(model: str):
+            llm = self.__get_client(temperature, max_tokens, model=model)
+            response = await llm.ainvoke(prompt)
+            self.__record_usage(labels, response)
+            return response
+
+        response = await self.__invoke_with_deadline("invoke", request, self.__estimate(prompt, max_tokens), timeout)
         return response.content.strip()
-    
+
     async def invoke_structured(
-            self, 
-            prompt: str, 
-            response_model, 
-            temperature: float = 0.7, 
-            max_tokens: int = None
+            self,
+            prompt: Prompt,
+            response_model,
+            temperature: float = 0.7,
+            max_tokens: int = None,
+            timeout: float = None
         ):
-        llm = ChatOpenAI(
-            model=self.model,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
+        labels = {"model": self.model, "method": "invoke_structured"}
+
+        async def request(model: str):
+            structured_llm = self.__get_client(temperature, max_tokens, response_model=response_model, model=model)
+            response = await structured_llm.ainvoke(prompt)
+            self.__record_usage(labels, response["raw"])
+            if response["parsing_error"]:
+                raise response["parsing_error"]
+            return response["parsed"]
 
-        structured_llm = llm.with_structured_output(response_model)
-        response = await structured_llm.ainvoke(prompt)
-        return response
-        
\ No newline at end of file
+        return await self.__invoke_with_deadline(
+            "invoke_structured", request, self.__estimate(prompt, max_tokens), timeout
+        )
@@ -0,0 +1,89 @@
+import time
+import logging
+from uuid import uuid4
+from typing import Any, Dict, List
+
+from src.llm.application.use_cases.speculative_retrieval import SpeculativeRetrieval
+from src.llm.domain.models import ContextOrchestratorOutput
+from src.llm.domain.state import State
+from src.llm.infrastructure.langgraph.workflow_service import LanggraphWorkflowService
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+class StubAgent:
+    """Agent stand-in that answers instantly, used to exercise the graph without network calls"""
+    def __init__(self, response: Any):
+        self.__response = response
+
+    async def interact(self, state: State):
+        if callable(self.__response):
+            return self.__response(state)
+
+        return self.__response
+
+
+class StubSearchForContext:
+    async def execute(self, input: str, namespace: str, top_k: int = 2) -> List[str]:
+        return []
+
+    async def execute_batch(self, input: str, namespaces: List[str], top_k: int = 2) -> Dict[str, List[str]]:
+        return {namespace: [] for namespace in namespaces}
+
+
+class StubMessageDelivery:
+    async def start(self) -> None:
+        return None
+
+    async def deliver(self, chat_id, text: str) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+
+def create_stub_workflow_service() -> LanggraphWorkflowService:
+    return LanggraphWorkflowService(
+        context_orchestrator=StubAgent(lambda state: state["context_orchestrator_response"]),
+        general_legal_researcher=StubAgent("general legal research"),
+        company_legal_researcher=StubAgent("company legal research"),
+        research_aggregator_agent=StubAgent("aggregated response"),
+        fallback_agent=StubAgent("fallback response"),
+        speculative_retrieval=SpeculativeRetrieval(search_for_context=StubSearchForContext(), enabled=False),
+        message_delivery=StubMessageDelivery()
+    )
+
+
+def create_stub_state(general_law: bool, company_law: bool) -> State:
+    return State(
+        company_id=uuid4(),
+        chat_history=[],
+        chat_id=uuid4(),
+        input="warm up",
+        # The stub orchestrator echoes this back so every route can be exercised
+        context_orchestrator_response=ContextOrchestratorOutput(
+            general_law=general_law,
+            company_law=company_law
+        ),
+        general_legal_response="",
+        company_legal_response="",
+        final_response="",
+        cache_hit=False,
+        voice=False
+    )
+
+
+async def warm_up_workflow() -> None:
+    """
+    Runs every route of a stub-backed graph once so langgraph's lazy imports,
+    schema introspection and channel setup happen at startup instead of on the first request.
+    """
+    start = time.perf_counter()
+    graph = create_stub_workflow_service().get_workflow()
+
+    # Stub runs must not show up in the node latency histograms, metrics other components record meanwhile still do
+    with Metrics.suppressed():
+        for general_law, company_law in [(True, False), (False, True), (True, True), (False, False)]:
+            await graph.ainvoke(create_stub_state(general_law=general_law, company_law=company_law))
+
+    logger.info(f"workflow warm up completed in {(time.perf_counter() - start) * 1000:.1f}ms")
@@ -1,12 +1,12 @@
-from typing import List
-import os
+from typing import List, Optional, Callable, Awaitable
+from functools import wraps
 import logging
-import httpx
 from langgraph.graph import START, END, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
-from src.shared.utils.http.get_hmac_header import generate_hmac_headers
+from src.shared.utils.metrics import Metrics
 from src.llm.domain.services.workflow_service import WorkflowService
+from src.llm.domain.services.message_delivery import MessageDeliveryService
 from src.llm.domain.models import ContextOrchestratorOutput
 from src.llm.domain.state import State
 from src.llm.application.agents.aggregator_agent import ResearchAggregator
@@ -14,8 +14,15 @@ from src.llm.application.agents.company_research_agent import CompanyLegalResear
 from src.llm.application.agents.context_orchestrator_agent import ContextOrchestrator
 from src.llm.application.agents.fallback_agent import FallBackAgent
 from src.llm.application.agents.general_legal_agent import GeneralLegalResearcher
+from src.llm.application.agents.cached_response_agent import CachedResponseAgent
+from src.llm.application.agents.progressive_aggregator_agent import ProgressiveAggregator
+from src.llm.application.use_cases.speculative_retrieval import SpeculativeRetrieval, speculative_retrieval_scope
+from src.llm.application.services.cached_embedding_service import embedding_request_scope
+from src.llm.application.services.rate_limiter import request_priority
 logger = logging.getLogger(__name__)
 
+Metrics.describe("workflow_node_seconds", "Duration of each workflow node")
+
 class LanggraphWorkflowService(WorkflowService):
     def __init__(
         self,
@@ -23,21 +30,57 @@ class LanggraphWorkflowService(WorkflowService):
         general_legal_researcher: GeneralLegalResearcher,
         company_legal_researcher: CompanyLegalResearcher,
         context_orchestrator: ContextOrchestrator,
-        fallback_agent: FallBackAgent
+        fallback_agent: FallBackAgent,
+        speculative_retrieval: SpeculativeRetrieval,
+        message_delivery: MessageDeliveryService,
+        cached_response_agent: Optional[CachedResponseAgent] = None,
+        progressive_aggregator: Optional[ProgressiveAggregator] = None
     ):
         self.__context_orchestrator_agent = context_orchestrator
         self.__general_legal_researcher = general_legal_researcher
         self.__company_legal_researcher = company_legal_researcher
         self.__fallback_agent = fallback_agent
         self.__research_aggregator = research_aggregator_agent
+        self.__speculative_retrieval = speculative_retrieval
+        self.__cached_response_agent = cached_response_agent
+        self.__message_delivery = message_delivery
+        self.__progressive_aggregator = progressive_aggregator
+        self.__workflow: CompiledStateGraph = None
+
+    @staticmethod
+    def __timed_node(name: str, node: Callable[[State], Awaitable[dict]]):
+        @wraps(node)
+        async def timed(state: State):
+            with Metrics.timer("workflow_node_seconds", labels={"node": name}):
+                return await node(state)
+
+        return timed
 
     def create_workflow(self):
         graph = StateGraph(State)
 
 
-        async def context_orchestrator_node(state: State):       
-            response =  await self.__context_orchestrator_agent.interact(state=state)
+        async def semantic_cache_node(state: State):
+            response = await self.__cached_response_agent.interact(state=state)
+            if response:
+                return {"final_response": response, "cache_hit": True}
+
+            return {"cache_hit": False}
+        
+
+        def route_cached_response(state: State) -> str:
+            return "handle_response" if state.get("cache_hit") else "context_orchestrator"
+        
 
+        async def context_orchestrator_node(state: State):       
+            self.__speculative_retrieval.start(state=state)
+            try:
+                response =  await self.__context_orchestrator_agent.interact(state=state)
+            except Exception:
+                self.__speculative_retrieval.discard()
+                raise
+
+            self.__speculative_retrieval.settle(state, response)
             return {"context_orchestrator_response": response}
         
 
@@ -45,6 +88,10 @@ class LanggraphWorkflowService(WorkflowService):
             orchestrator_response: ContextOrchestratorOutput = state["context_orchestrator_response"]
             next_nodes = []
 
+            # Dual-branch turns stream while researching instead of waiting on both researchers
+            if self.__progressive_aggregator and orchestrator_response.general_law and orchestrator_response.company_law:
+                return ["progressive_research"]
+
             if orchestrator_response.general_law:
                 next_nodes.append("general_legal_research")
 
@@ -75,40 +122,45 @@ class LanggraphWorkflowService(WorkflowService):
 
             return {"final_response": response}
         
+        async def progressive_research_node(state: State):
+            return await self.__progressive_aggregator.interact(state=state)
+
         async def fallback_node(state: State):
             response = await self.__fallback_agent.interact(state=state)
             return {"final_response": response}
         
         async def hanlde_response_node(state: State):
-            hmac_headers = generate_hmac_headers(os.getenv("HMAC_SECRET"))
-            main_server = os.getenv("MAIN_SERVER_ENDPOINT")
-            req_body = {
-                "sender": os.getenv("AGENT_ID"),
-                "message_type": "ai",
-                "text": state["final_response"]
-            }
-            
-            async with httpx.AsyncClient() as client:
-                res = await client.post(
-                    f"{main_server}/messages/internal/{state['chat_id']}",
-                    headers=hmac_headers,
-                    json=req_body
-                )
+            if self.__cached_response_agent:
+                await self.__cached_response_agent.remember(state=state)
 
-                if res.status_code != 201:
-                    logger.warning("POST response:", res)
+            await self.__message_delivery.deliver(
+                chat_id=state["chat_id"],
+                text=state["final_response"]
+            )
 
-                return state
+            return state
                 
 
-        graph.add_node("context_orchestrator", context_orchestrator_node)
-        graph.add_node("general_legal_research", general_legal_research_node)
-        graph.add_node("company_legal_research", company_legal_research_node)
-        graph.add_node("aggregator", aggregator_node)
-        graph.add_node("fallback", fallback_node)
-        graph.add_node("handle_response", hanlde_response_node)
+        graph.add_node("context_orchestrator", self.__timed_node("context_orchestrator", context_orchestrator_node))
+        graph.add_node("general_legal_research", self.__timed_node("general_legal_research", general_legal_research_node))
+        graph.add_node("company_legal_research", self.__timed_node("company_legal_research", company_legal_research_node))
+        graph.add_node("aggregator", self.__timed_node("aggregator", aggregator_node))
+        graph.add_node("fallback", self.__timed_node("fallback", fallback_node))
+        if self.__progressive_aggregator:
+            graph.add_node("progressive_research", self.__timed_node("progressive_research", progressive_research_node))
+            graph.add_edge("progressive_research", "handle_response")
+        graph.add_node("handle_response", self.__timed_node("handle_response", hanlde_response_node))
         
-        graph.add_edge(START, "context_orchestrator")
+        if self.__cached_response_agent:
+            graph.add_node("semantic_cache", self.__timed_node("semantic_cache", semantic_cache_node))
+            graph.add_edge(START, "semantic_cache")
+            graph.add_conditional_edges(
+                "semantic_cache",
+                route_cached_response,
+                ["context_orchestrator", "handle_response"]
+            )
+        else:
+            graph.add_edge(START, "context_orchestrator")
         
         graph.add_conditional_edges(
             "context_orchestrator",
@@ -117,7 +169,8 @@ class LanggraphWorkflowService(WorkflowService):
                 "general_legal_research",
                 "company_legal_research",
                 "fallback",
-                "aggregator"
+                "aggregator",
+                *(["progressive_research"] if self.__progressive_aggregator else [])
             ]
         )
 
@@ -130,9 +183,20 @@ class LanggraphWorkflowService(WorkflowService):
 
         return graph.compile()
     
+    def get_workflow(self) -> CompiledStateGraph:
+        """Returns the shared compiled graph, compiling it on first use"""
+        if self.__workflow is None:
+            self.__workflow = self.create_workflow()
+            logger.info("workflow compiled")
+
+        return self.__workflow
+    
     async def invoke_workflow(self, state):
-        graph: CompiledStateGraph = self.create_workflow()
+        graph: CompiledStateGraph = self.get_workflow()
 
-        final_state = await graph.ainvoke(state)
+        # Every node embedding the same input within this run shares one vector, prefetched searches
+        # stay with the run that started them, and voice runs are served first when OpenAI calls have to queue
+        with embedding_request_scope(), speculative_retrieval_scope(), request_priority(voice=bool(state.get("voice"))):
+            final_state = await graph.ainvoke(state)
 
         return final_state
\ No newline at end of file
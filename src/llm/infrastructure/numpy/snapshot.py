@@ -0,0 +1,85 @@
+"""
+Snapshots a Qdrant collection for MmapVectorRepository.
+
+Usage:
+    python -m src.llm.infrastructure.numpy.snapshot --collection "$LEGAL_COLLECTION" --output "$LOCAL_VECTOR_PATH" [--hnsw]
+"""
+import os
+import asyncio
+import argparse
+import logging
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+from qdrant_client import AsyncQdrantClient
+
+from src.llm.infrastructure.numpy.vector_repository import write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+async def snapshot_collection(
+    client: AsyncQdrantClient,
+    collection: str,
+    root: str,
+    batch_size: int = 1000,
+    hnsw: bool = False
+) -> str:
+    ids: List[Any] = []
+    vectors: List[List[float]] = []
+    payloads: List[Dict[str, Any]] = []
+
+    offset = None
+    while True:
+        points, offset = await client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        for point in points:
+            ids.append(point.id)
+            vectors.append(point.vector)
+            payloads.append(point.payload or {})
+        logger.info(f"{collection}: {len(ids)} points read")
+
+        if offset is None:
+            break
+
+    return write_snapshot(
+        directory=os.path.join(root, collection),
+        ids=ids,
+        vectors=vectors,
+        payloads=payloads,
+        source=collection,
+        hnsw=hnsw
+    )
+
+
+async def main(args) -> None:
+    client = AsyncQdrantClient(
+        url=os.getenv("QDRANT_URL"),
+        api_key=os.getenv("QDRANT_API_KEY"),
+        timeout=int(os.getenv("QDRANT_TIMEOUT", 60))
+    )
+    try:
+        for collection in args.collection:
+            directory = await snapshot_collection(client, collection, args.output, args.batch_size, args.hnsw)
+            print(f"{collection} -> {directory}")
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--collection", action="append", required=True, help="Collection to snapshot, repeatable")
+    parser.add_argument("--output", default=os.getenv("LOCAL_VECTOR_PATH", "vector_snapshots"))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--hnsw", action="store_true", help="Also build an HNSW graph, requires hnswlib")
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -0,0 +1,333 @@
+import os
+import json
+import mmap
+import time
+import shutil
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.llm.domain.entities import SearchResult
+from src.llm.domain.repositorties.vector_repository import SearchQuery, VectorRepository
+from src.shared.utils.metrics import Metrics
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("local_vector_search_seconds", "In-process vector search duration")
+
+VECTORS_FILE = "vectors.npy"
+OFFSETS_FILE = "offsets.npy"
+PAYLOADS_FILE = "payloads.jsonl"
+HNSW_FILE = "hnsw.bin"
+MANIFEST_FILE = "manifest.json"
+
+# Below this many matrix cells (16MB of float32) a brute force search takes about a millisecond and runs on the event loop
+INLINE_SEARCH_CELLS = 4_000_000
+# Below this many rows a payload scan, which parses every payload it visits, runs on the event loop
+INLINE_SCAN_ROWS = 1_000
+
+
+def write_snapshot(
+    directory: str,
+    ids: List[Any],
+    vectors: Iterable[List[float]],
+    payloads: Iterable[Dict[str, Any]],
+    source: Optional[str] = None,
+    hnsw: bool = False,
+    hnsw_m: int = 16,
+    hnsw_ef_construction: int = 200
+) -> str:
+    """
+    Writes one namespace as a snapshot directory:
+    normalized float32 vectors (.npy, memory-mappable), payloads as JSON lines with their byte offsets,
+    an optional HNSW graph and a manifest. The directory is replaced atomically.
+    """
+    matrix = np.asarray(vectors if isinstance(vectors, np.ndarray) else list(vectors), dtype=np.float32)
+    if not ids:
+        matrix = matrix.reshape(0, matrix.shape[-1] if matrix.ndim == 2 else 0)
+    if matrix.ndim != 2 or len(matrix) != len(ids):
+        raise ValueError(f"expected {len(ids)} vectors, got an array of shape {matrix.shape}")
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+
+    staging = f"{directory.rstrip(os.sep)}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    np.save(os.path.join(staging, VECTORS_FILE), matrix)
+
+    offsets = [0]
+    with open(os.path.join(staging, PAYLOADS_FILE), "wb") as file:
+        for point_id, payload in zip(ids, payloads):
+            line = json.dumps({"id": point_id, "payload": payload}, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+            file.write(line)
+            offsets.append(offsets[-1] + len(line))
+    np.save(os.path.join(staging, OFFSETS_FILE), np.asarray(offsets, dtype=np.int64))
+
+    if hnsw:
+        if hnswlib is None:
+            raise RuntimeError("hnswlib is not installed, snapshot without hnsw or install it")
+
+        index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+        index.init_index(max_elements=max(1, len(matrix)), ef_construction=hnsw_ef_construction, M=hnsw_m)
+        index.add_items(matrix, np.arange(len(matrix)))
+        index.save_index(os.path.join(staging, HNSW_FILE))
+
+    with open(os.path.join(staging, MANIFEST_FILE), "w") as file:
+        json.dump({
+            "source": source,
+            "count": int(matrix.shape[0]),
+            "dimensions": int(matrix.shape[1]) if matrix.size else 0,
+            "distance": "cosine",
+            "hnsw": hnsw,
+            "created_at": time.time()
+        }, file)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(staging, directory)
+    return directory
+
+
+def get_field(payload: Dict[str, Any], key: str) -> Any:
+    """Dotted keys reach into nested payloads like Qdrant, e.g. metadata.law"""
+    value: Any = payload
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class VectorSnapshot:
+    """
+    One namespace loaded from a snapshot directory. Vectors and payloads are memory mapped read-only,
+    so loading is zero-copy and every worker process on the host shares the same page cache.
+    """
+    def __init__(self, directory: str, use_hnsw: bool = True, hnsw_ef: int = 64):
+        with open(os.path.join(directory, MANIFEST_FILE)) as file:
+            self.manifest = json.load(file)
+
+        self.vectors: np.ndarray = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode="r")
+        self.__offsets: np.ndarray = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode="r")
+        self.__payloads_file = open(os.path.join(directory, PAYLOADS_FILE), "rb")
+        self.__payloads = mmap.mmap(self.__payloads_file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.path.getsize(self.__payloads_file.name) else b""
+
+        self.__hnsw = None
+        hnsw_path = os.path.join(directory, HNSW_FILE)
+        if use_hnsw and hnswlib is None and os.path.exists(hnsw_path):
+            logger.warning(
+                f"{directory} has an HNSW graph but hnswlib is not installed, searching it by brute force. "
+                "Install the hnsw extra or set LOCAL_VECTOR_HNSW=false"
+            )
+        elif use_hnsw and os.path.exists(hnsw_path):
+            # The graph is loaded into process memory, only the brute force path is zero-copy
+            self.__hnsw = hnswlib.Index(space="ip", dim=self.vectors.shape[1])
+            self.__hnsw.load_index(hnsw_path, max_elements=len(self.vectors))
+            self.__hnsw.set_ef(hnsw_ef)
+
+        self.__rows: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def inline(self, queries: int, filtered: int = 0) -> bool:
+        """
+        Whether a batch is cheap enough for the event loop, from the work it does. Filtered queries are brute force
+        even with an HNSW graph, and scan payloads in score order.
+        """
+        if filtered and len(self) > INLINE_SCAN_ROWS:
+            return False
+
+        brute_force = filtered + (queries - filtered if self.__hnsw is None else 0)
+        return brute_force * self.vectors.size <= INLINE_SEARCH_CELLS
+
+    @property
+    def scan_inline(self) -> bool:
+        """Whether a scan of every payload is cheap enough for the event loop"""
+        return len(self) <= INLINE_SCAN_ROWS
+
+    @property
+    def rows_indexed(self) -> bool:
+        return self.__rows is not None
+
+    def point(self, row: int) -> Dict[str, Any]:
+        start, end = int(self.__offsets[row]), int(self.__offsets[row + 1])
+        return json.loads(self.__payloads[start:end])
+
+    def points(self) -> Iterable[Dict[str, Any]]:
+        for row in range(len(self)):
+            yield self.point(row)
+
+    def row(self, point_id: Any) -> Optional[int]:
+        if self.__rows is None:
+            # Built on first lookup, IDs as strings so UUIDs and integers both match
+            self.__rows = {str(point["id"]): row for row, point in enumerate(self.points())}
+        return self.__rows.get(str(point_id))
+
+    def search(self, queries: np.ndarray, top_k: int) -> List[List[Tuple[int, float]]]:
+        """(row, score) pairs per query, best first"""
+        if not len(self.vectors):
+            return [[] for _ in queries]
+
+        top_k = min(top_k, len(self.vectors))
+        if self.__hnsw is not None:
+            rows, distances = self.__hnsw.knn_query(queries, k=top_k)
+            # hnswlib reports inner product distance as 1 - dot
+            return [
+                [(int(row), float(1 - distance)) for row, distance in zip(query_rows, query_distances)]
+                for query_rows, query_distances in zip(rows, distances)
+            ]
+
+        # One matrix product for the whole batch
+        scores = (self.vectors @ queries.T).T
+        results = []
+        for query_scores in scores:
+            if top_k < len(query_scores):
+                best = np.argpartition(-query_scores, top_k - 1)[:top_k]
+            else:
+                best = np.arange(len(query_scores))
+            best = best[np.argsort(-query_scores[best])]
+            results.append([(int(row), float(query_scores[row])) for row in best])
+        return results
+
+    def filtered_search(self, query: np.ndarray, top_k: int, conditions: Dict[str, Any]) -> List[Tuple[int, float]]:
+        """Exact-match filters are applied to payloads in score order, the corpus is small enough to scan"""
+        scores = self.vectors @ query
+        matches = []
+        for row in np.argsort(-scores):
+            payload = self.point(int(row))["payload"]
+            if all(get_field(payload, key) == value for key, value in conditions.items()):
+                matches.append((int(row), float(scores[row])))
+                if len(matches) == top_k:
+                    break
+        return matches
+
+    def close(self) -> None:
+        if isinstance(self.__payloads, mmap.mmap):
+            self.__payloads.close()
+        self.__payloads_file.close()
+
+
+class MmapVectorRepository(VectorRepository):
+    """
+    Serves snapshotted namespaces from memory-mapped NumPy matrices in <root>/<namespace>/,
+    written by write_snapshot or python -m src.llm.infrastructure.numpy.snapshot.
+    Meant for corpora that change rarely, e.g. the shared legal collection.
+    """
+    def __init__(self, root: str, namespaces: List[str], use_hnsw: bool = True, hnsw_ef: int = 64):
+        self.__snapshots: Dict[str, VectorSnapshot] = {}
+        for namespace in namespaces:
+            snapshot = VectorSnapshot(os.path.join(root, namespace), use_hnsw=use_hnsw, hnsw_ef=hnsw_ef)
+            self.__snapshots[namespace] = snapshot
+            logger.info(f"{namespace} snapshot loaded with {len(snapshot)} points")
+
+    @property
+    def namespaces(self) -> List[str]:
+        return list(self.__snapshots)
+
+    @staticmethod
+    def __normalize(vectors: List[List[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    @staticmethod
+    def __to_search_result(point: Dict[str, Any], score: float) -> SearchResult:
+        payload = point.get("payload") or {}
+        return SearchResult(
+            id=point.get("id"),
+            score=score,
+            payload=payload,
+            text=payload.get("text"),
+            metadata=payload.get("metadata") or {}
+        )
+
+    def __search_namespace(self, namespace: str, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        snapshot = self.__snapshots[namespace]
+        vectors = self.__normalize([query.query_vector for query in queries])
+
+        unfiltered = [index for index, query in enumerate(queries) if not query.filter]
+        hits: Dict[int, List[Tuple[int, float]]] = {}
+        if unfiltered:
+            top_k = max(queries[index].top_k for index in unfiltered)
+            for index, pairs in zip(unfiltered, snapshot.search(vectors[unfiltered], top_k)):
+                hits[index] = pairs[:queries[index].top_k]
+        for index, query in enumerate(queries):
+            if query.filter:
+                hits[index] = snapshot.filtered_search(vectors[index], query.top_k, query.filter)
+
+        return [
+            [self.__to_search_result(snapshot.point(row), score) for row, score in hits[index]]
+            for index in range(len(queries))
+        ]
+
+    async def __run(self, namespace: str, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        if namespace not in self.__snapshots:
+            raise KeyError(f"No local snapshot for namespace {namespace}")
+
+        with Metrics.timer("local_vector_search_seconds", labels={"namespace": namespace}):
+            if self.__snapshots[namespace].inline(len(queries), sum(1 for query in queries if query.filter)):
+                return self.__search_namespace(namespace, queries)
+
+            # NumPy releases the GIL, large brute force products and payload scans run off the event loop
+            return await asyncio.to_thread(self.__search_namespace, namespace, queries)
+
+    async def similarity_search(
+        self,
+        query_vector: List[float],
+        top_k: int = 4,
+        namespace: Optional[str] = None
+    ) -> List[SearchResult]:
+        results = await self.__run(namespace, [SearchQuery(namespace=namespace, query_vector=query_vector, top_k=top_k)])
+        return results[0]
+
+    async def batch_search(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        grouped: Dict[str, List[int]] = {}
+        for index, query in enumerate(queries):
+            grouped.setdefault(query.namespace, []).append(index)
+
+        results: List[List[SearchResult]] = [[] for _ in queries]
+        for namespace, indexes in grouped.items():
+            for index, query_results in zip(indexes, await self.__run(namespace, [queries[index] for index in indexes])):
+                results[index] = query_results
+        return results
+
+    async def retrieve(self, namespace: str, ids: List[Any]) -> List[SearchResult]:
+        if namespace not in self.__snapshots:
+            raise KeyError(f"No local snapshot for namespace {namespace}")
+
+        snapshot = self.__snapshots[namespace]
+        if not snapshot.rows_indexed and not snapshot.scan_inline:
+            # The first lookup indexes every point ID
+            await asyncio.to_thread(snapshot.row, None)
+
+        rows = [snapshot.row(point_id) for point_id in ids]
+        return [self.__to_search_result(snapshot.point(row), 1.0) for row in rows if row is not None]
+
+    async def count(self, namespace: str, filter: Optional[Dict[str, Any]] = None) -> int:
+        snapshot = self.__snapshots.get(namespace)
+        if snapshot is None:
+            return 0
+        if not filter:
+            return len(snapshot)
+
+        def scan() -> int:
+            return sum(
+                all(get_field(point["payload"], key) == value for key, value in filter.items())
+                for point in snapshot.points()
+            )
+
+        return scan() if snapshot.scan_inline else await asyncio.to_thread(scan)
+
+    async def close(self) -> None:
+        for snapshot in self.__snapshots.values():
+            snapshot.close()
@@ -1,20 +1,57 @@
 import os
+import httpx
 import tiktoken
-from typing import List
-from openai import AsyncOpenAI
+from typing import Any, Dict, List, Optional
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
+from src.llm.application.services.rate_limiter import RateLimiter
 from src.llm.domain.services.embedding_service import EmbeddingService
+from src.shared.utils.metrics import Metrics
+
+Metrics.describe("embedding_request_seconds", "Embeddings API call duration")
 
 class OpenAIEmbeddingService(EmbeddingService):
-    def __init__(self, model: str = "text-embedding-3-large"):
-        self._client = AsyncOpenAI()
+    def __init__(
+        self,
+        model: str = "text-embedding-3-large",
+        dimensions: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        self._rate_limiter = rate_limiter
+        self._client = AsyncOpenAI(
+            # Rate limit headers of every response feed the shared limiter
+            http_client=DefaultAsyncHttpxClient(event_hooks={"response": [self._observe_rate_limits]})
+        ) if rate_limiter else AsyncOpenAI()
         self._model = model
+        # Shortened vectors come back normalized, None keeps the model's native size
+        self._dimensions = dimensions
         self._encoding = tiktoken.get_encoding("cl100k_base")
 
+    async def _observe_rate_limits(self, response: httpx.Response) -> None:
+        self._rate_limiter.observe(response.status_code, response.headers)
+
+    def _options(self) -> Dict[str, Any]:
+        return {"dimensions": self._dimensions} if self._dimensions else {}
+
     async def embed_query(self, query: str) -> List[float]:
         """Embed a single query"""
-        result = await self._client.embeddings.create(
-            model=self._model,
-            input=query
-        )
+        with Metrics.timer("embedding_request_seconds", labels={"method": "embed_query"}):
+            result = await self._client.embeddings.create(
+                model=self._model,
+                input=query,
+                **self._options()
+            )
         return result.data[0].embedding
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts in a single request"""
+        with Metrics.timer("embedding_request_seconds", labels={"method": "embed_documents"}):
+            result = await self._client.embeddings.create(
+                model=self._model,
+                input=texts,
+                **self._options()
+            )
+        return [item.embedding for item in sorted(result.data, key=lambda item: item.index)]
+
+    async def close(self) -> None:
+        await self._client.close()
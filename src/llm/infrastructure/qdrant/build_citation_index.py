@@ -0,0 +1,78 @@
+"""
+Builds the citation index of a collection from its payloads, read from Qdrant or from a local snapshot.
+
+Usage:
+    python -m src.llm.infrastructure.qdrant.build_citation_index --collection "$LEGAL_COLLECTION" --output citations.json
+    python -m src.llm.infrastructure.qdrant.build_citation_index --snapshot vector_snapshots/legal --output citations.json
+"""
+import os
+import asyncio
+import argparse
+import logging
+from typing import Any, Dict, List, Tuple
+
+from dotenv import load_dotenv
+from qdrant_client import AsyncQdrantClient
+
+from src.llm.application.services.citation_index import CitationIndex
+
+logger = logging.getLogger(__name__)
+
+
+async def read_payloads(client: AsyncQdrantClient, collection: str, batch_size: int = 1000) -> List[Tuple[Any, Dict[str, Any]]]:
+    points = []
+    offset = None
+    while True:
+        records, offset = await client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False
+        )
+        points.extend((record.id, record.payload or {}) for record in records)
+        logger.info(f"{collection}: {len(points)} points read")
+
+        if offset is None:
+            return points
+
+
+async def main(args) -> None:
+    if args.snapshot:
+        from src.llm.infrastructure.numpy.vector_repository import VectorSnapshot
+
+        snapshot = VectorSnapshot(args.snapshot, use_hnsw=False)
+        points = [(point["id"], point["payload"]) for point in snapshot.points()]
+        snapshot.close()
+
+    else:
+        client = AsyncQdrantClient(
+            url=os.getenv("QDRANT_URL"),
+            api_key=os.getenv("QDRANT_API_KEY"),
+            timeout=int(os.getenv("QDRANT_TIMEOUT", 60))
+        )
+        try:
+            points = await read_payloads(client, args.collection, args.batch_size)
+        finally:
+            await client.close()
+
+    index = CitationIndex.build(points, law_field=args.law_field, article_field=args.article_field)
+    index.save(args.output)
+    print(f"{len(index)} articles -> {args.output}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--collection")
+    source.add_argument("--snapshot", help="Snapshot directory written by src.llm.infrastructure.numpy.snapshot")
+    parser.add_argument("--output", default=os.getenv("CITATION_INDEX_PATH", "citations.json"))
+    parser.add_argument("--law-field", default="metadata.law")
+    parser.add_argument("--article-field", default="metadata.article")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
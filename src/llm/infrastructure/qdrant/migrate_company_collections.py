@@ -0,0 +1,146 @@
+"""
+Copies every per-company collection (<company_id>_company_docs) into the shared COMPANY_COLLECTION.
+
+Points keep their vectors and payloads, gain a company_id payload field, and get an ID derived from the company
+and the original ID so they stay unique across tenants. Re-running is safe, points are upserted.
+Source collections are only deleted with --delete-source, after their points were copied and counted.
+
+Usage:
+    python -m src.llm.infrastructure.qdrant.migrate_company_collections --target company_docs [--delete-source]
+"""
+import os
+import uuid
+import asyncio
+import argparse
+import logging
+from typing import Any, List
+
+from dotenv import load_dotenv
+from qdrant_client import AsyncQdrantClient, models
+
+from src.llm.application.services.tenant_vector_repository import TENANT_FIELD
+from src.llm.domain.namespaces import get_company_collection, get_company_id
+from src.llm.infrastructure.qdrant.collections import create_tenant_collection
+
+logger = logging.getLogger(__name__)
+
+# Fixed, so migrated IDs are the same on every run
+MIGRATION_NAMESPACE = uuid.UUID("6f1c9a52-3d0e-4c57-9b53-2a8f4e7d1c90")
+
+
+def migrated_id(company_id: str, point_id: Any) -> str:
+    return str(uuid.uuid5(MIGRATION_NAMESPACE, f"{company_id}:{point_id}"))
+
+
+async def migrate_collection(
+    client: AsyncQdrantClient,
+    source: str,
+    target: str,
+    company_id: str,
+    batch_size: int = 256
+) -> int:
+    copied = 0
+    offset = None
+    while True:
+        records, offset = await client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True
+        )
+        if records:
+            await client.upsert(
+                collection_name=target,
+                points=[
+                    models.PointStruct(
+                        id=migrated_id(company_id, record.id),
+                        vector=record.vector,
+                        payload={**(record.payload or {}), TENANT_FIELD: company_id}
+                    )
+                    for record in records
+                ],
+                wait=True
+            )
+            copied += len(records)
+
+        if offset is None:
+            return copied
+
+
+async def migrate(
+    client: AsyncQdrantClient,
+    target: str,
+    vector_size: int,
+    concurrency: int = 4,
+    batch_size: int = 256,
+    delete_source: bool = False
+) -> None:
+    if not await client.collection_exists(target):
+        await create_tenant_collection(client, target, vector_size, tenant_field=TENANT_FIELD)
+
+    collections = await client.get_collections()
+    sources: List[str] = [
+        collection.name for collection in collections.collections
+        if get_company_id(collection.name) is not None and collection.name != target
+    ]
+    logger.info(f"{len(sources)} company collections to migrate into {target}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    totals = {"collections": 0, "points": 0}
+
+    async def migrate_one(source: str):
+        async with semaphore:
+            company_id = get_company_id(source)
+            copied = await migrate_collection(client, source, target, company_id, batch_size)
+            migrated = await client.count(
+                collection_name=target,
+                count_filter=models.Filter(must=[
+                    models.FieldCondition(key=TENANT_FIELD, match=models.MatchValue(value=company_id))
+                ]),
+                exact=True
+            )
+            if migrated.count < copied:
+                logger.error(f"{source}: {copied} points read but {migrated.count} found in {target}, source kept")
+                return
+
+            if delete_source:
+                await client.delete_collection(source)
+
+            totals["collections"] += 1
+            totals["points"] += copied
+            if totals["collections"] % 100 == 0:
+                logger.info(f"{totals['collections']}/{len(sources)} collections, {totals['points']} points migrated")
+
+    await asyncio.gather(*[migrate_one(source) for source in sources])
+    logger.info(f"{totals['collections']} collections, {totals['points']} points migrated into {target}")
+
+
+async def main(args) -> None:
+    client = AsyncQdrantClient(
+        url=os.getenv("QDRANT_URL"),
+        api_key=os.getenv("QDRANT_API_KEY"),
+        timeout=int(os.getenv("QDRANT_TIMEOUT", 60))
+    )
+    try:
+        await migrate(client, args.target, args.vector_size, args.concurrency, args.batch_size, args.delete_source)
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", default=get_company_collection())
+    parser.add_argument("--vector-size", type=int, default=int(os.getenv("EMBEDDING_DIMENSIONS", 3072)))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--delete-source", action="store_true")
+    args = parser.parse_args()
+
+    if not args.target:
+        parser.error("--target or COMPANY_COLLECTION is required")
+
+    asyncio.run(main(args))
@@ -1,14 +1,77 @@
-from typing import List
-import os
-from qdrant_client import QdrantClient
-from src.llm.domain.repositorties.vector_repository import VectorRepository
+import uuid
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional
+from qdrant_client import AsyncQdrantClient, models
+from src.llm.domain.repositorties.vector_repository import VectorRepository, SearchQuery
+from src.llm.domain.services.embedding_service import DocumentChunk
+from src.llm.infrastructure.qdrant.collections import create_collection
 from src.llm.domain.entities import SearchResult
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("vector_search_seconds", "Qdrant search round trip duration")
+Metrics.describe("vector_write_seconds", "Qdrant upsert and delete round trip duration")
+
+# Fixed, so a chunk always maps to the same point ID
+CHUNK_NAMESPACE = uuid.UUID("0b6f3e8a-54c2-4d7e-a1f9-7c3d2e9b8a61")
+
+# Payload fields re-indexing deletes by, indexed so those deletes do not scan the collection
+INDEXED_FIELDS = ["metadata.document_id", "metadata.filename", "metadata.user_id", "metadata.company_id"]
 
 
 
 class QdrantVectorRepository(VectorRepository):
-    def __init__(self, client: QdrantClient):
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        hnsw_ef: Optional[int] = None,
+        quantization_rescore: Optional[bool] = None,
+        quantization_oversampling: Optional[float] = None
+    ):
         self.client = client
+        self.__search_params = self.__to_search_params(hnsw_ef, quantization_rescore, quantization_oversampling)
+
+    @staticmethod
+    def __to_search_params(
+        hnsw_ef: Optional[int],
+        rescore: Optional[bool],
+        oversampling: Optional[float]
+    ) -> Optional[models.SearchParams]:
+        """None everywhere keeps the collection defaults"""
+        quantization = None
+        if rescore is not None or oversampling is not None:
+            # Candidates are found on the quantized vectors, then oversampling * limit of them are rescored at full precision
+            quantization = models.QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+
+        if hnsw_ef is None and quantization is None:
+            return None
+
+        return models.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+    @staticmethod
+    def __to_search_result(point: models.ScoredPoint) -> SearchResult:
+        payload = point.payload or {}
+        return SearchResult(
+            id=point.id,
+            score=point.score,
+            payload=payload,
+            text=payload.get("text"),
+            metadata=payload.get("metadata") or {}
+        )
+
+    @staticmethod
+    def __to_filter(conditions: Optional[Dict[str, Any]]) -> Optional[models.Filter]:
+        if not conditions:
+            return None
+        
+        return models.Filter(
+            must=[
+                models.FieldCondition(key=key, match=models.MatchValue(value=value))
+                for key, value in conditions.items()
+            ]
+        )
 
     async def similarity_search(
         self, 
@@ -16,20 +79,141 @@ class QdrantVectorRepository(VectorRepository):
         query_vector: List[float], 
         top_k: int = 4
     ) -> List[SearchResult]:
-        results = self.client.search(
-            collection_name=namespace,
-            query_vector=query_vector,
-            limit=top_k,
-            with_payload=True
-        )
+        with Metrics.timer("vector_search_seconds", labels={"method": "similarity_search"}):
+            response = await self.client.query_points(
+                collection_name=namespace,
+                query=query_vector,
+                limit=top_k,
+                search_params=self.__search_params,
+                with_payload=True
+            )
         
-        return [
-            SearchResult(
-                id=point.id,
-                score=point.score,
-                payload=point.payload,
-                text=point.payload.get("text"),
-                metadata=point.payload.get("metadata") 
+        return [self.__to_search_result(point) for point in response.points]
+    
+    async def batch_search(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        # Qdrant batches within a single collection, so group per collection and send the groups concurrently
+        grouped: Dict[str, List[int]] = {}
+        for index, query in enumerate(queries):
+            grouped.setdefault(query.namespace, []).append(index)
+
+        async def search_collection(namespace: str, indexes: List[int]):
+            with Metrics.timer("vector_search_seconds", labels={"method": "batch_search"}):
+                responses = await self.client.query_batch_points(
+                    collection_name=namespace,
+                    requests=[
+                        models.QueryRequest(
+                            query=queries[index].query_vector,
+                            limit=queries[index].top_k,
+                            params=self.__search_params,
+                            filter=self.__to_filter(queries[index].filter),
+                            with_payload=queries[index].payload_fields if queries[index].payload_fields is not None else True
+                        )
+                        for index in indexes
+                    ]
+                )
+            return zip(indexes, responses)
+
+        responses = await asyncio.gather(*[
+            search_collection(namespace, indexes) for namespace, indexes in grouped.items()
+        ], return_exceptions=True)
+
+        errors = [response for response in responses if isinstance(response, Exception)]
+        if errors and len(errors) == len(responses):
+            raise errors[0]
+
+        # One failing collection leaves its queries empty instead of failing the others
+        results: List[List[SearchResult]] = [[] for _ in queries]
+        for namespace, pairs in zip(grouped, responses):
+            if isinstance(pairs, Exception):
+                logger.warning(f"batch search failed for {namespace} :::: {str(pairs)}")
+                continue
+            for index, response in pairs:
+                results[index] = [self.__to_search_result(point) for point in response.points]
+
+        return results
+    
+    async def retrieve(self, namespace: str, ids: List[Any]) -> List[SearchResult]:
+        with Metrics.timer("vector_search_seconds", labels={"method": "retrieve"}):
+            records = await self.client.retrieve(
+                collection_name=namespace,
+                ids=ids,
+                with_payload=True,
+                with_vectors=False
+            )
+
+        by_id = {str(record.id): record for record in records}
+        results = []
+        for point_id in ids:
+            record = by_id.get(str(point_id))
+            if record is not None:
+                payload = record.payload or {}
+                # An exact lookup, not a similarity
+                results.append(SearchResult(text=payload.get("text"), metadata=payload.get("metadata") or {}, score=1.0))
+        return results
+
+    async def count(self, namespace: str, filter: Optional[Dict[str, Any]] = None) -> int:
+        with Metrics.timer("vector_search_seconds", labels={"method": "count"}):
+            if not await self.client.collection_exists(namespace):
+                return 0
+
+            response = await self.client.count(
+                collection_name=namespace,
+                count_filter=self.__to_filter(filter),
+                # Approximate counts can report 0 for a small filtered tenant, exact is cheap for a single tenant
+                exact=True
+            )
+        return response.count
+
+    @staticmethod
+    def point_id(namespace: str, chunk_id: str) -> str:
+        return str(uuid.uuid5(CHUNK_NAMESPACE, f"{namespace}:{chunk_id}"))
+
+    async def ensure_namespace(self, namespace: str, vector_size: int) -> None:
+        if await self.client.collection_exists(namespace):
+            return
+
+        await create_collection(self.client, namespace, vector_size)
+        for field in INDEXED_FIELDS:
+            await self.client.create_payload_index(
+                collection_name=namespace,
+                field_name=field,
+                field_schema=models.PayloadSchemaType.KEYWORD
             )
-            for point in results
-        ]
\ No newline at end of file
+
+    async def upsert(
+        self,
+        namespace: str,
+        chunks: List[DocumentChunk],
+        embeddings: List[List[float]],
+        payload: Optional[Dict[str, Any]] = None
+    ) -> None:
+        with Metrics.timer("vector_write_seconds", labels={"method": "upsert"}):
+            await self.client.upsert(
+                collection_name=namespace,
+                points=[
+                    models.PointStruct(
+                        id=self.point_id(namespace, chunk.chunk_id),
+                        vector=vector,
+                        payload={"text": chunk.content, "metadata": chunk.metadata, "chunk_id": chunk.chunk_id, **(payload or {})}
+                    )
+                    for chunk, vector in zip(chunks, embeddings)
+                ],
+                wait=True
+            )
+
+    async def delete(self, namespace: str, filter: Dict[str, Any]) -> None:
+        if not filter:
+            raise ValueError("Refusing to delete without a filter")
+
+        if not await self.client.collection_exists(namespace):
+            return
+
+        with Metrics.timer("vector_write_seconds", labels={"method": "delete"}):
+            await self.client.delete(
+                collection_name=namespace,
+                points_selector=models.FilterSelector(filter=self.__to_filter(filter)),
+                wait=True
+            )
+
+    async def close(self) -> None:
+        await self.client.close()
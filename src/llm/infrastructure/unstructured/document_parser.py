@@ -0,0 +1,104 @@
+import io
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from src.llm.domain.services.document_parser import DocumentParser
+from src.shared.utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+Metrics.describe("document_parse_seconds", "Time to turn a document into text, queueing for a worker included")
+
+# Decoded directly, partitioning them would only cost a worker round trip
+TEXT_EXTENSIONS = {".txt", ".md"}
+SUPPORTED_EXTENSIONS = TEXT_EXTENSIONS | {
+    ".pdf", ".docx", ".doc", ".odt", ".rtf", ".html", ".htm", ".xml", ".pptx", ".xlsx", ".csv", ".eml", ".msg", ".epub"
+}
+
+
+def available_cores() -> int:
+    """Cores this process may run on, which can be fewer than the host has in containers"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def partition_to_text(filename: str, content: Optional[bytes], strategy: str) -> str:
+    """Runs in a worker process, elements are separated by blank lines so headings start their own line"""
+    from unstructured.partition.auto import partition
+
+    if content is None:
+        elements = partition(filename=filename, strategy=strategy)
+    else:
+        elements = partition(file=io.BytesIO(content), metadata_filename=filename, strategy=strategy)
+
+    return "\n\n".join(str(element) for element in elements if str(element).strip())
+
+
+class UnstructuredDocumentParser(DocumentParser):
+    """
+    Partitions PDF, DOCX and the other formats unstructured supports in a process pool, so the CPU bound
+    parsing neither blocks the event loop nor is limited to one core by the GIL.
+    Workers are spawned on first use and replaced after max_tasks_per_child documents to cap leaked memory.
+    """
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        strategy: str = "fast",
+        max_tasks_per_child: int = 50
+    ):
+        self.__max_workers = max_workers or available_cores()
+        self.__strategy = strategy
+        self.__max_tasks_per_child = max_tasks_per_child
+        self.__pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def max_workers(self) -> int:
+        return self.__max_workers
+
+    def __get_pool(self) -> ProcessPoolExecutor:
+        if self.__pool is None:
+            self.__pool = ProcessPoolExecutor(
+                max_workers=self.__max_workers,
+                # Forking a process running an event loop and threads is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.__max_tasks_per_child
+            )
+            logger.info(f"document parser pool started with {self.__max_workers} workers")
+        return self.__pool
+
+    async def parse(self, filename: str, content: Optional[bytes] = None) -> str:
+        extension = os.path.splitext(filename)[1].lower()
+        with Metrics.timer("document_parse_seconds", labels={"extension": extension or "none"}):
+            if extension in TEXT_EXTENSIONS:
+                if content is None:
+                    content = await asyncio.to_thread(self.__read, filename)
+                return content.decode("utf-8", errors="replace")
+
+            pool = self.__get_pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    pool, partition_to_text, filename, content, self.__strategy
+                )
+            except BrokenProcessPool:
+                # A worker died, e.g. killed for memory on a huge file, the next parse gets a new pool
+                if self.__pool is pool:
+                    self.__pool = None
+                    pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    @staticmethod
+    def __read(path: str) -> bytes:
+        with open(path, "rb") as file:
+            return file.read()
+
+    async def close(self) -> None:
+        if self.__pool is not None:
+            await asyncio.to_thread(self.__pool.shutdown, True, cancel_futures=True)
+            self.__pool = None
@@ -0,0 +1,125 @@
+"""
+Ingests documents from files or directories into a company namespace (or any namespace with --namespace).
+PDF, DOCX and the other formats unstructured reads are parsed in a process pool, one worker per core.
+
+Each file is a document whose ID is its path relative to the argument it was found under, so ingesting the same
+files again overwrites their chunks. --replace first deletes each document's previous chunks, for documents that
+got shorter. --delete-* options delete matching chunks before ingesting, or on their own without paths.
+
+Usage:
+    python -m src.llm.interface.cli.ingest_documents --company-id <uuid> contracts/ policies/handbook.md
+    python -m src.llm.interface.cli.ingest_documents --company-id <uuid> --delete-filename old_contract.txt
+"""
+import os
+import time
+import asyncio
+import argparse
+import logging
+from typing import Iterator, List, Tuple
+
+from dotenv import load_dotenv
+
+from src.llm.dependencies.repositories import get_vector_repository
+from src.llm.dependencies.services import get_document_parser
+from src.llm.dependencies.use_cases import get_ingest_documents_use_case, get_parse_documents_use_case
+from src.llm.domain.entities import DocumentFile
+from src.llm.domain.models import IngestionProgress
+from src.llm.domain.namespaces import get_company_namespace
+from src.llm.domain.repositorties.vector_repository import DeleteFilter
+from src.llm.infrastructure.unstructured.document_parser import SUPPORTED_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+def find_files(paths: List[str]) -> Iterator[Tuple[str, str]]:
+    """(path, document_id) for every supported file under the given files and directories"""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path, os.path.basename(path)
+            continue
+
+        for directory, _, filenames in os.walk(path):
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1].lower() in SUPPORTED_EXTENSIONS:
+                    full_path = os.path.join(directory, filename)
+                    yield full_path, os.path.relpath(full_path, path)
+
+
+def document_files(paths: List[str], metadata: dict) -> Iterator[DocumentFile]:
+    """Files are read by the parser, only the ones being parsed are in memory"""
+    for path, document_id in find_files(paths):
+        yield DocumentFile(document_id=document_id, filename=path, metadata=metadata)
+
+
+class ProgressLog:
+    def __init__(self, interval: float = 2.0):
+        self.__interval = interval
+        self.__last = 0.0
+
+    def __call__(self, progress: IngestionProgress) -> None:
+        if not progress.done and time.monotonic() - self.__last < self.__interval:
+            return
+
+        self.__last = time.monotonic()
+        logger.info(
+            f"{progress.documents} documents, {progress.chunks_embedded} chunks embedded, "
+            f"{progress.chunks_stored} stored, {progress.chunks_per_second:.1f} chunks/s"
+        )
+
+
+async def main(args) -> None:
+    namespace = args.namespace or get_company_namespace(args.company_id)
+    metadata = {
+        **({"company_id": args.company_id} if args.company_id else {}),
+        **({"user_id": args.user_id} if args.user_id else {})
+    }
+    delete_filter = DeleteFilter(
+        filename=args.delete_filename,
+        user_id=args.delete_user_id,
+        company_id=args.delete_company_id,
+        document_id=args.delete_document_id
+    )
+    use_case = get_ingest_documents_use_case()
+
+    try:
+        if args.replace:
+            for _, document_id in find_files(args.paths):
+                await use_case.delete(namespace, DeleteFilter(document_id=document_id))
+
+        if not args.paths:
+            await use_case.delete(namespace, delete_filter)
+            logger.info(f"{namespace}: chunks matching {delete_filter.model_dump(exclude_none=True)} deleted")
+            return
+
+        await use_case.execute(
+            namespace=namespace,
+            documents=get_parse_documents_use_case().execute(document_files(args.paths, metadata)),
+            delete_filter=delete_filter if delete_filter.model_dump(exclude_none=True) else None,
+            on_progress=ProgressLog()
+        )
+    finally:
+        await get_document_parser().close()
+        await get_vector_repository().close()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", help="Files or directories of documents")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--company-id")
+    target.add_argument("--namespace")
+    parser.add_argument("--user-id", help="Stored on every chunk")
+    parser.add_argument("--replace", action="store_true", help="Delete each document's previous chunks first")
+    parser.add_argument("--delete-filename")
+    parser.add_argument("--delete-user-id")
+    parser.add_argument("--delete-company-id")
+    parser.add_argument("--delete-document-id")
+    args = parser.parse_args()
+
+    if not args.paths and not any([args.delete_filename, args.delete_user_id, args.delete_company_id, args.delete_document_id]):
+        parser.error("paths or a --delete-* option are required")
+
+    asyncio.run(main(args))
@@ -0,0 +1,139 @@
+import json
+import asyncio
+from uuid import UUID
+from typing import AsyncGenerator, List, Optional
+from  fastapi import APIRouter, Body, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
+from  src.llm.domain.schemas import DocumentDeleteRequest, IngestionRequest
+from src.app.domain.models.http_responses import CommonHttpResponse
+from src.app.middleware.hmac_verification import verify_hmac
+from src.llm.domain.entities import Document, DocumentFile
+from src.llm.domain.namespaces import get_company_namespace
+from src.llm.domain.repositorties.vector_repository import DeleteFilter
+from src.llm.dependencies.use_cases import get_ingest_documents_use_case, get_parse_documents_use_case
+from src.llm.application.use_cases.ingest_documents import Documents, IngestDocuments
+from src.llm.application.use_cases.parse_documents import ParseDocuments
+
+
+router = APIRouter(
+    prefix="/documents",
+    tags=["Documents"]
+)
+
+def owner_metadata(company_id: UUID, user_id: Optional[UUID]) -> dict:
+    return {"company_id": str(company_id), **({"user_id": str(user_id)} if user_id else {})}
+
+def to_documents(data: IngestionRequest) -> List[Document]:
+    owner = owner_metadata(data.company_id, data.user_id)
+    return [
+        Document(
+            document_id=document.document_id,
+            text=document.text,
+            filename=document.filename,
+            metadata={**document.metadata, **owner}
+        )
+        for document in data.documents
+    ]
+
+def stream_ingestion(
+    use_case: IngestDocuments,
+    company_id: UUID,
+    documents: Documents,
+    delete_filter: Optional[DeleteFilter]
+) -> StreamingResponse:
+    """One progress report per line, a client that disconnects cancels the ingestion"""
+    async def progress_lines() -> AsyncGenerator[str, None]:
+        updates: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(use_case.execute(
+            namespace=get_company_namespace(company_id),
+            documents=documents,
+            delete_filter=delete_filter,
+            on_progress=updates.put_nowait
+        ))
+        task.add_done_callback(lambda _: updates.put_nowait(None))
+
+        try:
+            while (progress := await updates.get()) is not None:
+                yield progress.model_dump_json() + "\n"
+            await task
+
+        except Exception as e:
+            # Headers are already sent, so the failure is the last line
+            yield json.dumps({"error": str(e)}) + "\n"
+
+        finally:
+            task.cancel()
+
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
+@router.post(
+    "/internal/ingest",
+    status_code=200,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One progress report per line, the last one has done set"}}
+)
+async def secure_ingest(
+    _: None = Depends(verify_hmac),
+    data: IngestionRequest = Body(...),
+    use_case: IngestDocuments = Depends(get_ingest_documents_use_case)
+):
+    """
+    ## Chunks, embeds and stores company documents
+    Streams progress while ingesting, a client that disconnects cancels the ingestion.
+    """
+    return stream_ingestion(use_case, data.company_id, to_documents(data), data.delete_filter)
+
+@router.post(
+    "/internal/upload",
+    status_code=200,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One progress report per line, the last one has done set"}}
+)
+async def secure_upload(
+    _: None = Depends(verify_hmac),
+    company_id: UUID = Form(...),
+    user_id: Optional[UUID] = Form(None),
+    replace: bool = Form(False),
+    files: List[UploadFile] = File(...),
+    parse_documents: ParseDocuments = Depends(get_parse_documents_use_case),
+    use_case: IngestDocuments = Depends(get_ingest_documents_use_case)
+):
+    """
+    ## Parses, chunks, embeds and stores company files
+    PDF, DOCX and the other formats unstructured reads. The file name is the document ID, replace first deletes
+    the chunks stored for each uploaded file by an earlier upload.
+    """
+    owner = owner_metadata(company_id, user_id)
+    document_files = [
+        DocumentFile(document_id=file.filename, filename=file.filename, content=await file.read(), metadata=owner)
+        for file in files
+    ]
+    if replace:
+        for document_file in document_files:
+            await use_case.delete(get_company_namespace(company_id), DeleteFilter(document_id=document_file.document_id))
+
+    return stream_ingestion(use_case, company_id, parse_documents.execute(document_files), None)
+
+@router.post(
+    "/internal/delete",
+    status_code=200,
+    response_model=CommonHttpResponse
+)
+async def secure_delete(
+    _: None = Depends(verify_hmac),
+    data: DocumentDeleteRequest = Body(...),
+    use_case: IngestDocuments = Depends(get_ingest_documents_use_case)
+):
+    try:
+        await use_case.delete(
+            namespace=get_company_namespace(data.company_id),
+            delete_filter=data.delete_filter
+        )
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return CommonHttpResponse(
+        detail="Documents deleted"
+    )
@@ -1,10 +1,11 @@
-from  fastapi import APIRouter, Body, Depends, BackgroundTasks
+from  fastapi import APIRouter, Body, Depends, HTTPException, status
 from  src.llm.domain.schemas import InteractionRequest
 from src.app.domain.models.http_responses import CommonHttpResponse
 from src.app.middleware.hmac_verification import verify_hmac
 from src.llm.domain.state import State
-from src.llm.dependencies.services import get_workflow_service
-from src.llm.domain.services.workflow_service import WorkflowService
+from src.llm.dependencies.services import get_workflow_scheduler
+from src.llm.application.services.workflow_scheduler import WorkflowScheduler
+from src.shared.domain.exceptions.scheduling import WorkflowQueueFull
 
 
 router = APIRouter(
@@ -22,28 +23,33 @@ async def get_state(data: InteractionRequest = Body(...)):
         general_legal_response="",
         company_legal_response="",
         final_response="",
+        cache_hit=False,
         voice=data.voice
     )
 
     return state
 
-def create_workflow():
-    service: WorkflowService = get_workflow_service()
-    workflow = service.create_workflow()
-
-    return workflow
-
-@router.post("/internal/interact", status_code=202, response_model=CommonHttpResponse)
+@router.post(
+    "/internal/interact", 
+    status_code=202, 
+    response_model=CommonHttpResponse,
+    responses={503: {"model": CommonHttpResponse, "description": "Workflow queue is full, retry after the Retry-After header"}}
+)
 async def secure_interact(
-    background_tasks: BackgroundTasks,
     _: None = Depends(verify_hmac),
     state: State = Depends(get_state),
-    graph = Depends(create_workflow)
+    scheduler: WorkflowScheduler = Depends(get_workflow_scheduler)
 ):
+    try:
+        scheduler.submit(state)
     
-    background_tasks.add_task(graph.ainvoke, state)
+    except WorkflowQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
 
     return CommonHttpResponse(
         detail="Request received"
     )
-    
\ No newline at end of file
@@ -0,0 +1,34 @@
+from  fastapi import APIRouter, Body, Depends
+from  src.llm.domain.schemas import NamespaceInvalidationRequest
+from src.app.domain.models.http_responses import CommonHttpResponse
+from src.app.middleware.hmac_verification import verify_hmac
+from src.llm.domain.namespaces import get_company_namespace
+from src.llm.dependencies.repositories import get_namespace_size_cache
+from src.llm.application.services.namespace_size_cache import NamespaceSizeCache
+
+
+router = APIRouter(
+    prefix="/namespaces",
+    tags=["Namespaces"]
+)
+
+@router.post(
+    "/internal/invalidate",
+    status_code=200,
+    response_model=CommonHttpResponse
+)
+async def secure_invalidate(
+    _: None = Depends(verify_hmac),
+    data: NamespaceInvalidationRequest = Body(...),
+    namespace_cache: NamespaceSizeCache = Depends(get_namespace_size_cache)
+):
+    """
+    ## Forgets cached namespace sizes
+    Called after company documents are uploaded or deleted, so a company that had none is searched again.
+    Only the worker that handles the request forgets them, the others within NAMESPACE_CACHE_EMPTY_TTL_SECONDS.
+    """
+    namespace_cache.invalidate(get_company_namespace(data.company_id) if data.company_id else None)
+
+    return CommonHttpResponse(
+        detail="Namespace cache invalidated"
+    )
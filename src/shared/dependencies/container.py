@@ -16,6 +16,10 @@ class Container:
         
         return cast(T, cls.__instances[key])
     
+    @classmethod
+    def is_registered(cls, key: str) -> bool:
+        return key in cls.__instances
+
     @classmethod
     def clear(cls) -> None:
         cls.__instances.clear()
@@ -0,0 +1,5 @@
+class CassetteMiss(Exception):
+    def __init__(self, detail: str, kind: str, key: str):
+        super().__init__(detail)
+        self.kind = kind
+        self.key = key
@@ -0,0 +1,4 @@
+class LlmDeadlineExceeded(Exception):
+    def __init__(self, detail: str, deadline: float):
+        super().__init__(detail)
+        self.deadline = deadline
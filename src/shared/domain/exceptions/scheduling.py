@@ -0,0 +1,4 @@
+class WorkflowQueueFull(Exception):
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.retry_after = retry_after
@@ -0,0 +1,144 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Tuple, Optional, List
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Set within Metrics.suppressed(), follows the work into the tasks it starts but not into unrelated ones
+_suppressed: ContextVar[bool] = ContextVar("metrics_suppressed", default=False)
+
+class Metrics:
+    """
+    Process wide metrics registry rendered in the Prometheus text format.
+    """
+    __counters: Dict[str, Dict[LabelSet, float]] = {}
+    __gauges: Dict[str, Dict[LabelSet, float]] = {}
+    # name -> label set -> [bucket counts..., sum, count]
+    __histograms: Dict[str, Dict[LabelSet, List[float]]] = {}
+    __buckets: Dict[str, Tuple[float, ...]] = {}
+    __descriptions: Dict[str, str] = {}
+    __lock = threading.Lock()
+
+    @staticmethod
+    def __label_set(labels: Optional[Dict[str, str]]) -> LabelSet:
+        if not labels:
+            return ()
+        
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @classmethod
+    def describe(cls, name: str, description: str, buckets: Optional[Tuple[float, ...]] = None) -> None:
+        cls.__descriptions[name] = description
+        if buckets:
+            cls.__buckets[name] = tuple(sorted(buckets))
+
+    @classmethod
+    @contextmanager
+    def suppressed(cls):
+        """Nothing recorded in the wrapped block, or in tasks it starts, reaches the registry"""
+        token = _suppressed.set(True)
+        try:
+            yield
+        finally:
+            _suppressed.reset(token)
+
+    @classmethod
+    def increment(cls, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None) -> None:
+        if _suppressed.get():
+            return
+
+        label_set = cls.__label_set(labels)
+        with cls.__lock:
+            series = cls.__counters.setdefault(name, {})
+            series[label_set] = series.get(label_set, 0) + value
+
+    @classmethod
+    def set_gauge(cls, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        if _suppressed.get():
+            return
+
+        label_set = cls.__label_set(labels)
+        with cls.__lock:
+            cls.__gauges.setdefault(name, {})[label_set] = value
+
+    @classmethod
+    def observe(cls, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        if _suppressed.get():
+            return
+
+        label_set = cls.__label_set(labels)
+        buckets = cls.__buckets.get(name, DEFAULT_BUCKETS)
+        with cls.__lock:
+            series = cls.__histograms.setdefault(name, {})
+            values = series.setdefault(label_set, [0] * (len(buckets) + 2))
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    values[index] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    @classmethod
+    @contextmanager
+    def timer(cls, name: str, labels: Optional[Dict[str, str]] = None):
+        """Observes the duration of the wrapped block in seconds, including when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.observe(name, time.perf_counter() - start, labels)
+
+    @classmethod
+    def get(cls, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        label_set = cls.__label_set(labels)
+        if name in cls.__gauges:
+            return cls.__gauges[name].get(label_set, 0)
+        
+        return cls.__counters.get(name, {}).get(label_set, 0)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls.__lock:
+            cls.__counters.clear()
+            cls.__gauges.clear()
+            cls.__histograms.clear()
+
+    @staticmethod
+    def __format_labels(label_set: LabelSet) -> str:
+        if not label_set:
+            return ""
+
+        pairs = ",".join(f'{key}="{value}"' for key, value in label_set)
+        return f"{{{pairs}}}"
+
+    @classmethod
+    def __header(cls, lines: List[str], name: str, metric_type: str) -> None:
+        if name in cls.__descriptions:
+            lines.append(f"# HELP {name} {cls.__descriptions[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    @classmethod
+    def render(cls) -> str:
+        lines = []
+        with cls.__lock:
+            for metric_type, metrics in [("counter", cls.__counters), ("gauge", cls.__gauges)]:
+                for name, series in sorted(metrics.items()):
+                    cls.__header(lines, name, metric_type)
+                    for label_set, value in series.items():
+                        lines.append(f"{name}{cls.__format_labels(label_set)} {value}")
+
+            for name, series in sorted(cls.__histograms.items()):
+                cls.__header(lines, name, "histogram")
+                buckets = cls.__buckets.get(name, DEFAULT_BUCKETS)
+                for label_set, values in series.items():
+                    for bound, bucket_count in zip(buckets, values):
+                        bucket_labels = cls.__format_labels(label_set + (("le", str(bound)),))
+                        lines.append(f"{name}_bucket{bucket_labels} {bucket_count}")
+                    lines.append(f"{name}_bucket{cls.__format_labels(label_set + (('le', '+Inf'),))} {values[-1]}")
+                    lines.append(f"{name}_sum{cls.__format_labels(label_set)} {values[-2]}")
+                    lines.append(f"{name}_count{cls.__format_labels(label_set)} {values[-1]}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,9 @@
+import re
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, accents removed and whitespace collapsed, so aliases and regexes stay simple"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return re.sub(r"\s+", " ", stripped.lower()).strip()
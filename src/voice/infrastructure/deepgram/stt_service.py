@@ -6,10 +6,16 @@ from typing import Any, Dict
 import base64
 import json
 import os
+import time
 import websockets
 from src.voice.domain.services.speech_to_text import SpeechToText
+from src.shared.utils.metrics import Metrics
 logger = logging.getLogger(__name__)
 
+Metrics.describe("stt_connect_seconds", "Time to open a Deepgram streaming session")
+Metrics.describe("stt_session_end_seconds", "Time to close a Deepgram session and collect the transcript")
+Metrics.describe("stt_session_seconds", "Lifetime of a Deepgram streaming session")
+
 class DeepgramSpeechToTextService(SpeechToText):
     def __init__(self, model: str = "nova-2", language: str = "es"):
         super().__init__()
@@ -21,17 +27,19 @@ class DeepgramSpeechToTextService(SpeechToText):
         headers= {
             "Authorization": f"token {os.getenv("DEEPGRAM_API_KEY")}"
         }
-        deepgram_ws = await websockets.connect(
-            uri=f"wss://api.deepgram.com/v1/listen?encoding=opus&language={self.__language}&model={self.__model}",
-            additional_headers=headers
-        )
+        with Metrics.timer("stt_connect_seconds", labels={"model": self.__model}):
+            deepgram_ws = await websockets.connect(
+                uri=f"wss://api.deepgram.com/v1/listen?encoding=opus&language={self.__language}&model={self.__model}",
+                additional_headers=headers
+            )
         session_id = f"session_{id(deepgram_ws)}"
         try:
             asyncio.create_task(self._listen_to_deepgram(session_id, deepgram_ws))
             session_data = {
                 "connection": deepgram_ws,
                 "transcript_parts": [],
-                "is_active": True
+                "is_active": True,
+                "started_at": time.perf_counter()
             }
 
             self.active_sessions[session_id] = session_data
@@ -71,7 +79,9 @@ class DeepgramSpeechToTextService(SpeechToText):
         transcript_parts = session["transcript_parts"]
     
         try:
-            await connection.close()
+            with Metrics.timer("stt_session_end_seconds", labels={"model": self.__model}):
+                await connection.close()
+            Metrics.observe("stt_session_seconds", time.perf_counter() - session["started_at"], labels={"model": self.__model})
             
             full_transcript = " ".join(transcript_parts)
             # Clean up
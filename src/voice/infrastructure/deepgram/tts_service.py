@@ -1,6 +1,9 @@
 from deepgram import DeepgramClient
 import base64
 from src.voice.domain.services.text_to_speech import TextToSpeech
+from src.shared.utils.metrics import Metrics
+
+Metrics.describe("tts_request_seconds", "Deepgram text to speech request duration")
 
 class DeepgramTextToSpeechService(TextToSpeech):
     def __init__(
@@ -13,11 +16,12 @@ class DeepgramTextToSpeechService(TextToSpeech):
     def  transcribe(self, text: str):
         deepgram = DeepgramClient()
         if text:
-            response = deepgram.speak.v1.audio.generate(
-                text=text,
-                model= self.__model
-            )
-        
-            audio_bytes = b"".join(response)      
+            with Metrics.timer("tts_request_seconds", labels={"model": self.__model}):
+                response = deepgram.speak.v1.audio.generate(
+                    text=text,
+                    model= self.__model
+                )
+            
+                audio_bytes = b"".join(response)      
             
             return base64.b64encode(audio_bytes).decode('utf-8')
\ No newline at end of file
@@ -0,0 +1,68 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from src.llm.application.services.cached_embedding_service import CachedEmbeddingService, embedding_request_scope
+from src.llm.application.services.rate_limited_embedding_service import RateLimitedEmbeddingService
+from src.llm.application.services.rate_limiter import RateLimiter
+from src.llm.application.services.token_counter import TokenCounter
+from src.llm.domain.services.embedding_service import EmbeddingService
+
+
+class CountingEmbeddingService(EmbeddingService):
+    def __init__(self):
+        self.queries: List[str] = []
+        self.closed = False
+
+    async def embed_query(self, query: str) -> List[float]:
+        self.queries.append(query)
+        await asyncio.sleep(0.01)
+        return [float(len(query)), 1.0]
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [await self.embed_query(text) for text in texts]
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_close_reaches_the_wrapped_client():
+    client = CountingEmbeddingService()
+    service = CachedEmbeddingService(
+        embedding_service=RateLimitedEmbeddingService(
+            embedding_service=client,
+            rate_limiter=RateLimiter(name="embedding", requests_per_minute=600, tokens_per_minute=100000),
+            token_counter=TokenCounter(encoding_name="cl100k_base", cache_size=0)
+        ),
+        model="text-embedding-3-large"
+    )
+
+    await service.close()
+
+    assert client.closed
+
+
+@pytest.mark.asyncio
+async def test_input_is_embedded_once_per_request():
+    client = CountingEmbeddingService()
+    # Without the process wide cache only the request scope and single-flight can share vectors
+    service = CachedEmbeddingService(embedding_service=client, model="text-embedding-3-large", max_size=0)
+
+    with embedding_request_scope():
+        # The researchers and the router embed the same input concurrently
+        vectors = await asyncio.gather(
+            service.embed_query("¿Qué dice la LFT?"),
+            service.embed_query("¿Qué dice  la LFT? "),
+            service.embed_query("¿Qué dice la LFT?")
+        )
+        vectors.append(await service.embed_query("¿Qué dice la LFT?"))
+
+    assert client.queries == ["¿Qué dice la LFT?"]
+    assert all(vector == vectors[0] for vector in vectors)
+
+    with embedding_request_scope():
+        await service.embed_query("¿Qué dice la LFT?")
+
+    assert len(client.queries) == 2
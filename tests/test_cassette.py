@@ -0,0 +1,32 @@
+from typing import List
+
+import pytest
+
+from src.llm.infrastructure.cassette.cassette import Cassette
+from src.llm.infrastructure.cassette.embedding_service import RecordingEmbeddingService, ReplayEmbeddingService
+from src.llm.domain.services.embedding_service import EmbeddingService
+from src.shared.domain.exceptions.cassette import CassetteMiss
+
+
+class FixedEmbeddingService(EmbeddingService):
+    async def embed_query(self, query: str) -> List[float]:
+        return [0.25, float(len(query))]
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [await self.embed_query(text) for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_recorded_embeddings_are_replayed(tmp_path):
+    path = str(tmp_path / "calls.jsonl.gz")
+    recorder = RecordingEmbeddingService(FixedEmbeddingService(), Cassette(path), model="text-embedding-3-large")
+    recorded = await recorder.embed_query("¿Qué dice la LFT?")
+    recorded_documents = await recorder.embed_documents(["artículo 76", "artículo 80"])
+    await recorder.close()
+
+    replay = ReplayEmbeddingService(Cassette(path, speed=0), model="text-embedding-3-large")
+
+    assert await replay.embed_query("¿Qué dice la LFT?") == recorded
+    assert await replay.embed_documents(["artículo 76", "artículo 80"]) == recorded_documents
+    with pytest.raises(CassetteMiss):
+        await replay.embed_query("una pregunta que nunca se grabó")
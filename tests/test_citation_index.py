@@ -0,0 +1,29 @@
+import pytest
+
+from src.llm.application.services.citation_index import Citation, CitationExtractor, CitationIndex
+
+
+@pytest.mark.parametrize("text, citations", [
+    ("¿Qué dice el ARTÍCULO 123 Constitucional?", [("CPEUM", "123")]),
+    ("art. 76 LFT", [("LFT", "76")]),
+    ("Artículos 47 y 48 de la Ley  Federal del   Trabajo", [("LFT", "47"), ("LFT", "48")]),
+    ("artículos 100 al 103 de la LFT", [("LFT", "100"), ("LFT", "101"), ("LFT", "102"), ("LFT", "103")]),
+    ("artículo 123, apartado A, de la Constitución", [("CPEUM", "123")]),
+    ("Artículo 3o. Bis de la LFT", [("LFT", "3 bis")]),
+    ("artículo 5o de la LFT", [("LFT", "5")]),
+    ("¿Cuántos días de vacaciones me tocan?", []),
+])
+def test_citations_are_extracted_regardless_of_accents_and_case(text, citations):
+    assert CitationExtractor().extract(text) == [Citation(law=law, article=article) for law, article in citations]
+
+
+def test_index_keeps_integer_point_ids():
+    index = CitationIndex.build([
+        ("17", {"text": "Artículo 76.- Las personas trabajadoras...", "metadata": {"law": "Ley Federal del Trabajo"}}),
+        ("5c56c793-69f3-4fbf-87e6-c4bf54c28c26", {"text": "...", "metadata": {"law": "LFT", "article": "77"}}),
+        (18, {"text": "Artículo 3o. Bis.- Para efectos de esta Ley...", "metadata": {"law": "LFT"}})
+    ])
+
+    assert index.lookup([Citation(law="LFT", article="76")]) == [17]
+    assert index.lookup([Citation(law="LFT", article="77")]) == ["5c56c793-69f3-4fbf-87e6-c4bf54c28c26"]
+    assert index.lookup([Citation(law="LFT", article="3 bis")]) == [18]
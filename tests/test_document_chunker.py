@@ -0,0 +1,59 @@
+import pytest
+
+from src.llm.application.services.document_chunker import LegalStructureChunker
+from src.llm.application.services.token_counter import TokenCounter
+from src.llm.domain.entities import Document
+
+
+@pytest.fixture(scope="module")
+def chunker() -> LegalStructureChunker:
+    return LegalStructureChunker(TokenCounter(encoding_name="cl100k_base", cache_size=0), max_tokens=40, overlap_tokens=8)
+
+
+def articles(chunker: LegalStructureChunker, text: str) -> list:
+    document = Document(document_id="ley.txt", text=text)
+    return [chunk.metadata.get("articles") for chunk in chunker.chunk(document)]
+
+
+@pytest.mark.parametrize("heading, article", [
+    ("Artículo 3o.-", "3"),
+    ("Artículo 3o. Bis.-", "3 bis"),
+    ("ARTÍCULO 3o. BIS.-", "3 bis"),
+    ("Artículo 27 Bis.-", "27 bis"),
+    ("Artículo 5o Ter.-", "5 ter"),
+    ("Artículo 10 Quáter.-", "10 quater"),
+    ("Artículo 123.", "123"),
+    ("Artículo Único.-", "único"),
+])
+def test_article_headings_keep_their_suffix(chunker, heading, article):
+    text = f"{heading} Las disposiciones de esta ley rigen las relaciones de trabajo.\n\nDe " + "texto " * 60
+
+    assert articles(chunker, text)[0] == [article]
+
+
+def test_bis_article_is_not_merged_into_its_base_article(chunker):
+    text = (
+        "Artículo 3o.- El trabajo es un derecho y un deber sociales.\n\n"
+        "Artículo 3o. Bis.- Para efectos de esta Ley se entiende por hostigamiento el ejercicio del poder."
+    )
+
+    labels = [article for chunk_articles in articles(chunker, text) for article in chunk_articles]
+    assert labels == ["3", "3 bis"]
+
+
+def test_prose_starting_with_a_letter_after_the_ordinal_is_not_a_suffix(chunker):
+    text = "Artículo 3o. A los trabajadores se les pagará el salario íntegro."
+
+    assert articles(chunker, text)[0] == ["3"]
+
+
+def test_headings_before_a_long_article_open_its_first_piece():
+    chunker = LegalStructureChunker(TokenCounter(encoding_name="cl100k_base", cache_size=0), max_tokens=80, overlap_tokens=8)
+    text = "CAPÍTULO I\nDe la duración\nArtículo 1. " + "La relación de trabajo dura por tiempo indeterminado. " * 40
+
+    chunks = list(chunker.chunk(Document(document_id="ley.txt", text=text)))
+
+    assert len(chunks) > 1
+    assert chunks[0].content.startswith("CAPÍTULO I\nDe la duración\nArtículo 1. La relación")
+    assert all("La relación" in chunk.content for chunk in chunks)
+    assert all(chunk.metadata["article"] == "1" for chunk in chunks)
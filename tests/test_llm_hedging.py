@@ -0,0 +1,85 @@
+import json
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from src.llm.infrastructure.langchain.llm_service import LangchainLlmService
+from src.shared.domain.exceptions.llm import LlmDeadlineExceeded
+
+
+def completion(model: str, content: str) -> httpx.Response:
+    return httpx.Response(200, json={
+        "id": "stub", "object": "chat.completion", "created": 0, "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    })
+
+
+def slow_primary(models: List[str], primary_seconds: float):
+    """The primary model answers after primary_seconds, any other model at once"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        models.append(model)
+        if model == "gpt-4o":
+            await asyncio.sleep(primary_seconds)
+        return completion(model, f"respuesta de {model}")
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_answered_by_the_hedge():
+    models = []
+    service = LangchainLlmService(
+        model="gpt-4o",
+        hedging=True,
+        hedge_model="gpt-4o-mini",
+        hedge_initial_delay=0.02,
+        transport=slow_primary(models, primary_seconds=5)
+    )
+    try:
+        response = await asyncio.wait_for(service.invoke("hola", max_tokens=10), timeout=2)
+    finally:
+        await service.close()
+
+    assert response == "respuesta de gpt-4o-mini"
+    assert models == ["gpt-4o", "gpt-4o-mini"]
+
+
+@pytest.mark.asyncio
+async def test_fast_calls_are_not_hedged():
+    models = []
+    service = LangchainLlmService(
+        model="gpt-4o",
+        hedging=True,
+        hedge_model="gpt-4o-mini",
+        hedge_initial_delay=0.5,
+        transport=slow_primary(models, primary_seconds=0)
+    )
+    try:
+        assert await service.invoke("hola", max_tokens=10) == "respuesta de gpt-4o"
+    finally:
+        await service.close()
+
+    assert models == ["gpt-4o"]
+
+
+@pytest.mark.asyncio
+async def test_calls_past_their_deadline_fail_fast():
+    service = LangchainLlmService(
+        model="gpt-4o",
+        max_retries=0,
+        transport=slow_primary([], primary_seconds=5)
+    )
+    try:
+        with pytest.raises(LlmDeadlineExceeded):
+            await asyncio.wait_for(service.invoke("hola", max_tokens=10, timeout=0.05), timeout=2)
+    finally:
+        await service.close()
@@ -0,0 +1,114 @@
+import json
+import asyncio
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from src.llm.application.services.rate_limiter import RateLimiter, request_priority
+from src.llm.infrastructure.langchain.llm_service import LangchainLlmService
+
+
+class RecordingRateLimiter(RateLimiter):
+    """Records the budget acquired and the rate limit headers observed"""
+    def __init__(self, name: str):
+        super().__init__(name=name, requests_per_minute=1000, tokens_per_minute=100000)
+        self.acquired: List[int] = []
+        self.observed: List[str] = []
+
+    async def acquire(self, tokens: int) -> None:
+        self.acquired.append(tokens)
+        await super().acquire(tokens)
+
+    def observe(self, status_code, headers) -> None:
+        self.observed.append(headers.get("x-ratelimit-limit-requests"))
+        super().observe(status_code, headers)
+
+
+def completion(model: str, limit: str, status_code: int = 200) -> httpx.Response:
+    headers = {"x-ratelimit-limit-requests": limit, "x-ratelimit-remaining-requests": limit}
+    if status_code != 200:
+        return httpx.Response(status_code, headers=headers, json={"error": {"message": "failed", "type": "server_error"}})
+
+    return httpx.Response(200, headers=headers, json={
+        "id": "stub", "object": "chat.completion", "created": 0, "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": "respuesta"}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    })
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+
+@pytest.mark.asyncio
+async def test_retries_wait_for_rate_limit_budget():
+    limiters: Dict[str, RecordingRateLimiter] = {}
+    responses = [500, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return completion("gpt-4o", "100", responses.pop(0))
+
+    service = LangchainLlmService(
+        rate_limiters=lambda model: limiters.setdefault(model, RecordingRateLimiter(model)),
+        retry_backoff=0.001,
+        transport=httpx.MockTransport(handler)
+    )
+    try:
+        assert await service.invoke("hola", max_tokens=10) == "respuesta"
+    finally:
+        await service.close()
+
+    assert len(limiters["gpt-4o"].acquired) == 2
+
+
+@pytest.mark.asyncio
+async def test_hedges_spend_and_sync_their_own_model_budget():
+    limiters: Dict[str, RecordingRateLimiter] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        if model == "gpt-4o":
+            await asyncio.sleep(0.05)
+            return completion(model, "100", status_code=400)
+        await asyncio.sleep(0.1)
+        return completion(model, "200")
+
+    service = LangchainLlmService(
+        model="gpt-4o",
+        hedging=True,
+        hedge_model="gpt-4o-mini",
+        hedge_initial_delay=0.01,
+        rate_limiters=lambda model: limiters.setdefault(model, RecordingRateLimiter(model)),
+        transport=httpx.MockTransport(handler)
+    )
+    try:
+        assert await service.invoke("hola", max_tokens=10) == "respuesta"
+    finally:
+        await service.close()
+
+    assert len(limiters["gpt-4o"].acquired) == 1
+    assert len(limiters["gpt-4o-mini"].acquired) == 1
+    assert limiters["gpt-4o"].observed == ["100"]
+    assert limiters["gpt-4o-mini"].observed == ["200"]
+
+
+@pytest.mark.asyncio
+async def test_voice_calls_are_granted_before_queued_text_calls():
+    limiter = RateLimiter(name="chat", requests_per_minute=600, tokens_per_minute=100000)
+    # Nothing left, one request every 0.1s from here on
+    limiter.observe(200, {"x-ratelimit-remaining-requests": "0"})
+    granted = []
+
+    async def call(label: str, voice: bool):
+        with request_priority(voice=voice):
+            await limiter.acquire(1)
+        granted.append(label)
+
+    text = asyncio.create_task(call("text", voice=False))
+    await asyncio.sleep(0)
+    voice = asyncio.create_task(call("voice", voice=True))
+    await asyncio.gather(text, voice)
+
+    assert granted == ["voice", "text"]
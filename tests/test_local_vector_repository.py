@@ -0,0 +1,32 @@
+import os
+import logging
+
+import pytest
+
+from src.llm.infrastructure.numpy import vector_repository
+from src.llm.infrastructure.numpy.vector_repository import HNSW_FILE, MmapVectorRepository, write_snapshot
+
+
+@pytest.fixture
+def snapshot_root(tmp_path):
+    write_snapshot(
+        str(tmp_path / "legal"),
+        ids=[1, 2, 3],
+        vectors=[[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]],
+        payloads=[{"text": "uno"}, {"text": "dos"}, {"text": "tres"}]
+    )
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_a_graph_without_hnswlib_warns_and_searches_by_brute_force(snapshot_root, monkeypatch, caplog):
+    # A graph written on a host that had hnswlib, loaded on one that does not
+    open(os.path.join(snapshot_root, "legal", HNSW_FILE), "wb").close()
+    monkeypatch.setattr(vector_repository, "hnswlib", None)
+
+    with caplog.at_level(logging.WARNING, logger=vector_repository.__name__):
+        repository = MmapVectorRepository(str(snapshot_root), ["legal"], use_hnsw=True)
+
+    assert "hnswlib is not installed" in caplog.text
+    results = await repository.similarity_search([1.0, 0.1], top_k=1, namespace="legal")
+    assert [result.text for result in results] == ["uno"]
@@ -0,0 +1,111 @@
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+import pytest_asyncio
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.llm.infrastructure.httpx.message_delivery import HttpMessageDeliveryService
+
+
+def delivery_service(failures: List[Exception], requests: List[httpx.Request]) -> HttpMessageDeliveryService:
+    """Answers 201 once the given failures have been raised, one per request"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if failures:
+            raise failures.pop(0)
+        return httpx.Response(201)
+
+    return HttpMessageDeliveryService(
+        endpoint="http://main-server",
+        hmac_secret="secret",
+        sender="agent",
+        backoff_base=0.001,
+        senders=1,
+        transport=httpx.MockTransport(handler)
+    )
+
+
+async def deliver_one(service: HttpMessageDeliveryService) -> None:
+    await service.start()
+    await service.deliver("chat", "final answer")
+    await service.close(timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_connect_failures_are_retried():
+    requests = []
+    failures = [httpx.ConnectError("refused"), httpx.ConnectTimeout("timed out")]
+
+    await deliver_one(delivery_service(failures, requests))
+
+    assert len(requests) == 3
+    assert not failures
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [httpx.ReadTimeout("timed out"), httpx.RemoteProtocolError("disconnected")])
+async def test_failures_after_sending_are_not_retried(error):
+    requests = []
+
+    await deliver_one(delivery_service([error], requests))
+
+    # The main server may already have accepted the message, a retry would deliver it twice
+    assert len(requests) == 1
+
+
+@pytest_asyncio.fixture
+async def stub_main_server():
+    """A local main server that answers 503 to the first batch and records the batches it accepts"""
+    batches = []
+    responses = [503]
+
+    async def messages(request: Request):
+        batches.append((await request.json())["messages"])
+        return JSONResponse({}, status_code=responses.pop(0) if responses else 201)
+
+    server = uvicorn.Server(uvicorn.Config(
+        Starlette(routes=[Route("/messages/internal/batch", messages, methods=["POST"])]),
+        host="127.0.0.1",
+        port=0,
+        log_level="warning"
+    ))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", batches
+
+    server.should_exit = True
+    await serving
+
+
+@pytest.mark.asyncio
+async def test_batches_are_retried_against_a_local_server(stub_main_server):
+    endpoint, batches = stub_main_server
+    service = HttpMessageDeliveryService(
+        endpoint=endpoint,
+        hmac_secret="secret",
+        sender="agent",
+        http2=True,
+        backoff_base=0.001,
+        senders=1,
+        batch_path="/messages/internal/batch",
+        batch_window=0.05
+    )
+
+    await service.start()
+    for chat_id in ["chat-1", "chat-2", "chat-3"]:
+        await service.deliver(chat_id, f"answer for {chat_id}")
+    await service.close(timeout=5)
+
+    # The rejected batch is sent again as a whole
+    assert len(batches) == 2
+    assert batches[0] == batches[1]
+    assert [message["chat_id"] for message in batches[1]] == ["chat-1", "chat-2", "chat-3"]
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from src.llm.application.agents.context_orchestrator_agent import ContextOrchestrator
+from src.llm.application.services.namespace_size_cache import NamespaceSizeCache
+from src.llm.application.services.prompt_service import PromptService
+from src.llm.domain.models import ContextOrchestratorOutput
+from src.llm.domain.namespaces import get_company_namespace
+from src.llm.infrastructure.langgraph.warmup import create_stub_state
+
+
+class CountingRepository:
+    """Point counts per namespace, a missing namespace fails like a missing collection"""
+    def __init__(self, sizes: Dict[str, int]):
+        self.sizes = sizes
+        self.counted: List[str] = []
+
+    async def count(self, namespace: str) -> int:
+        self.counted.append(namespace)
+        await asyncio.sleep(0)
+        if namespace not in self.sizes:
+            raise LookupError(f"{namespace} not found")
+        return self.sizes[namespace]
+
+
+@pytest.mark.asyncio
+async def test_empty_namespaces_are_remembered_until_invalidated():
+    repository = CountingRepository({"company_a": 0})
+    cache = NamespaceSizeCache(vector_repository=repository)
+
+    assert not cache.known_empty("company_a")
+    assert all(await asyncio.gather(cache.is_empty("company_a"), cache.is_empty("company_a")))
+    assert cache.known_empty("company_a")
+    assert repository.counted == ["company_a"]
+
+    # A first upload invalidates the namespace, the next lookup counts again
+    repository.sizes["company_a"] = 12
+    cache.invalidate("company_a")
+
+    assert not await cache.is_empty("company_a")
+    assert repository.counted == ["company_a", "company_a"]
+
+
+@pytest.mark.asyncio
+async def test_failed_counts_are_not_taken_for_empty():
+    cache = NamespaceSizeCache(vector_repository=CountingRepository({}))
+
+    assert await cache.size("company_b") is None
+    assert not await cache.is_empty("company_b")
+    assert not cache.known_empty("company_b")
+
+
+class BothBranchesLlmService:
+    async def invoke_structured(self, prompt, response_model, temperature=0.7, max_tokens=None, timeout=None):
+        return ContextOrchestratorOutput(general_law=True, company_law=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size, company_law", [(0, False), (3, True)])
+async def test_company_branch_is_dropped_for_companies_without_documents(size, company_law):
+    state = create_stub_state(general_law=True, company_law=True)
+    repository = CountingRepository({get_company_namespace(state["company_id"]): size})
+    orchestrator = ContextOrchestrator(
+        prompt_service=PromptService(),
+        llm_service=BothBranchesLlmService(),
+        namespace_cache=NamespaceSizeCache(vector_repository=repository)
+    )
+
+    response = await orchestrator.interact(state=state)
+
+    assert response == ContextOrchestratorOutput(general_law=True, company_law=company_law)
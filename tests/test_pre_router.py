@@ -0,0 +1,71 @@
+from typing import List
+
+import pytest
+
+from src.llm.application.agents.context_orchestrator_agent import ContextOrchestrator
+from src.llm.application.services.pre_router_service import LexicalPreRouter
+from src.llm.application.services.prompt_service import PromptService
+from src.llm.domain.models import ContextOrchestratorOutput
+from src.llm.infrastructure.langgraph.warmup import create_stub_state
+
+
+class RoutingLlmService:
+    """Always routes to the company branch, and counts how often it was asked"""
+    def __init__(self):
+        self.calls: List[object] = []
+
+    async def invoke_structured(self, prompt, response_model, temperature=0.7, max_tokens=None, timeout=None):
+        self.calls.append(prompt)
+        return ContextOrchestratorOutput(general_law=False, company_law=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("input, general_law, company_law", [
+    ("Hola", False, False),
+    ("¿Qué dice la Ley Federal del Trabajo sobre vacaciones?", True, False),
+    ("¿Nuestro contrato colectivo cumple con la Ley Federal del Trabajo?", True, True),
+])
+async def test_lexical_routes(input, general_law, company_law):
+    decision = await LexicalPreRouter().route(input)
+
+    assert decision.output == ContextOrchestratorOutput(general_law=general_law, company_law=company_law)
+
+
+@pytest.mark.asyncio
+async def test_lexical_router_abstains_without_cues():
+    assert await LexicalPreRouter().route("¿Qué opinas de esto?") is None
+
+
+def orchestrator(llm_service: RoutingLlmService) -> ContextOrchestrator:
+    return ContextOrchestrator(
+        prompt_service=PromptService(),
+        llm_service=llm_service,
+        pre_router=LexicalPreRouter(),
+        confidence_threshold=0.85
+    )
+
+
+@pytest.mark.asyncio
+async def test_confident_decisions_skip_the_llm():
+    llm_service = RoutingLlmService()
+    state = create_stub_state(general_law=False, company_law=False)
+    state["input"] = "¿Qué dice la Ley Federal del Trabajo sobre vacaciones?"
+
+    response = await orchestrator(llm_service).interact(state=state)
+
+    assert response == ContextOrchestratorOutput(general_law=True, company_law=False)
+    assert llm_service.calls == []
+
+
+@pytest.mark.asyncio
+async def test_follow_ups_are_routed_by_the_llm():
+    llm_service = RoutingLlmService()
+    state = create_stub_state(general_law=False, company_law=False)
+    state["input"] = "¿Qué dice la Ley Federal del Trabajo sobre vacaciones?"
+    state["chat_history"] = [{"message_type": "human", "text": "Revisa nuestro reglamento interno"}]
+
+    response = await orchestrator(llm_service).interact(state=state)
+
+    # The pre-router only sees the input, the history can change what it refers to
+    assert response == ContextOrchestratorOutput(general_law=False, company_law=True)
+    assert len(llm_service.calls) == 1
@@ -0,0 +1,66 @@
+import asyncio
+from typing import AsyncGenerator, List
+
+import pytest
+
+from src.llm.application.agents.company_research_agent import NO_DOCUMENTS_RESPONSE
+from src.llm.application.agents.progressive_aggregator_agent import ProgressiveAggregator
+from src.llm.application.services.prompt_service import PromptService
+
+
+class StubResearcher:
+    def __init__(self, chunks: List[str], delay: float = 0.0):
+        self.__chunks = chunks
+        self.__delay = delay
+
+    async def stream(self, state) -> AsyncGenerator[str, None]:
+        await asyncio.sleep(self.__delay)
+        for chunk in self.__chunks:
+            yield chunk
+
+
+class StubLlmService:
+    async def generate_stream(self, prompt, temperature: float = 0.7, max_tokens: int = None, timeout: float = None):
+        yield "Sin documentos de la empresa."
+
+
+class RecordingStreaming:
+    def __init__(self):
+        self.sent: List[str] = []
+
+    async def execute(self, ws_connection_id, text: str, voice: bool = False, type: str = "audio_response"):
+        self.sent.append(text)
+
+
+@pytest.mark.asyncio
+async def test_an_empty_company_branch_does_not_open_the_answer():
+    streaming = RecordingStreaming()
+    aggregator = ProgressiveAggregator(
+        prompt_service=PromptService(),
+        llm_service=StubLlmService(),
+        streaming=streaming,
+        general_legal_researcher=StubResearcher(["La LFT establece ", "seis días de vacaciones."], delay=0.05),
+        company_legal_researcher=StubResearcher([NO_DOCUMENTS_RESPONSE])
+    )
+
+    response = await aggregator.interact({"chat_id": "chat", "input": "¿Vacaciones?", "chat_history": [], "voice": False})
+
+    assert streaming.sent[0] == "La LFT establece "
+    assert response["final_response"].startswith("La LFT establece seis días de vacaciones.")
+    assert response["company_legal_response"] == NO_DOCUMENTS_RESPONSE
+
+
+@pytest.mark.asyncio
+async def test_the_empty_company_finding_is_sent_when_general_research_fails():
+    streaming = RecordingStreaming()
+    aggregator = ProgressiveAggregator(
+        prompt_service=PromptService(),
+        llm_service=StubLlmService(),
+        streaming=streaming,
+        general_legal_researcher=StubResearcher([], delay=0.05),
+        company_legal_researcher=StubResearcher([NO_DOCUMENTS_RESPONSE])
+    )
+
+    response = await aggregator.interact({"chat_id": "chat", "input": "¿Vacaciones?", "chat_history": [], "voice": False})
+
+    assert response["final_response"] == NO_DOCUMENTS_RESPONSE
@@ -0,0 +1,27 @@
+from src.llm.application.services.prompt_service import PromptService
+from src.llm.application.services.token_counter import TokenCounter, estimate_tokens
+from src.llm.domain.models import TokenBudget
+
+
+def test_history_is_budgeted_on_the_messages_sent():
+    token_counter = TokenCounter(cache_size=0)
+    prompt_service = PromptService(token_counter, {"research": TokenBudget(max_prompt_tokens=200)})
+    # Short messages, where the per message overhead is most of what they cost
+    chat_history = [
+        {"message_type": "human" if turn % 2 == 0 else "ai", "text": "sí" if turn % 2 == 0 else f"De acuerdo {turn}"}
+        for turn in range(40)
+    ]
+
+    messages = prompt_service.build_messages(
+        system_message="Eres un asistente legal.",
+        input="¿Cuántos días de vacaciones me corresponden?",
+        chat_history=chat_history,
+        context=["Artículo 76 " + "contexto " * 20],
+        budget="research"
+    )
+
+    assert estimate_tokens(token_counter, messages, max_tokens=None, completion_tokens=0) <= 200
+    history = messages[1:-1]
+    assert history
+    # The newest messages are kept, with their roles
+    assert history[-1] == {"role": "assistant", "content": chat_history[-1]["text"]}
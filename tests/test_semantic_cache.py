@@ -0,0 +1,67 @@
+from typing import Dict, List
+
+import pytest
+
+from src.llm.application.services import semantic_cache_service
+from src.llm.application.services.semantic_cache_service import SemanticResponseCache
+from src.llm.domain.services.embedding_service import EmbeddingService
+
+
+class StubEmbeddingService(EmbeddingService):
+    def __init__(self, vectors: Dict[str, List[float]]):
+        self.__vectors = vectors
+
+    async def embed_query(self, query: str) -> List[float]:
+        return self.__vectors[query]
+
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.__vectors[text] for text in texts]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(semantic_cache_service, "time", clock)
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_an_expired_best_match_does_not_hide_a_fresh_entry(clock):
+    cache = SemanticResponseCache(
+        StubEmbeddingService({
+            "¿Cuántos días de vacaciones tengo?": [1.0, 0.0],
+            "¿Cuántos días de vacaciones me tocan?": [0.99, 0.14],
+        }),
+        similarity_threshold=0.95,
+        ttl_seconds=10
+    )
+
+    await cache.store("¿Cuántos días de vacaciones tengo?", "old answer", company_id="acme", company_scoped=False)
+    clock.now = 5
+    await cache.store("¿Cuántos días de vacaciones me tocan?", "fresh answer", company_id="acme", company_scoped=False)
+    clock.now = 12
+
+    assert await cache.lookup("¿Cuántos días de vacaciones tengo?", company_id="acme") == "fresh answer"
+
+
+@pytest.mark.asyncio
+async def test_questions_about_different_articles_do_not_share_answers(clock):
+    cache = SemanticResponseCache(
+        StubEmbeddingService({
+            "¿Qué dice el artículo 76 de la LFT?": [1.0, 0.0],
+            "¿Qué dice el artículo 77 de la LFT?": [1.0, 0.01],
+        })
+    )
+
+    await cache.store("¿Qué dice el artículo 76 de la LFT?", "article 76", company_id="acme", company_scoped=False)
+
+    assert await cache.lookup("¿Qué dice el artículo 77 de la LFT?", company_id="acme") is None
+    assert await cache.lookup("¿Qué dice el artículo 76 de la LFT?", company_id="acme") == "article 76"
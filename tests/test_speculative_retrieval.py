@@ -0,0 +1,72 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from src.llm.application.use_cases.speculative_retrieval import (
+    COMPANY_BRANCH,
+    GENERAL_BRANCH,
+    SpeculativeRetrieval,
+    speculative_retrieval_scope
+)
+from src.llm.domain.models import ContextOrchestratorOutput
+from src.llm.domain.namespaces import get_company_namespace, get_legal_namespace
+from src.llm.infrastructure.langgraph.warmup import create_stub_state
+
+
+class GatedSearchForContext:
+    """Batched searches wait on the gate, single searches answer at once"""
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.batches: List[List[str]] = []
+        self.searches: List[str] = []
+
+    async def execute(self, input: str, namespace: str, top_k: int = 2) -> List[str]:
+        self.searches.append(namespace)
+        return [f"searched {namespace}"]
+
+    async def execute_batch(self, input: str, namespaces: List[str], top_k: int = 2) -> Dict[str, List[str]]:
+        self.batches.append(namespaces)
+        await self.gate.wait()
+        return {namespace: [f"prefetched {namespace}"] for namespace in namespaces}
+
+
+@pytest.mark.asyncio
+async def test_prefetches_are_kept_out_of_the_state():
+    search = GatedSearchForContext()
+    retrieval = SpeculativeRetrieval(search_for_context=search, enabled=True)
+    state = create_stub_state(general_law=True, company_law=False)
+
+    with speculative_retrieval_scope():
+        retrieval.start(state=state)
+        retrieval.settle(state, ContextOrchestratorOutput(general_law=True, company_law=False))
+        search.gate.set()
+
+        context = await retrieval.get_context(state=state, branch=GENERAL_BRANCH, namespace=get_legal_namespace())
+
+    assert context == [f"prefetched {get_legal_namespace()}"]
+    assert not any(isinstance(value, (asyncio.Task, dict)) for value in state.values())
+    assert search.searches == []
+
+
+@pytest.mark.asyncio
+async def test_prefetches_do_not_leak_between_runs():
+    search = GatedSearchForContext()
+    retrieval = SpeculativeRetrieval(search_for_context=search, enabled=True)
+    state = create_stub_state(general_law=False, company_law=True)
+    namespace = get_company_namespace(state["company_id"])
+
+    with speculative_retrieval_scope():
+        retrieval.start(state=state)
+        retrieval.settle(state, ContextOrchestratorOutput(general_law=False, company_law=True))
+        await asyncio.sleep(0)
+        prefetch = next(task for task in asyncio.all_tasks() if task is not asyncio.current_task())
+
+        # Another run searches on its own instead of picking up this run's prefetch
+        with speculative_retrieval_scope():
+            context = await retrieval.get_context(state=state, branch=COMPANY_BRANCH, namespace=namespace)
+
+    assert context == [f"searched {namespace}"]
+    # The run ended before its researcher asked for the prefetch, so it is cancelled rather than left running
+    await asyncio.sleep(0)
+    assert prefetch.cancelled()
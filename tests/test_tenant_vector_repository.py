@@ -0,0 +1,53 @@
+import pytest
+import pytest_asyncio
+from qdrant_client import AsyncQdrantClient
+
+from src.llm.application.services.tenant_vector_repository import TENANT_FIELD, TenantPartitionedVectorRepository
+from src.llm.domain.namespaces import get_company_id, get_company_namespace
+from src.llm.domain.services.embedding_service import DocumentChunk
+from src.llm.infrastructure.qdrant.collections import create_tenant_collection
+from src.llm.infrastructure.qdrant.vector_repository import QdrantVectorRepository
+
+COLLECTION = "company_docs"
+
+
+@pytest_asyncio.fixture
+async def repository():
+    client = AsyncQdrantClient(location=":memory:")
+    await create_tenant_collection(client, COLLECTION, vector_size=4, tenant_field=TENANT_FIELD)
+    repository = TenantPartitionedVectorRepository(QdrantVectorRepository(client), COLLECTION, get_company_id)
+    yield repository
+    await repository.close()
+
+
+def chunk(text: str) -> DocumentChunk:
+    return DocumentChunk(
+        content=text,
+        metadata={"document_id": "contract.pdf", "filename": "contract.pdf"},
+        chunk_id="contract.pdf:0"
+    )
+
+
+@pytest.mark.asyncio
+async def test_tenants_uploading_the_same_filename_keep_their_own_points(repository):
+    first, second = get_company_namespace("company-a"), get_company_namespace("company-b")
+
+    await repository.upsert(namespace=first, chunks=[chunk("A")], embeddings=[[1.0, 0.0, 0.0, 0.0]])
+    await repository.upsert(namespace=second, chunks=[chunk("B")], embeddings=[[0.0, 1.0, 0.0, 0.0]])
+
+    assert await repository.count(first) == 1
+    assert await repository.count(second) == 1
+
+    results = await repository.similarity_search(query_vector=[1.0, 0.0, 0.0, 0.0], top_k=4, namespace=first)
+    assert [result.text for result in results] == ["A"]
+
+
+@pytest.mark.asyncio
+async def test_reuploading_a_chunk_replaces_it(repository):
+    namespace = get_company_namespace("company-a")
+
+    await repository.upsert(namespace=namespace, chunks=[chunk("old")], embeddings=[[1.0, 0.0, 0.0, 0.0]])
+    await repository.upsert(namespace=namespace, chunks=[chunk("new")], embeddings=[[1.0, 0.0, 0.0, 0.0]])
+
+    results = await repository.similarity_search(query_vector=[1.0, 0.0, 0.0, 0.0], top_k=4, namespace=namespace)
+    assert [result.text for result in results] == ["new"]
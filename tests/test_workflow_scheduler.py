@@ -0,0 +1,59 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.app.middleware.hmac_verification import verify_hmac
+from src.llm.application.services.workflow_scheduler import WorkflowScheduler
+from src.llm.dependencies.services import get_workflow_scheduler
+from src.llm.interface.fastapi import interactions_routes
+
+
+class GatedWorkflowService:
+    """Every run waits on the gate, so the scheduler's workers stay busy"""
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.runs = []
+
+    async def invoke_workflow(self, state):
+        self.runs.append(state["chat_id"])
+        await self.gate.wait()
+        return state
+
+
+def interaction() -> dict:
+    return {
+        "input": "¿Qué dice el artículo 76 de la LFT?",
+        "chat_id": str(uuid.uuid4()),
+        "company_id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "chat_history": []
+    }
+
+
+@pytest.mark.asyncio
+async def test_requests_beyond_the_queue_are_shed_with_retry_after():
+    workflow_service = GatedWorkflowService()
+    scheduler = WorkflowScheduler(workflow_service=workflow_service, workers=1, max_pending=1)
+    scheduler.start()
+
+    app = FastAPI()
+    app.include_router(interactions_routes.router)
+    app.dependency_overrides[verify_hmac] = lambda: None
+    app.dependency_overrides[get_workflow_scheduler] = lambda: scheduler
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://agent") as client:
+        running = await client.post("/interactions/internal/interact", json=interaction())
+        await asyncio.sleep(0)
+        queued = await client.post("/interactions/internal/interact", json=interaction())
+        shed = await client.post("/interactions/internal/interact", json=interaction())
+
+    assert [running.status_code, queued.status_code, shed.status_code] == [202, 202, 503]
+    # One run in flight and one queued on a single worker, at the default 5s estimate per run
+    assert shed.headers["Retry-After"] == "10"
+
+    workflow_service.gate.set()
+    await scheduler.stop(timeout=5)
+    assert len(workflow_service.runs) == 2